@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 14:00
+  @ Description: 性能测试工具集
+  @ History:
+"""
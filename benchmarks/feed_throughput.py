@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 14:00
+  @ Description: 行情链路吞吐压测, market -> listener -> writer
+  @ History:
+    模拟服务运行在独立进程中, 压测进程只统计客户端的CPU与内存.
+    运行:
+        python -m benchmarks.feed_throughput --symbols 20 --rate 200 --duration 30
+        python -m benchmarks.feed_throughput --target market --output results/feed.json
+    指标:
+        msgs/sec: 持续处理的websocket消息数;
+        cpu us/msg: 每条消息消耗的进程CPU时间(微秒);
+        rss growth: 统计区间内常驻内存增长(KB).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import resource
+import multiprocessing
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LISTENER_DIR = os.path.join(ROOT_DIR, "data_listener", "okexV5")
+
+CHANNEL_MESSAGES = {"orderbook": 1, "trade": 1, "kline": 1}  # 每个频道每个周期推送的消息数
+
+
+def rss_kb():
+    """ 当前进程常驻内存(KB), 不支持`/proc`的系统返回峰值内存
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_server(host, port, rate, depth, update_levels, ready):
+    from benchmarks.okex_v5_stub_server import OkexV5StubServer
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = OkexV5StubServer(host=host, port=port, rate=rate, depth=depth, update_levels=update_levels, seed=1)
+    loop.run_until_complete(server.start())
+    ready.set()
+    loop.run_forever()
+
+
+class FeedBenchmark:
+    """ 行情链路吞吐压测.
+
+    Attributes:
+        target: `market` 只运行 OkexV5Market; `listener` 运行 Listener 并写入文件.
+        symbols: 模拟币对数量.
+        channels: 订阅频道, e.g. ["orderbook", "trade"].
+        rate: 模拟服务每个币对每个频道每秒推送消息数.
+        warmup: 预热时间(秒).
+        duration: 统计时间(秒).
+    """
+
+    def __init__(self, target="listener", symbols=10, channels=None, rate=100, depth=50, update_levels=5,
+                 warmup=3, duration=10, host="127.0.0.1", port=8765):
+        self._target = target
+        self._symbols = [f"SYM{i}-USDT-SWAP" for i in range(symbols)]
+        self._channels = channels or ["orderbook", "trade"]
+        self._rate = rate
+        self._depth = depth
+        self._update_levels = update_levels
+        self._warmup = warmup
+        self._duration = duration
+        self._host = host
+        self._port = port
+        self._messages = 0
+        self._tmp_dir = None
+
+    def run(self):
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=_run_server, daemon=True,
+                                         args=(self._host, self._port, self._rate, self._depth,
+                                               self._update_levels, ready))
+        server.start()
+        try:
+            if not ready.wait(10):
+                raise RuntimeError("stub server start timeout")
+            loop = asyncio.get_event_loop()
+            return loop.run_until_complete(self._bench())
+        finally:
+            server.terminate()
+            server.join()
+
+    def _create_feed(self):
+        wss = f"ws://{self._host}:{self._port}"
+        if self._target == "market":
+            from xuanwu.const import OKEX_V5
+            from xuanwu.platforms.okex_v5.okex_v5_market import OkexV5Market
+
+            async def noop(*args, **kwargs):
+                pass
+            return OkexV5Market(platform=OKEX_V5, wss=wss, symbols=self._symbols, channels=self._channels,
+                                orderbook_length=5, orderbook_update_callback=noop, trade_update_callback=noop,
+                                kline_update_callback=noop)
+
+        sys.path.insert(0, LISTENER_DIR)
+        from listener.MainEntrance import Listener
+        self._tmp_dir = tempfile.mkdtemp(prefix="feed_bench_")
+        configs = {
+            "symbol": self._symbols,
+            "channels": self._channels,
+            "silent": True,
+            "platform": "okex_v5",
+            "influx_database": None,
+            "file": "csv",
+            "file_url": self._tmp_dir,
+            "wss": wss
+        }
+        return Listener(configs).market
+
+    async def _bench(self):
+        market = self._create_feed()
+        process = market.process
+
+        async def counting_process(msg):
+            self._messages += 1
+            await process(msg)
+        market.process = counting_process
+
+        await asyncio.sleep(self._warmup)
+        n0, cpu0, wall0, rss0 = self._messages, time.process_time(), time.perf_counter(), rss_kb()
+        rss_max = rss0
+        end = wall0 + self._duration
+        while time.perf_counter() < end:
+            await asyncio.sleep(min(1, end - time.perf_counter()))
+            rss_max = max(rss_max, rss_kb())
+        n1, cpu1, wall1, rss1 = self._messages, time.process_time(), time.perf_counter(), rss_kb()
+
+        count = n1 - n0
+        offered = self._rate * len(self._symbols) * sum(CHANNEL_MESSAGES.get(c, 1) for c in self._channels)
+        return {
+            "target": self._target,
+            "symbols": len(self._symbols),
+            "channels": self._channels,
+            "offered_msgs_per_sec": offered,
+            "msgs_per_sec": count / (wall1 - wall0),
+            "cpu_us_per_msg": (cpu1 - cpu0) / count * 1e6 if count else None,
+            "rss_start_kb": rss0,
+            "rss_end_kb": rss1,
+            "rss_max_kb": rss_max,
+            "rss_growth_kb": rss1 - rss0,
+            "duration": wall1 - wall0,
+            "timestamp": int(time.time())
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OKX V5 feed throughput benchmark.")
+    parser.add_argument("--target", choices=["market", "listener"], default="listener")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--channels", default="orderbook,trade")
+    parser.add_argument("--rate", type=int, default=100, help="messages/sec per channel per symbol")
+    parser.add_argument("--depth", type=int, default=50)
+    parser.add_argument("--update-levels", type=int, default=5)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default=None, help="append result as a json line to this file")
+    args = parser.parse_args()
+
+    bench = FeedBenchmark(target=args.target, symbols=args.symbols, channels=args.channels.split(","),
+                          rate=args.rate, depth=args.depth, update_levels=args.update_levels, warmup=args.warmup,
+                          duration=args.duration, port=args.port)
+    result = bench.run()
+    for k, v in result.items():
+        print(f"{k:>22}: {round(v, 3) if isinstance(v, float) else v}")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 16:00
+  @ Description: 热点函数微基准测试
+  @ History:
+    运行:
+        python -m benchmarks.micro_benchmarks                      # 运行全部用例并记录结果
+        python -m benchmarks.micro_benchmarks -k orderbook         # 只运行名称包含`orderbook`的用例
+        python -m benchmarks.micro_benchmarks --compare            # 与上一个版本的记录对比
+    每次运行的结果以一行json追加到`benchmarks/results/micro.jsonl`, 包含版本号和git提交号,
+    `--compare`按用例对比最近一次不同版本(或指定版本)的结果, 超过阈值的变慢会被标记出来.
+"""
+import os
+import sys
+import copy
+import json
+import time
+import random
+import timeit
+import asyncio
+import argparse
+import platform
+import tempfile
+import itertools
+import subprocess
+from collections import OrderedDict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(ROOT_DIR, "benchmarks", "results", "micro.jsonl")
+LISTENER_DIR = os.path.join(ROOT_DIR, "data_listener", "okexV5")
+
+BENCHMARKS = OrderedDict()  # {name: setup}, setup() 返回被测函数
+
+
+def benchmark(name):
+    """ 注册基准用例, 被装饰函数负责准备数据并返回无参数的被测函数
+    """
+    def decorating_function(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorating_function
+
+
+# ------------------------------------------------- Synthetic inputs -------------------------------------------------
+
+def _okex_book(depth=50, updates=1000, update_levels=5):
+    """ OKX V5 books50-l2-tbt 风格的快照与增量序列
+    """
+    from benchmarks.okex_v5_stub_server import _StubBook
+    book = _StubBook("BTC-USDT-SWAP", depth, update_levels, mid=43000.0, tick=0.1, rnd=random.Random(7))
+    snapshot = book.snapshot()
+    return snapshot, [book.update() for _ in range(updates)]
+
+
+def _market():
+    """ 不建立连接的 OkexV5Market 实例, 只用于调用订单簿处理方法
+    """
+    from xuanwu.platforms.okex_v5.okex_v5_market import OkexV5Market
+    return OkexV5Market.__new__(OkexV5Market)
+
+
+def _orderbook(depth=5):
+    from xuanwu.model.market import Orderbook
+    snapshot, _ = _okex_book()
+    return Orderbook(platform="okex_v5", symbol="BTC-USDT-SWAP", asks=snapshot["asks"][:depth],
+                     bids=snapshot["bids"][:depth], timestamp=snapshot["ts"])
+
+
+# ---------------------------------------------------- Benchmarks ----------------------------------------------------
+
+@benchmark("okex_v5.update_bids")
+def bench_update_bids():
+    market = _market()
+    snapshot, updates = _okex_book()
+    bids = copy.deepcopy(snapshot["bids"])
+    changes = itertools.cycle([copy.deepcopy(u["bids"]) for u in updates])
+    return lambda: market.update_bids([l[:] for l in next(changes)], bids)
+
+
+@benchmark("okex_v5.update_asks")
+def bench_update_asks():
+    market = _market()
+    snapshot, updates = _okex_book()
+    asks = copy.deepcopy(snapshot["asks"])
+    changes = itertools.cycle([copy.deepcopy(u["asks"]) for u in updates])
+    return lambda: market.update_asks([l[:] for l in next(changes)], asks)
+
+
+@benchmark("okex_v5.check")
+def bench_check():
+    market = _market()
+    snapshot, _ = _okex_book()
+    bids, asks = snapshot["bids"], snapshot["asks"]
+    return lambda: market.check(bids, asks)
+
+
+@benchmark("okex_v5.change")
+def bench_change():
+    market = _market()
+    values = itertools.cycle([random.Random(3).randint(0, (1 << 32) - 1) for _ in range(1000)])
+    return lambda: market.change(next(values))
+
+
+@benchmark("orderbook.copy")
+def bench_orderbook_copy():
+    ob = _orderbook()
+    return lambda: copy.copy(ob)
+
+
+@benchmark("orderbook.data")
+def bench_orderbook_data():
+    ob = _orderbook()
+    return lambda: ob.data
+
+
+@benchmark("orderbook.smart")
+def bench_orderbook_smart():
+    ob = _orderbook()
+    return lambda: ob.smart
+
+
+@benchmark("orderbook.str")
+def bench_orderbook_str():
+    ob = _orderbook()
+    return lambda: str(ob)
+
+
+def _trade():
+    from xuanwu.model.market import Trade
+    return Trade(platform="okex_v5", symbol="BTC-USDT-SWAP", side="BUY", price="43000.1", trade_id="242720720",
+                 quantity="5", timestamp="1690000000000")
+
+
+def _codec_case(obj):
+    """ 编码后解码, 确认与原对象字段一致, 返回编码结果和json字符串
+    """
+    from xuanwu.model import codec
+    data = codec.encode(obj)
+    assert codec.decode(data).data == obj.data, "codec round trip mismatch"
+    return data, str(obj)
+
+
+@benchmark("codec.encode[orderbook]")
+def bench_codec_encode_orderbook():
+    from xuanwu.model import codec
+    ob = _orderbook()
+    _codec_case(ob)
+    return lambda: codec.encode(ob)
+
+
+@benchmark("codec.decode[orderbook]")
+def bench_codec_decode_orderbook():
+    from xuanwu.model import codec
+    data, _ = _codec_case(_orderbook())
+    return lambda: codec.decode(data)
+
+
+@benchmark("json.loads[orderbook]")
+def bench_json_loads_orderbook():
+    from xuanwu.model.market import Orderbook
+    _, s = _codec_case(_orderbook())
+    return lambda: Orderbook(**json.loads(s))
+
+
+@benchmark("codec.encode[trade]")
+def bench_codec_encode_trade():
+    from xuanwu.model import codec
+    trade = _trade()
+    _codec_case(trade)
+    return lambda: codec.encode(trade)
+
+
+@benchmark("codec.decode[trade]")
+def bench_codec_decode_trade():
+    from xuanwu.model import codec
+    data, _ = _codec_case(_trade())
+    return lambda: codec.decode(data)
+
+
+@benchmark("trade.str")
+def bench_trade_str():
+    trade = _trade()
+    return lambda: str(trade)
+
+
+@benchmark("json.loads[trade]")
+def bench_json_loads_trade():
+    from xuanwu.model.market import Trade
+    _, s = _codec_case(_trade())
+    return lambda: Trade(**json.loads(s))
+
+
+@benchmark("file_writer.write")
+def bench_file_writer():
+    sys.path.insert(0, LISTENER_DIR)
+    from listener.FileWriter import FileWriter
+    fw = FileWriter({"symbol": "BTC-USDT-SWAP", "exchange": "okex_v5", "data_type": "orderbook",
+                     "file_url": tempfile.mkdtemp(prefix="micro_bench_"), "file_format": "csv"})
+    row = OrderedDict([("symbol", "BTC-USDT-SWAP"), ("timestamp", "1634900000000")] +
+                      [(f"ap{i}", 43000.1 + i / 10) for i in range(1, 6)] +
+                      [(f"bp{i}", 43000.0 - i / 10) for i in range(1, 6)] +
+                      [(f"az{i}", float(i * 3)) for i in range(1, 6)] +
+                      [(f"bz{i}", float(i * 2)) for i in range(1, 6)])
+    return lambda: fw.write(row)
+
+
+@benchmark("logger._log")
+def bench_logger_log():
+    from xuanwu.utils import logger
+    ob = _orderbook()
+    return lambda: logger._log("[-] [Bench.run] ", "orderbook update:", ob, 12345, {"symbol": "BTC-USDT-SWAP"})
+
+
+@benchmark("tools.utctime_str_to_ts")
+def bench_utctime_str_to_ts():
+    from xuanwu.utils import tools
+    return lambda: tools.utctime_str_to_ts("2021-10-22T09:14:27.806Z")
+
+
+@benchmark("heartbeat.ticker[1000 tasks]")
+def bench_heartbeat_ticker():
+    from xuanwu.heartbeat import HeartBeat
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    hb = HeartBeat()
+    hb._print_interval = 0
+
+    # ticker每次都会call_later下一次ticker, 基准中不需要, 否则定时器会在多次运行之间累积
+    loop.call_later = lambda *args, **kwargs: None
+
+    async def task(*args, **kwargs):
+        pass
+    for i in range(1000):
+        hb.register(task, interval=(i % 10) + 1)
+
+    async def drain():
+        # 等待本次ticker创建的任务全部结束, 不把未完成的任务留给下一次运行和其他用例
+        current = asyncio.current_task()
+        await asyncio.gather(*[t for t in asyncio.all_tasks() if t is not current])
+
+    def run():
+        hb.ticker()
+        loop.run_until_complete(drain())
+    return run
+
+
+# ------------------------------------------------------ Runner ------------------------------------------------------
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _version():
+    import xuanwu
+    return ".".join(str(v) for v in xuanwu.__version__)
+
+
+def run_benchmarks(pattern=None, repeat=5, min_time=0.2):
+    """ 运行基准用例
+
+    :returns:
+        :return: {name: {"mean_us": ..., "min_us": ..., "number": ...}}
+    """
+    results = OrderedDict()
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            func = setup()
+        except ImportError as e:
+            print(f"{name:<32} skipped: {e}")
+            continue
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        number = max(1, int(number * min_time / 0.2))
+        times = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+        results[name] = {
+            "mean_us": sum(times) / len(times),
+            "min_us": min(times),
+            "number": number
+        }
+        print(f"{name:<32} min {results[name]['min_us']:>10.3f} us   mean {results[name]['mean_us']:>10.3f} us")
+    return results
+
+
+def load_records(path=RESULTS_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_record(results, path=RESULTS_FILE):
+    record = {
+        "version": _version(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": int(time.time()),
+        "results": results
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+
+def compare(current, baseline, threshold=0.1):
+    """ 对比两次记录, 以`min_us`为准, 变慢超过threshold的用例标记为REGRESSION
+    """
+    print(f"\ncompare {current['version']}({current['revision']}) with "
+          f"{baseline['version']}({baseline['revision']})")
+    regressions = 0
+    for name, r in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            print(f"{name:<32} new")
+            continue
+        change = r["min_us"] / base["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        print(f"{name:<32} {base['min_us']:>10.3f} -> {r['min_us']:>10.3f} us  {change:>+8.1%}  {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro benchmarks for hot helpers.")
+    parser.add_argument("-k", dest="pattern", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--no-save", action="store_true", help="do not append result to the results file")
+    parser.add_argument("--results", default=RESULTS_FILE)
+    parser.add_argument("--compare", nargs="?", const="", default=None,
+                        help="compare with the latest record of the given version, default the previous version")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    records = load_records(args.results)
+    results = run_benchmarks(args.pattern, args.repeat, args.min_time)
+    if args.no_save:
+        current = {"version": _version(), "revision": _git_revision(), "results": results}
+    else:
+        current = save_record(results, args.results)
+
+    if args.compare is not None:
+        if args.compare:
+            baselines = [r for r in records if r["version"] == args.compare]
+        else:
+            baselines = [r for r in records if r["version"] != current["version"]] or records
+        if not baselines:
+            print("\nno baseline record to compare.")
+            return
+        if compare(current, baselines[-1], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 14:00
+  @ Description: 本地模拟OKX V5公共行情Websocket服务, 用于行情链路压测
+  @ History:
+    支持的频道:
+        books50-l2-tbt: 首次推送全量快照, 之后按频率推送增量, 带有正确的checksum和seqId/prevSeqId;
+        trades: 逐笔成交;
+        candle1m: 1分钟K线.
+    运行: python -m benchmarks.okex_v5_stub_server --port 8765 --rate 1000
+"""
+import sys
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+from aiohttp import web, WSMsgType
+
+__all__ = ("OkexV5StubServer", "okex_v5_checksum", )
+
+CHECKSUM_DEPTH = 25  # checksum使用的档位数量
+
+
+def okex_v5_checksum(bids, asks):
+    """ 按OKX V5规则计算订单簿checksum, 买卖档交替拼接`price:size`后做crc32, 结果为有符号32位整数
+    Attributes:
+        :param bids: 排序后的bids, e.g. [["100.1", "2", "0", "1"], ...]
+        :param asks: 排序后的asks
+    :returns:
+        :return: checksum
+    """
+    fields = []
+    bids = bids[:CHECKSUM_DEPTH]
+    asks = asks[:CHECKSUM_DEPTH]
+    for i in range(max(len(bids), len(asks))):
+        if i < len(bids):
+            fields.append(f"{bids[i][0]}:{bids[i][1]}")
+        if i < len(asks):
+            fields.append(f"{asks[i][0]}:{asks[i][1]}")
+    crc = zlib.crc32(":".join(fields).encode())
+    return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+
+class _StubBook:
+    """ 单个币对的模拟订单簿, 价格在固定网格上, 增量只修改数量或删除/恢复档位, 保证买卖不交叉.
+    """
+
+    def __init__(self, symbol, depth, update_levels, mid=10000.0, tick=0.1, rnd=None):
+        self._symbol = symbol
+        self._depth = depth
+        self._update_levels = update_levels
+        self._rnd = rnd or random.Random()
+        self._decimals = len(str(tick).split(".")[1]) if "." in str(tick) else 0
+        self._bid_prices = [self._fmt(mid - tick * (i + 1)) for i in range(depth + depth // 2)]
+        self._ask_prices = [self._fmt(mid + tick * (i + 1)) for i in range(depth + depth // 2)]
+        self._bids = {p: self._size() for p in self._bid_prices[:depth]}
+        self._asks = {p: self._size() for p in self._ask_prices[:depth]}
+        self._seq = self._rnd.randint(1, 1000000)
+        self._trade_id = self._rnd.randint(1, 1000000)  # 成交id按币对递增, 与OKX一致
+        self._last_price = mid
+
+    def _fmt(self, price):
+        return f"{price:.{self._decimals}f}"
+
+    def _size(self):
+        return str(self._rnd.randint(1, 500))
+
+    def _levels(self, side, reverse):
+        return [[p, s, "0", "1"] for p, s in sorted(side.items(), key=lambda x: float(x[0]), reverse=reverse)]
+
+    def snapshot(self):
+        bids = self._levels(self._bids, True)
+        asks = self._levels(self._asks, False)
+        return {
+            "asks": asks,
+            "bids": bids,
+            "ts": str(int(time.time() * 1000)),
+            "checksum": okex_v5_checksum(bids, asks),
+            "prevSeqId": -1,
+            "seqId": self._seq
+        }
+
+    def update(self):
+        changes = {"bids": [], "asks": []}
+        for _ in range(self._update_levels):
+            name = "bids" if self._rnd.random() < 0.5 else "asks"
+            side = self._bids if name == "bids" else self._asks
+            grid = self._bid_prices if name == "bids" else self._ask_prices
+            price = self._rnd.choice(grid)
+            if price in side and len(side) > self._depth // 2 and self._rnd.random() < 0.2:
+                side.pop(price)
+                changes[name].append([price, "0", "0", "0"])
+            else:
+                side[price] = self._size()
+                changes[name].append([price, side[price], "0", "1"])
+        prev_seq = self._seq
+        self._seq += 1
+        return {
+            "asks": changes["asks"],
+            "bids": changes["bids"],
+            "ts": str(int(time.time() * 1000)),
+            "checksum": okex_v5_checksum(self._levels(self._bids, True), self._levels(self._asks, False)),
+            "prevSeqId": prev_seq,
+            "seqId": self._seq
+        }
+
+    def trade(self):
+        self._last_price = float(self._rnd.choice(self._bid_prices[:3] + self._ask_prices[:3]))
+        self._trade_id += 1
+        return {
+            "instId": self._symbol,
+            "tradeId": str(self._trade_id),
+            "px": self._fmt(self._last_price),
+            "sz": self._size(),
+            "side": "buy" if self._rnd.random() < 0.5 else "sell",
+            "ts": str(int(time.time() * 1000)),
+            "count": "1"
+        }
+
+    def candle(self):
+        now = int(time.time() * 1000)
+        p = self._fmt(self._last_price)
+        return [str(now - now % 60000), p, p, p, p, self._size(), self._size()]
+
+
+class OkexV5StubServer:
+    """ OKX V5 public websocket stand-in.
+
+    Attributes:
+        host: Listen host, default is `127.0.0.1`.
+        port: Listen port, default is 8765.
+        rate: Messages per second for every subscribed channel of every symbol.
+        depth: Orderbook depth of snapshot.
+        update_levels: Changed levels per orderbook update message.
+        batch_interval: Send loop interval(seconds), messages due in one interval are sent together.
+        seed: Random seed.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, rate=100, depth=50, update_levels=5, batch_interval=0.01,
+                 seed=None):
+        self._host = host
+        self._port = port
+        self._rate = rate
+        self._depth = depth
+        self._update_levels = update_levels
+        self._batch_interval = batch_interval
+        self._rnd = random.Random(seed)
+        self._runner = None
+        self._sent = 0  # 已推送消息数
+
+    @property
+    def sent(self):
+        return self._sent
+
+    @property
+    def url(self):
+        return f"ws://{self._host}:{self._port}"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws/v5/public", self._ws_handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _ws_handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions = []  # [(channel, inst_id, book), ...]
+        books = {}
+        sender = None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                if msg.data == "ping":
+                    await ws.send_str("pong")
+                    continue
+                try:
+                    req = json.loads(msg.data)
+                except ValueError:
+                    await ws.send_json({"event": "error", "code": "60012", "msg": f"Invalid request: {msg.data}"})
+                    continue
+                if req.get("op") != "subscribe":
+                    await ws.send_json({"event": "error", "code": "60012", "msg": f"Invalid request: {msg.data}"})
+                    continue
+                for arg in req.get("args", []):
+                    channel = arg.get("channel")
+                    inst_id = arg.get("instId")
+                    if channel not in ("books50-l2-tbt", "trades", "candle1m"):
+                        await ws.send_json({"event": "error", "code": "60018",
+                                            "msg": f"Wrong URL or channel:{channel} doesn't exist."})
+                        continue
+                    await ws.send_json({"event": "subscribe", "arg": arg})
+                    if inst_id not in books:
+                        books[inst_id] = _StubBook(inst_id, self._depth, self._update_levels,
+                                                   rnd=random.Random(self._rnd.random()))
+                    book = books[inst_id]
+                    if channel == "books50-l2-tbt":
+                        await ws.send_str(json.dumps({"arg": arg, "action": "snapshot", "data": [book.snapshot()]}))
+                        self._sent += 1
+                    subscriptions.append((arg, book))
+                if sender is None and subscriptions:
+                    sender = asyncio.get_event_loop().create_task(self._send_loop(ws, subscriptions))
+        finally:
+            if sender:
+                sender.cancel()
+        return ws
+
+    async def _send_loop(self, ws, subscriptions):
+        start = time.perf_counter()
+        sent = 0
+        while not ws.closed:
+            due = int((time.perf_counter() - start) * self._rate) - sent
+            for _ in range(due):
+                for arg, book in subscriptions:
+                    channel = arg["channel"]
+                    if channel == "books50-l2-tbt":
+                        msg = {"arg": arg, "action": "update", "data": [book.update()]}
+                    elif channel == "trades":
+                        msg = {"arg": arg, "data": [book.trade()]}
+                    else:
+                        msg = {"arg": arg, "data": [book.candle()]}
+                    try:
+                        await ws.send_str(json.dumps(msg))
+                    except ConnectionResetError:
+                        return
+                    self._sent += 1
+            sent += max(due, 0)
+            await asyncio.sleep(self._batch_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OKX V5 public websocket stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=int, default=100, help="messages/sec per channel per symbol")
+    parser.add_argument("--depth", type=int, default=50)
+    parser.add_argument("--update-levels", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = OkexV5StubServer(host=args.host, port=args.port, rate=args.rate, depth=args.depth,
+                              update_levels=args.update_levels, seed=args.seed)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(server.start())
+    print(f"OKX V5 stub server listening on {server.url}/ws/v5/public", file=sys.stderr)
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.stop())
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@
 from xuanwu.platforms.okex_v5.okex_v5_market import OkexV5Market
 from loguru import logger
 from xuanwu.model.market import Orderbook
+from xuanwu.utils.trade_seq import TradeSequencer
 import time
 import copy
 from pprint import pprint
@@ -29,6 +30,8 @@ class Listener:
         file = configs.get('file', None)
         file_url = configs.get('file_url', None)
         platform = configs.get('platform', None)
+        trade_dedup_window = configs.get('trade_dedup_window', 1000)
+        trade_gap_check = configs.get('trade_gap_check', True)
 
         if symbol is None:
             logger.error("symbol is None, check the config file!")
@@ -55,7 +58,8 @@ class Listener:
             error_callback=self._error_callback
         )
         self._last_ticker = dict()
-        self._last_trade = dict()
+        self._trade_sequencer = TradeSequencer(window=trade_dedup_window, check_gap=trade_gap_check,
+                                               gap_callback=self._trade_gap_callback)
         self.isInitialized = None
         self.silent = silent
 
@@ -164,6 +168,9 @@ class Listener:
         platform = trade.platform
 
         if trade:
+            if not self._trade_sequencer.check(trade):
+                return
+
             price = trade.price
             symbol = trade.symbol
             side = trade.side
@@ -178,22 +185,27 @@ class Listener:
                 'timestamp': timestamp
             }
 
-            if self._last_trade.get(symbol, None) != d:
-                self._last_trade[symbol] = copy.copy(d)
+            if self.influx:
+                self.influx.write_points([
+                    {
+                        "measurement": "trade",
+                        "fields": d
+                    }
+                ])
 
-                if self.influx:
-                    self.influx.write_points([
-                        {
-                            "measurement": "trade",
-                            "fields": d
-                        }
-                    ])
+            if self.file_writer_dict:
+                self.file_writer_dict[symbol]['trade'].write(OrderedDict(d))
 
-                if self.file_writer_dict:
-                    self.file_writer_dict[symbol]['trade'].write(OrderedDict(d))
+            if not self.silent:
+                logger.info(d)
 
-                if not self.silent:
-                    logger.info(d)
+    @property
+    def trade_stats(self):
+        """ 各币对成交去重和缺失计数 """
+        return self._trade_sequencer.stats
+
+    def _trade_gap_callback(self, symbol, last_id, trade_id):
+        logger.warning(f"trade gap: {symbol} {last_id} -> {trade_id}, missing {trade_id - last_id - 1}")
 
     async def _init_callback(self, tip, msg):
         logger.info(f"{tip}-------{msg}", caller=self)
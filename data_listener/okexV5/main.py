@@ -32,6 +32,9 @@ def main():
             configs["silent"] = config_dict['silent']
             configs["influx_database"] = config_dict['influx_database']
             configs["platform"] = config_dict["platform"]
+            configs["trade_dedup_window"] = config_dict.get("trade_dedup_window", 1000)
+            configs["trade_gap_check"] = config_dict.get("trade_gap_check", True)
+            configs["wss"] = config_dict.get("wss")
     else:
         config_file = None
 
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/24 10:00
+  @ Description: xuanwu.model.codec 编解码往返测试
+  @ History:
+    运行: python -m pytest -q tests
+"""
+import pytest
+from xuanwu.model import codec
+from xuanwu.model.market import Orderbook, Ticker, Trade, Kline
+from xuanwu.model.order import Order, Fill, ORDER_ACTION_BUY, ORDER_STATUS_PARTIAL_FILLED
+from xuanwu.model.position import Position
+from xuanwu.model.asset import Asset
+
+_UNSET = object()
+
+
+def _values(obj, fields):
+    return {field: getattr(obj, field, _UNSET) for field in fields}
+
+
+def _assert_round_trip(obj):
+    data = codec.encode(obj)
+    result = codec.decode(data)
+    assert type(result) is type(obj)
+    _, fields = codec._TYPE_IDS[type(obj)]
+    expect, got = _values(obj, fields), _values(result, fields)
+    assert got == expect
+    # 类型也要一致, e.g. 字符串价格不能变成float
+    for field in fields:
+        assert type(got[field]) is type(expect[field]), field
+    return result
+
+
+def _position():
+    position = Position(platform="okex_v5", account="acc", strategy="s1", symbol="BTC-USDT-SWAP")
+    position.margin_mode = "cross"
+    position.long_quantity = 3.0
+    position.long_avail_qty = 2.0
+    position.long_open_price = 43000.5
+    position.long_leverage = "10"
+    position.utime = "1634900000000"
+    # 交易所适配器额外设置的字段
+    position.leverage = "10"
+    position.long_pnl = -1.25
+    return position
+
+
+MODELS = [
+    Orderbook(platform="okex_v5", symbol="BTC-USDT-SWAP",
+              asks=[["43000.1", "5", "0", "2"], ["43000.2", "1", "0", "1"]],
+              bids=[["43000", "3", "0", "1"]], timestamp="1634900000000"),
+    Orderbook(platform="ftx", symbol="BTC-PERP", asks=[[43000.1, 5.0]], bids=[[43000.0, 3.0], [42999.5, 1.5]],
+              timestamp=1634900000.123),
+    Ticker(platform="okex_v5", symbol="BTC-USDT-SWAP", asks=43000.1, asks_volume=5.0, bids=43000.0, bids_volume=3.0,
+           best_price=43000.05, timestamp=1634900000000),
+    Trade(platform="okex_v5", symbol="BTC-USDT-SWAP", side="BUY", price="43000.1", trade_id="123456789",
+          quantity="2", timestamp="1634900000000", count=3),
+    Kline(platform="okex_v5", symbol="BTC-USDT-SWAP", open="43000", high="43100.5", low="42900", close="43050",
+          volume="1200", coin_volume="12", timestamp=1634900000000, kline_type="kline_1min"),
+    Order(account="acc", platform="okex_v5", strategy="s1", order_no="3712345678", symbol="BTC-USDT-SWAP",
+          action=ORDER_ACTION_BUY, price=43000.1, quantity=3, remain=1, status=ORDER_STATUS_PARTIAL_FILLED,
+          avg_price=43000.0, client_order_id="xwq1", trade_quantity=2, trade_price=43000.0,
+          ctime=1634900000000, utime=1634900000100),
+    Fill(platform="okex_v5", account="acc", symbol="BTC-USDT-SWAP", strategy="s1", order_no="3712345678",
+         fill_no="987", price="43000.1", quantity="2", side="buy", liquidity="M", fee="-0.01",
+         ctime="1634900000100"),
+    _position(),
+    Asset(platform="okex_v5", account="acc",
+          assets={"USDT": {"total": "100.5", "free": "90", "locked": "10.5"}, "BTC": {"total": 1.0}},
+          timestamp="1634900000000", update=True),
+]
+
+
+def test_every_registered_type_covered():
+    covered = {type(obj) for obj in MODELS}
+    assert covered == {cls for cls, _ in codec.SCHEMAS[codec.VERSION].values()}
+
+
+@pytest.mark.parametrize("obj", MODELS, ids=lambda obj: type(obj).__name__)
+def test_round_trip(obj):
+    _assert_round_trip(obj)
+
+
+def test_missing_slots_stay_unset():
+    position = _position()
+    assert not hasattr(position, "short_pnl")
+    result = _assert_round_trip(position)
+    assert not hasattr(result, "short_pnl")
+    assert result.long_pnl == -1.25
+
+    trade = Trade.__new__(Trade)
+    trade.symbol = "BTC-USDT-SWAP"
+    result = _assert_round_trip(trade)
+    assert not hasattr(result, "price")
+
+
+def test_big_int_and_scalars():
+    big = 1 << 70
+    ticker = Ticker(platform="p", symbol="s", asks=big, asks_volume=-big, bids=True, bids_volume=False,
+                    best_price=None, timestamp=(1 << 63) - 1)
+    result = _assert_round_trip(ticker)
+    assert result.asks == big and result.asks_volume == -big
+
+
+def test_strings():
+    long_symbol = "币" * 100  # 300字节, 超过短字符串长度
+    trade = Trade(platform="", symbol=long_symbol, side="SELL", price="1", trade_id="", quantity="1", timestamp="0")
+    _assert_round_trip(trade)
+
+
+def test_levels_containing_separator():
+    # 字符串中有分隔符时不能使用拼接编码, 回退到普通列表编码
+    asks = [["1\x1f2", "3"], ["4", "5"]]
+    assert codec._encode_levels(bytearray(), asks) is False
+    book = Orderbook(platform="p", symbol="s", asks=asks, bids=[["1", "2"]], timestamp=1)
+    result = _assert_round_trip(book)
+    assert result.asks == asks
+
+
+@pytest.mark.parametrize("levels", [
+    [],
+    [[1.0, 2.0], [3.0]],  # 档位字段数不一致
+    [[1.0, "2"]],  # 类型混合
+    [[1, 2]],  # 整数
+    [("1", "2")],  # tuple解码为list, 不使用紧凑编码
+    [["1", None]],
+])
+def test_irregular_levels(levels):
+    book = Orderbook(platform="p", symbol="s", asks=levels, bids=None, timestamp=1)
+    result = codec.decode(codec.encode(book))
+    assert result.asks == [list(level) for level in levels]
+
+
+def test_decode_older_version(monkeypatch):
+    fields = ("platform", "symbol", "side", "price")
+    monkeypatch.setitem(codec.SCHEMAS, 0, {codec.TYPE_TRADE: (Trade, fields)})
+    buf = bytearray(codec._HEADER.pack(codec.MAGIC, 0, codec.TYPE_TRADE))
+    for value in ("okex_v5", "BTC-USDT-SWAP", "BUY", "43000.1"):
+        codec._encode_value(buf, value)
+    result = codec.decode(bytes(buf))
+    assert type(result) is Trade
+    assert _values(result, fields) == {"platform": "okex_v5", "symbol": "BTC-USDT-SWAP", "side": "BUY",
+                                       "price": "43000.1"}
+    assert not hasattr(result, "trade_id")
+
+
+def test_decode_version_1_trade():
+    # 版本1的Trade没有count字段
+    _, fields = codec.SCHEMAS[1][codec.TYPE_TRADE]
+    buf = bytearray(codec._HEADER.pack(codec.MAGIC, 1, codec.TYPE_TRADE))
+    for value in ("okex_v5", "BTC-USDT-SWAP", "SELL", "43000.1", "1", "2", "1634900000000"):
+        codec._encode_value(buf, value)
+    result = codec.decode(bytes(buf))
+    assert _values(result, fields) == _values(Trade("okex_v5", "BTC-USDT-SWAP", "SELL", "43000.1", "1", "2",
+                                                    "1634900000000"), fields)
+    assert not hasattr(result, "count")
+
+
+def test_decode_errors():
+    data = codec.encode(MODELS[3])
+    with pytest.raises(ValueError):
+        codec.decode(b"\x00" + data[1:])  # magic
+    with pytest.raises(ValueError):
+        codec.decode(data[:1] + bytes([99]) + data[2:])  # 未知版本
+    with pytest.raises(ValueError):
+        codec.decode(data + b"\x00")  # 长度不一致
+    with pytest.raises(TypeError):
+        codec.encode(object())
+
+
+def test_records():
+    data = codec.pack_records(MODELS)
+    assert [type(obj) for obj in codec.iter_records(data)] == [type(obj) for obj in MODELS]
+    for obj, result in zip(MODELS, codec.iter_records(data)):
+        _, fields = codec._TYPE_IDS[type(obj)]
+        assert _values(result, fields) == _values(obj, fields)
+
+
+@pytest.mark.parametrize("cut", [1, 3, 5, 10])
+def test_iter_records_truncated_tail(cut):
+    data = codec.pack_records(MODELS[:3])
+    results = list(codec.iter_records(data[:-cut]))
+    assert [type(obj) for obj in results] == [type(obj) for obj in MODELS[:2]]
+    assert list(codec.iter_records(b"")) == []
+    assert list(codec.iter_records(data[:3])) == []
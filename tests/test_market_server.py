@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/25 18:00
+  @ Description: xuanwu.market_server 消息帧编解码和按主题分发测试
+  @ History:
+    运行: python -m pytest -q tests
+"""
+import asyncio
+from xuanwu.model.market import Trade
+from xuanwu.market_bus import market_bus
+from xuanwu.market_server import MarketServer, MarketClient, encode, decode, _FRAME, MSG_MODEL, MSG_SUBSCRIBE
+
+PLATFORM = "test"
+
+
+def _trade(symbol, trade_id="1"):
+    return Trade(platform=PLATFORM, symbol=symbol, side="BUY", price="43000.1", trade_id=trade_id, quantity="1",
+                 timestamp="1634900000000")
+
+
+def test_decode_rejects_non_model_frames():
+    frame = encode("trade", _trade("BTC-USDT-SWAP"))
+    _, msg_type = _FRAME.unpack(frame[:_FRAME.size])
+    assert msg_type == MSG_MODEL
+    channel, data = decode(msg_type, frame[_FRAME.size:])
+    assert channel == "trade" and data.price == "43000.1"
+    assert decode(MSG_SUBSCRIBE, b'{"platform": "test"}') == (None, None)
+
+
+def test_wildcard_topics(tmp_path):
+    async def run():
+        path = str(tmp_path / "market.sock")
+        server = MarketServer(path)
+        await server.start()
+        received = {"btc": [], "all": []}
+
+        async def on_btc(data):
+            received["btc"].append(data.trade_id)
+
+        async def on_all(data):
+            received["all"].append(data.trade_id)
+
+        client = MarketClient(path)
+        client.subscribe(PLATFORM, "trade", "BTC-USDT-SWAP", on_btc)
+        client.subscribe(PLATFORM, "trade", None, on_all)
+        await client.start()
+        for _ in range(100):
+            if len(server.stats["topics"]) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert server.stats["topics"] == {"test/trade/BTC-USDT-SWAP": 1, "test/trade": 1}
+
+        market_bus.publish(PLATFORM, "trade", "BTC-USDT-SWAP", _trade("BTC-USDT-SWAP", "1"))
+        market_bus.publish(PLATFORM, "trade", "ETH-USDT-SWAP", _trade("ETH-USDT-SWAP", "2"))
+        for _ in range(100):
+            if len(received["all"]) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        # 同时订阅两个主题时每条行情只收到一次
+        assert received == {"btc": ["1"], "all": ["1", "2"]}
+        await client.stop()
+        await server.stop()
+    asyncio.run(run())
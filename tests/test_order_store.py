@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/25 14:00
+  @ Description: xuanwu.model.order_store 索引、快照和实时视图测试
+  @ History:
+    运行: python -m pytest -q tests
+"""
+import gc
+from xuanwu.model.order import Order, ORDER_ACTION_BUY, ORDER_ACTION_SELL, ORDER_STATUS_SUBMITTED, \
+    ORDER_STATUS_PARTIAL_FILLED, ORDER_STATUS_FILLED, ORDER_STATUS_CANCELED
+from xuanwu.model.order_store import OrderStore
+
+SYMBOL = "BTC-USDT-SWAP"
+
+
+def _order(order_no, price, action=ORDER_ACTION_BUY, status=ORDER_STATUS_SUBMITTED, client_order_id=None,
+           symbol=SYMBOL):
+    return Order(platform="okex_v5", account="acc", strategy="s1", order_no=order_no, symbol=symbol, action=action,
+                 price=price, quantity=1, remain=1, status=status, client_order_id=client_order_id)
+
+
+def test_indexes():
+    store = OrderStore()
+    store.upsert(_order("1", 100, client_order_id="c1"))
+    store.upsert(_order("2", 100))
+    store.upsert(_order("3", 101, action=ORDER_ACTION_SELL))
+    store.upsert(_order("4", 50, symbol="ETH-USDT-SWAP"))
+    assert len(store) == 4 and "1" in store
+    assert store.get_by_client_id("c1").order_no == "1"
+    assert set(store.by_symbol(SYMBOL)) == {"1", "2", "3"}
+    assert set(store.open_orders(SYMBOL, ORDER_ACTION_BUY)) == {"1", "2"}
+    assert set(store.at_price(SYMBOL, ORDER_ACTION_BUY, 100)) == {"1", "2"}
+    assert set(store.by_status(ORDER_STATUS_SUBMITTED)) == {"1", "2", "3", "4"}
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == [100]
+    assert store.price_levels(SYMBOL, ORDER_ACTION_SELL) == [101]
+
+
+def test_upsert_moves_and_finished_removes():
+    store = OrderStore()
+    store.upsert(_order("1", 100, client_order_id="c1"))
+    previous = store.upsert(_order("1", 99, status=ORDER_STATUS_PARTIAL_FILLED, client_order_id="c1"))
+    assert previous.price == 100
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == [99]
+    assert not store.at_price(SYMBOL, ORDER_ACTION_BUY, 100)
+    assert set(store.by_status(ORDER_STATUS_PARTIAL_FILLED)) == {"1"}
+    assert not store.by_status(ORDER_STATUS_SUBMITTED)
+
+    removed = store.upsert(_order("1", 99, status=ORDER_STATUS_FILLED, client_order_id="c1"))
+    assert removed.order_no == "1"
+    assert len(store) == 0
+    assert store.get_by_client_id("c1") is None
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == []
+    assert store.upsert(_order("9", 1, status=ORDER_STATUS_CANCELED)) is None
+
+
+def test_snapshot_copy_on_write():
+    store = OrderStore()
+    store.upsert(_order("1", 100))
+    snapshot = store.snapshot()
+    assert store.snapshot() is snapshot
+    version = store.version
+    store.upsert(_order("2", 101))
+    store.remove("1")
+    assert set(snapshot) == {"1"}
+    assert set(store.snapshot()) == {"2"}
+    assert store.version == version + 2
+
+
+def test_live_view_survives_empty_bucket():
+    store = OrderStore()
+    view = store.open_orders(SYMBOL, ORDER_ACTION_BUY)
+    assert len(view) == 0
+    store.upsert(_order("1", 100))
+    assert set(view) == {"1"}
+    store.remove("1")
+    store.upsert(_order("2", 100))
+    assert set(view) == {"2"}
+    store.clear()
+    assert len(view) == 0
+    store.upsert(_order("3", 100))
+    assert set(view) == {"3"}
+    assert store.open_orders(SYMBOL, ORDER_ACTION_BUY) is view
+
+
+def test_released_views_do_not_keep_buckets():
+    store = OrderStore()
+    for price in range(1000):
+        assert not store.at_price(SYMBOL, ORDER_ACTION_BUY, price)
+    gc.collect()
+    assert store._by_price == {}
+    assert len(store._views) == 0
+
+    view = store.at_price(SYMBOL, ORDER_ACTION_BUY, 100)
+    store.upsert(_order("1", 100))
+    del view
+    gc.collect()
+    # 视图回收时索引桶非空, 之后清空时删除
+    store.remove("1")
+    assert store._by_price == {}
+
+    view = store.at_price(SYMBOL, ORDER_ACTION_BUY, 100)
+    store.upsert(_order("2", 100))
+    store.remove("2")
+    assert (SYMBOL, ORDER_ACTION_BUY, 100) in store._by_price
+    del view
+    gc.collect()
+    assert store._by_price == {}
+
+
+def test_price_levels_tracks_non_empty_prices_only():
+    store = OrderStore()
+    for i, price in enumerate([100, 99, 98, 99]):
+        store.upsert(_order(str(i), price))
+    view = store.at_price(SYMBOL, ORDER_ACTION_BUY, 97)
+    assert not view
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == [100, 99, 98]
+    store.remove("1")
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == [100, 99, 98]
+    store.remove("3")
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == [100, 98]
+    store.clear()
+    assert store.price_levels(SYMBOL, ORDER_ACTION_BUY) == []
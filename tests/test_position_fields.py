@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/25 10:00
+  @ Description: 各交易所适配器对Position赋值的字段都必须在__slots__中声明
+  @ History:
+    运行: python -m pytest -q tests
+"""
+import ast
+import copy
+import os
+import pytest
+import xuanwu.platforms
+from xuanwu.model import codec
+from xuanwu.model.position import Position
+
+_PLATFORMS = os.path.dirname(xuanwu.platforms.__file__)
+
+
+def _target_key(node):
+    """ 赋值目标的标识: 局部变量名 或 self.xxx """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return node.value.id + "." + node.attr
+    return None
+
+
+def _is_position_call(node):
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "Position"
+
+
+def _position_fields(path):
+    """ 找出模块中所有由Position(...)创建的对象, 并收集对其属性赋值的字段名 """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    assigns = [node for node in ast.walk(tree) if isinstance(node, ast.Assign)]
+    holders = set()
+    for node in assigns:
+        if _is_position_call(node.value):
+            holders.update(key for key in map(_target_key, node.targets) if key)
+    fields = set()
+    for node in assigns:
+        for target in node.targets:
+            if isinstance(target, ast.Attribute) and _target_key(target.value) in holders:
+                fields.add(target.attr)
+    return fields
+
+
+def _adapters():
+    result = []
+    for root, _, files in os.walk(_PLATFORMS):
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            fields = _position_fields(path)
+            if fields:
+                result.append(pytest.param(fields, id=os.path.relpath(path, _PLATFORMS)))
+    return result
+
+
+ADAPTERS = _adapters()
+
+
+def test_adapters_found():
+    assert len(ADAPTERS) >= 5
+
+
+@pytest.mark.parametrize("fields", ADAPTERS)
+def test_adapter_position_fields(fields):
+    assert fields <= set(Position.__slots__)
+    position = Position("p", "acc", "s1", "BTC-USDT-SWAP")
+    for i, field in enumerate(sorted(fields)):
+        setattr(position, field, float(i))
+    result = copy.copy(position)
+    for field in fields:
+        assert getattr(result, field) == getattr(position, field)
+    result = codec.decode(codec.encode(position))
+    for field in fields:
+        assert getattr(result, field) == getattr(position, field), field
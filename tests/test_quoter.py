@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/25 16:00
+  @ Description: xuanwu.utils.quoter 报价梯度差异比较和改单测试
+  @ History:
+    运行: python -m pytest -q tests
+"""
+import time
+import asyncio
+from xuanwu.model.order import ORDER_ACTION_BUY, ORDER_ACTION_SELL
+from xuanwu.utils.quoter import diff_ladder, LadderQuoter
+
+
+def test_diff_unchanged_levels():
+    live = {"1": (100, 1), "2": (99, 2)}
+    assert diff_ladder([(99, 2), (100, 1)], live) == ([], [], [])
+
+
+def test_diff_amend_pairs_by_price():
+    live = {"1": (100, 1), "2": (99, 1), "3": (98, 1)}
+    amends, creates, cancels = diff_ladder([(100, 1), (97, 1), (96, 3)], live)
+    # 未匹配的挂单 98, 99 与目标 96, 97 按价格顺序配对
+    assert amends == [("3", 96, 3), ("2", 97, 1)]
+    assert creates == [] and cancels == []
+
+
+def test_diff_surplus_creates_and_cancels():
+    amends, creates, cancels = diff_ladder([(100, 1), (99, 1), (98, 1)], {"1": (97, 1)})
+    assert amends == [("1", 98, 1)]
+    assert creates == [(99, 1), (100, 1)]
+    assert cancels == []
+
+    amends, creates, cancels = diff_ladder([(100, 1)], {"1": (100, 1), "2": (99, 1), "3": (101, 1)})
+    assert amends == [] and creates == []
+    assert sorted(cancels) == ["2", "3"]
+
+
+def test_diff_same_level_twice():
+    amends, creates, cancels = diff_ladder([(100, 1), (100, 1)], {"1": (100, 1)})
+    assert (amends, creates, cancels) == ([], [(100, 1)], [])
+
+
+class _Exchange:
+    """ 记录报价请求的假交易对象, 新下单的订单号递增 """
+
+    def __init__(self):
+        self.orders = {ORDER_ACTION_BUY: {}, ORDER_ACTION_SELL: {}}  # 交易所已确认的挂单
+        self.calls = []
+        self.gate = None  # 设置之后send等待该事件
+        self._next = 0
+
+    def live_orders(self, action):
+        return self.orders[action]
+
+    async def send(self, amends, creates, cancels):
+        self.calls.append((amends, creates, cancels))
+        if self.gate:
+            await self.gate.wait()
+        create_results = []
+        for _ in creates:
+            self._next += 1
+            create_results.append((f"n{self._next}", None))
+        return [(a[0], None) for a in amends], create_results, [(c, None) for c in cancels]
+
+
+def test_quoter_pending_until_confirmed():
+    async def run():
+        exchange = _Exchange()
+        quoter = LadderQuoter(exchange.live_orders, exchange.send, pending_ttl=10)
+        stats, error = await quoter.requote([(100, 1)], [(101, -2)])
+        assert error is None
+        assert stats == {"amend": 0, "create": 2, "cancel": 0}
+        # 推送确认之前使用请求中的目标值, 同样的报价不再发送
+        assert quoter.live(ORDER_ACTION_BUY) == {"n1": (100, 1, 0)}
+        assert quoter.live(ORDER_ACTION_SELL) == {"n2": (101, 2, 0)}
+        stats, _ = await quoter.requote([(100, 1)], [(101, -2)])
+        assert stats == {"amend": 0, "create": 0, "cancel": 0}
+        assert len(exchange.calls) == 1
+        # 新下单保留数量符号
+        assert exchange.calls[0][1] == [(ORDER_ACTION_BUY, 100, 1), (ORDER_ACTION_SELL, 101, -2)]
+
+        exchange.orders[ORDER_ACTION_BUY] = {"n1": (100, 1, 0)}
+        assert quoter.live(ORDER_ACTION_BUY) == {"n1": (100, 1, 0)}
+        assert "n1" not in quoter._pending
+
+        stats, _ = await quoter.requote([(99, 1)], [])
+        assert stats == {"amend": 1, "create": 0, "cancel": 1}
+        assert exchange.calls[-1] == ([("n1", 99, 1, 0)], [], ["n2"])
+        assert quoter.live(ORDER_ACTION_BUY) == {"n1": (99, 1, 0)}
+        assert quoter.live(ORDER_ACTION_SELL) == {}
+    asyncio.run(run())
+
+
+def test_quoter_pending_ttl_expires():
+    async def run():
+        exchange = _Exchange()
+        exchange.orders[ORDER_ACTION_SELL] = {"s1": (105, 1, 0)}
+        quoter = LadderQuoter(exchange.live_orders, exchange.send, pending_ttl=0.05)
+        await quoter.requote([(100, 1)], [])
+        assert quoter.live(ORDER_ACTION_BUY) == {"n1": (100, 1, 0)}
+        assert quoter.live(ORDER_ACTION_SELL) == {}
+        time.sleep(0.06)
+        # 超时没有收到推送, 以交易所挂单为准
+        assert quoter.live(ORDER_ACTION_BUY) == {}
+        assert quoter.live(ORDER_ACTION_SELL) == {"s1": (105, 1, 0)}
+        assert not quoter._pending and not quoter._canceling
+    asyncio.run(run())
+
+
+def test_quoter_coalesces_in_flight_requotes():
+    async def run():
+        exchange = _Exchange()
+        exchange.gate = asyncio.Event()
+        quoter = LadderQuoter(exchange.live_orders, exchange.send, pending_ttl=10)
+        first = asyncio.ensure_future(quoter.requote([(100, 1)], []))
+        await asyncio.sleep(0)
+        assert quoter.in_flight
+        assert await quoter.requote([(99, 1)], []) == (None, None)
+        assert await quoter.requote([(98, 1)], []) == (None, None)
+        exchange.gate.set()
+        stats, error = await first
+        assert error is None
+        assert not quoter.in_flight
+        # 中间的报价被丢弃, 只执行最新一次: 第一次下单之后改单到98
+        assert len(exchange.calls) == 2
+        assert exchange.calls[1] == ([("n1", 98, 1, 0)], [], [])
+        assert stats == {"amend": 1, "create": 1, "cancel": 0}
+    asyncio.run(run())
+
+
+def test_quoter_send_errors():
+    async def run():
+        exchange = _Exchange()
+        exchange.orders[ORDER_ACTION_BUY] = {"b1": (90, 1, 0)}
+
+        async def send(amends, creates, cancels):
+            return [], [(None, "create failed")], [(cancels[0], "cancel failed")]
+        quoter = LadderQuoter(exchange.live_orders, send, pending_ttl=10)
+        stats, error = await quoter.requote([], [(110, -1)])
+        assert stats == {"amend": 0, "create": 1, "cancel": 1}
+        assert error == ["create failed", "cancel failed"]
+        # 撤单失败的挂单恢复可见
+        assert quoter.live(ORDER_ACTION_BUY) == {"b1": (90, 1, 0)}
+        assert quoter.live(ORDER_ACTION_SELL) == {}
+    asyncio.run(run())
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/25 16:30
+  @ Description: xuanwu.utils.rate_limiter 令牌桶、规则匹配和按优先级分发测试
+  @ History:
+    运行: python -m pytest -q tests
+"""
+import time
+import asyncio
+import pytest
+from xuanwu import const
+from xuanwu.utils.rate_limiter import RateLimiter, TokenBucket, PRIORITY_ORDER, PRIORITY_QUERY
+
+
+def _rules(limit=2, interval=0.2, order_weight=1):
+    # 同名规则共享一个令牌桶
+    return [
+        {"name": "shared", "paths": ["/query"], "limit": limit, "interval": interval, "scope": "account"},
+        {"name": "shared", "paths": ["/order"], "limit": limit, "interval": interval, "scope": "account",
+         "priority": PRIORITY_ORDER, "weight": order_weight},
+        {"name": "other", "paths": ["/other"], "limit": limit, "interval": interval, "scope": "account"},
+    ]
+
+
+async def _acquire(limiter, path, log, account="acc"):
+    await limiter.acquire("POST", path, account=account)
+    log.append(path)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(2, 1)
+    assert bucket.wait_time(1) == 0
+    bucket.consume(2)
+    assert bucket.wait_time(1) == pytest.approx(0.5, abs=0.01)
+    assert bucket.wait_time(10) == pytest.approx(1, abs=0.01)  # 超过容量按容量计算
+    bucket.pause(3)
+    assert bucket.wait_time(1) == pytest.approx(3.5, abs=0.01)
+
+
+def test_match_rules():
+    limiter = RateLimiter(const.OKEX_V5)
+    demands, priority = limiter._resolve("POST", "/api/v5/trade/order", "acc", None, None)
+    assert priority == PRIORITY_ORDER and len(demands) == 1
+    demands, priority = limiter._resolve("GET", "/api/v5/trade/order?ordId=1", "acc", None, None)
+    assert priority == PRIORITY_QUERY and len(demands) == 1
+    demands, _ = limiter._resolve("POST", "/api/v5/trade/batch-orders", "acc", None, [{}, {}, {}])
+    assert demands[0][1] == 3
+    # 没有匹配的接口使用默认规则, 账户作用域按账户区分令牌桶
+    bucket_a = limiter._resolve("GET", "/api/v5/unknown", "a", None, None)[0][0][0]
+    bucket_b = limiter._resolve("GET", "/api/v5/unknown", "b", None, None)[0][0][0]
+    assert bucket_a is not bucket_b
+
+
+def test_immediate_when_tokens_available():
+    async def run():
+        limiter = RateLimiter("test", rules=_rules())
+        start = time.monotonic()
+        log = []
+        await _acquire(limiter, "/query", log)
+        await _acquire(limiter, "/order", log)
+        assert time.monotonic() - start < 0.05
+        assert not limiter._waiters
+    asyncio.run(run())
+
+
+def test_orders_dispatched_before_queries():
+    async def run():
+        limiter = RateLimiter("test", rules=_rules(limit=1, interval=0.05))
+        log = []
+        await _acquire(limiter, "/query", log)
+        # 令牌用完之后排队: 先到的查询请求在下单请求之后获得令牌
+        tasks = [asyncio.ensure_future(_acquire(limiter, "/query", log)),
+                 asyncio.ensure_future(_acquire(limiter, "/query", log)),
+                 asyncio.ensure_future(_acquire(limiter, "/order", log))]
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert log == ["/query", "/order", "/query", "/query"]
+    asyncio.run(run())
+
+
+def test_waiting_order_blocks_bucket_for_queries():
+    async def run():
+        limiter = RateLimiter("test", rules=_rules(limit=2, interval=0.2, order_weight=2))
+        log = []
+        await _acquire(limiter, "/query", log)
+        # 剩余1个令牌: 下单需要2个令牌, 等待期间查询不能占用剩余的令牌
+        order = asyncio.ensure_future(_acquire(limiter, "/order", log))
+        await asyncio.sleep(0)
+        query = asyncio.ensure_future(_acquire(limiter, "/query", log))
+        other = asyncio.ensure_future(_acquire(limiter, "/other", log))
+        await asyncio.wait_for(asyncio.gather(order, query, other), 1)
+        # 不相关的令牌桶不受影响
+        assert log == ["/query", "/other", "/order", "/query"]
+    asyncio.run(run())
+
+
+def test_penalize_pauses_matched_bucket():
+    async def run():
+        limiter = RateLimiter("test", rules=_rules(limit=10, interval=1), penalty=0.1)
+        limiter.penalize("POST", "/order", account="acc")
+        log = []
+        start = time.monotonic()
+        await asyncio.wait_for(_acquire(limiter, "/query", log), 1)
+        assert time.monotonic() - start >= 0.09
+        await _acquire(limiter, "/query", log, account="another")
+        await _acquire(limiter, "/other", log)
+        assert len(log) == 3
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/25 17:00
+  @ Description: xuanwu.utils.trade_seq 成交去重和缺失检测测试
+  @ History:
+    运行: python -m pytest -q tests
+"""
+from xuanwu.model.market import Trade
+from xuanwu.utils.trade_seq import TradeSequencer
+
+SYMBOL = "BTC-USDT-SWAP"
+
+
+def _trade(trade_id, count=None, symbol=SYMBOL, price="43000.1", timestamp="1634900000000"):
+    return Trade(platform="okex_v5", symbol=symbol, side="BUY", price=price, trade_id=trade_id, quantity="1",
+                 timestamp=timestamp, count=count)
+
+
+def _check(sequencer, *trade_ids):
+    return [sequencer.check(_trade(str(i))) for i in trade_ids]
+
+
+def test_duplicates():
+    sequencer = TradeSequencer(window=3)
+    assert _check(sequencer, 1, 2, 2, 3, 1) == [True, True, False, True, False]
+    # 超出窗口的成交id不再去重
+    assert _check(sequencer, 4, 1) == [True, True]
+    stats = sequencer.stats[SYMBOL]
+    assert stats["received"] == 7 and stats["duplicates"] == 2
+
+
+def test_gap_and_late():
+    gaps = []
+    sequencer = TradeSequencer(gap_callback=lambda *args: gaps.append(args))
+    _check(sequencer, 10, 11, 15)
+    assert gaps == [(SYMBOL, 11, 15)]
+    stats = sequencer.stats[SYMBOL]
+    assert (stats["gaps"], stats["missing"], stats["last_id"]) == (1, 3, 15)
+
+    _check(sequencer, 13, 12)
+    stats = sequencer.stats[SYMBOL]
+    assert (stats["late"], stats["missing"], stats["last_id"]) == (2, 1, 15)
+    _check(sequencer, 14, 16)
+    stats = sequencer.stats[SYMBOL]
+    assert (stats["gaps"], stats["missing"], stats["late"]) == (1, 0, 3)
+    # 缺失数不会小于0
+    _check(sequencer, 9)
+    assert sequencer.stats[SYMBOL]["missing"] == 0
+
+
+def test_aggregated_trades():
+    gaps = []
+    sequencer = TradeSequencer(gap_callback=lambda *args: gaps.append(args))
+    assert sequencer.check(_trade("100"))
+    # 合并推送覆盖 101 ~ 103, 不是缺失
+    assert sequencer.check(_trade("103", count=3))
+    assert sequencer.stats[SYMBOL]["gaps"] == 0
+    # 合并推送覆盖 106 ~ 107, 缺失 104 ~ 105, 回调参数是第一笔成交的id
+    assert sequencer.check(_trade("107", count="2"))
+    assert gaps == [(SYMBOL, 103, 106)]
+    stats = sequencer.stats[SYMBOL]
+    assert (stats["missing"], stats["last_id"]) == (2, 107)
+    # 晚到的合并推送按笔数补回缺失
+    assert sequencer.check(_trade("105", count=2))
+    assert sequencer.stats[SYMBOL]["missing"] == 0
+
+
+def test_trades_without_id():
+    sequencer = TradeSequencer()
+    assert sequencer.check(_trade(None))
+    assert not sequencer.check(_trade(""))
+    assert sequencer.check(_trade(None, price="43000.2"))
+    stats = sequencer.stats[SYMBOL]
+    assert (stats["no_id"], stats["duplicates"], stats["gaps"]) == (3, 1, 0)
+
+
+def test_non_integer_ids_and_check_gap_off():
+    sequencer = TradeSequencer()
+    assert _check(sequencer, "a1", "a3", "a1") == [True, True, False]
+    assert sequencer.stats[SYMBOL]["gaps"] == 0
+
+    sequencer = TradeSequencer(check_gap=False)
+    _check(sequencer, 1, 5)
+    assert sequencer.stats[SYMBOL]["gaps"] == 0
+
+
+def test_symbols_and_reset():
+    sequencer = TradeSequencer()
+    _check(sequencer, 1, 5)
+    assert sequencer.check(_trade("1", symbol="ETH-USDT-SWAP"))
+    assert sequencer.stats["ETH-USDT-SWAP"]["gaps"] == 0
+    sequencer.reset(SYMBOL)
+    assert SYMBOL not in sequencer.stats
+    # 重置之后不把断线期间的成交计为缺失
+    _check(sequencer, 20)
+    assert sequencer.stats[SYMBOL]["gaps"] == 0
+    sequencer.reset()
+    assert sequencer.stats == {}
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 10:00
+  @ Description: 基于逐笔成交实时合成K线(时间K线、成交量K线、成交额K线)
+  @ History:
+"""
+from array import array
+from xuanwu.utils import logger
+from xuanwu.utils import tools
+from xuanwu.tasks import SingleTask, LoopRunTask
+from xuanwu.model.market import Kline, Trade
+
+__all__ = ("BarBuilder", "BarRing", )
+
+# 时间K线级别单位, e.g. `1s`, `1m`, `5m`, `1h`, `1d`
+INTERVAL_UNITS = {
+    "s": 1000,
+    "m": 60 * 1000,
+    "h": 60 * 60 * 1000,
+    "d": 24 * 60 * 60 * 1000
+}
+
+BAR_TYPE_VOLUME = "volume"  # 成交量K线, kline_type e.g. `volume_100`
+BAR_TYPE_DOLLAR = "dollar"  # 成交额K线, kline_type e.g. `dollar_1000000`
+
+# 进行中K线字段下标
+_START, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _TURNOVER = range(7)
+
+
+def interval_to_ms(interval):
+    """ 时间K线级别转换为毫秒
+    Attributes:
+        :param interval: K线级别, e.g. `1s`, `1m`, `5m`, `4h`, `1d`
+    :returns:
+        :return: 毫秒数, 格式错误返回None
+    """
+    unit = INTERVAL_UNITS.get(interval[-1:].lower())
+    if not unit or not interval[:-1].isdigit() or int(interval[:-1]) <= 0:
+        return None
+    return int(interval[:-1]) * unit
+
+
+class BarRing:
+    """ 定长环形K线缓存, 按列存储在`array`中, 写满之后覆盖最旧的K线.
+
+    Attributes:
+        capacity: 缓存K线数量.
+    """
+
+    __slots__ = ("_capacity", "_head", "_count", "_ts", "_open", "_high", "_low", "_close", "_volume", "_turnover")
+
+    def __init__(self, capacity=1000):
+        self._capacity = capacity
+        self._head = 0  # 下一次写入的位置
+        self._count = 0
+        self._ts = array("q", [0]) * capacity
+        self._open = array("d", [0.0]) * capacity
+        self._high = array("d", [0.0]) * capacity
+        self._low = array("d", [0.0]) * capacity
+        self._close = array("d", [0.0]) * capacity
+        self._volume = array("d", [0.0]) * capacity
+        self._turnover = array("d", [0.0]) * capacity
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, open, high, low, close, volume, turnover):
+        i = self._head
+        self._ts[i] = timestamp
+        self._open[i] = open
+        self._high[i] = high
+        self._low[i] = low
+        self._close[i] = close
+        self._volume[i] = volume
+        self._turnover[i] = turnover
+        self._head = (i + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def latest(self, n=None):
+        """ 获取最近的n根K线, 按时间从旧到新排列
+        Attributes:
+            :param n: K线数量, 默认返回全部缓存
+        :returns:
+            :return: [(timestamp, open, high, low, close, volume, turnover), ...]
+        """
+        n = self._count if n is None else min(n, self._count)
+        result = []
+        for k in range(n, 0, -1):
+            i = (self._head - k) % self._capacity
+            result.append((self._ts[i], self._open[i], self._high[i], self._low[i], self._close[i],
+                           self._volume[i], self._turnover[i]))
+        return result
+
+
+class BarBuilder:
+    """ 逐笔成交合成K线.
+
+    将`trade_update_callback`指向`BarBuilder.on_trade`, 每根K线收盘后通过`kline_update_callback`推送`Kline`对象.
+    时间K线按成交时间戳所属的时间窗口归档, 没有成交的时间窗口不产生K线; 心跳任务会在窗口结束之后关闭长时间没有
+    新成交的K线. `Kline.volume`为成交数量之和, `Kline.coin_volume`为成交额(price * quantity)之和.
+
+    Attributes:
+        platform: 交易所名称, 为空时使用成交数据中的交易所名称.
+        intervals: 时间K线级别列表, e.g. ["1s", "1m", "5m"].
+        volume_bars: 成交量K线阈值, 数值或者`{symbol: 阈值}`, 成交量累计达到阈值时收盘.
+        dollar_bars: 成交额K线阈值, 数值或者`{symbol: 阈值}`, 成交额累计达到阈值时收盘.
+        buffer_size: 每个币对每种K线缓存的已收盘K线数量, 默认1000.
+        close_delay: 时间窗口结束之后等待迟到成交的时间(毫秒), 默认1000.
+        flush_interval: 心跳检查时间K线收盘的间隔(秒), 0表示只在新成交到达时收盘, 默认1.
+        kline_update_callback: K线收盘回调函数，异步执行.
+        trade_update_callback: 成交数据转发回调函数，异步执行，可选.
+    """
+
+    def __init__(self, platform=None, intervals=None, volume_bars=None, dollar_bars=None, buffer_size=1000,
+                 close_delay=1000, flush_interval=1, kline_update_callback=None, trade_update_callback=None):
+        self._platform = platform
+        self._intervals = {}  # {kline_type: interval_ms}
+        for interval in intervals or []:
+            ms = interval_to_ms(interval)
+            if not ms:
+                logger.error("interval error! interval:", interval, caller=self)
+                continue
+            self._intervals[interval] = ms
+        self._volume_bars = volume_bars
+        self._dollar_bars = dollar_bars
+        self._buffer_size = buffer_size
+        self._close_delay = close_delay
+        self._kline_update_callback = kline_update_callback
+        self._trade_update_callback = trade_update_callback
+
+        self._bars = {}  # 进行中的K线. `{(symbol, kline_type): [start, open, high, low, close, volume, turnover]}`
+        self._rings = {}  # 已收盘K线. `{(symbol, kline_type): BarRing}`
+        self._closed = {}  # 最近一根已收盘时间K线的开始时间. `{(symbol, kline_type): start}`
+        self._platforms = {}  # `{symbol: platform}`
+
+        if self._intervals and flush_interval > 0:
+            LoopRunTask.register(self._flush_expired, flush_interval)
+
+    async def on_trade(self, trade: Trade):
+        """ 成交数据回调, 签名与`trade_update_callback`一致
+        """
+        if self._trade_update_callback:
+            SingleTask.run(self._trade_update_callback, trade)
+        try:
+            price = float(trade.price)
+            quantity = float(trade.quantity)
+            ts = int(float(trade.timestamp))
+        except (TypeError, ValueError):
+            logger.warn("trade format error! trade:", trade, caller=self)
+            return
+        symbol = trade.symbol
+        self._platforms[symbol] = self._platform or trade.platform
+
+        for kline_type, interval_ms in self._intervals.items():
+            start = ts - ts % interval_ms
+            key = (symbol, kline_type)
+            if start <= self._closed.get(key, -1):
+                # 所属窗口已收盘的迟到成交
+                logger.debug("late trade dropped, kline_type:", kline_type, "trade:", trade, caller=self)
+                continue
+            bar = self._bars.get(key)
+            if bar:
+                if start > bar[_START]:
+                    self._close_bar(key)
+                    bar = None
+            self._update_bar(key, bar, start, price, quantity)
+
+        threshold = self._threshold(self._volume_bars, symbol)
+        if threshold:
+            key = (symbol, f"{BAR_TYPE_VOLUME}_{threshold}")
+            bar = self._update_bar(key, self._bars.get(key), ts, price, quantity)
+            if bar[_VOLUME] >= threshold:
+                self._close_bar(key)
+
+        threshold = self._threshold(self._dollar_bars, symbol)
+        if threshold:
+            key = (symbol, f"{BAR_TYPE_DOLLAR}_{threshold}")
+            bar = self._update_bar(key, self._bars.get(key), ts, price, quantity)
+            if bar[_TURNOVER] >= threshold:
+                self._close_bar(key)
+
+    def bars(self, symbol, kline_type, n=None):
+        """ 获取已收盘的K线
+        Attributes:
+            :param symbol: 交易币对名称
+            :param kline_type: K线级别, e.g. `1m`, `volume_100`
+            :param n: K线数量, 默认返回全部缓存
+        :returns:
+            :return: Kline列表, 按时间从旧到新排列
+        """
+        ring = self._rings.get((symbol, kline_type))
+        if not ring:
+            return []
+        return [self._make_kline(symbol, kline_type, *b) for b in ring.latest(n)]
+
+    def current_bar(self, symbol, kline_type):
+        """ 获取进行中的K线, 没有则返回None
+        """
+        bar = self._bars.get((symbol, kline_type))
+        if not bar:
+            return None
+        return self._make_kline(symbol, kline_type, *bar)
+
+    def _threshold(self, bars, symbol):
+        if isinstance(bars, dict):
+            return bars.get(symbol)
+        return bars
+
+    def _update_bar(self, key, bar, start, price, quantity):
+        if not bar:
+            bar = [start, price, price, price, price, 0.0, 0.0]
+            self._bars[key] = bar
+        if price > bar[_HIGH]:
+            bar[_HIGH] = price
+        if price < bar[_LOW]:
+            bar[_LOW] = price
+        bar[_CLOSE] = price
+        bar[_VOLUME] += quantity
+        bar[_TURNOVER] += price * quantity
+        return bar
+
+    def _close_bar(self, key):
+        bar = self._bars.pop(key, None)
+        if not bar:
+            return
+        ring = self._rings.get(key)
+        if not ring:
+            ring = BarRing(self._buffer_size)
+            self._rings[key] = ring
+        ring.append(*bar)
+        if key[1] in self._intervals:
+            self._closed[key] = bar[_START]
+        if self._kline_update_callback:
+            SingleTask.run(self._kline_update_callback, self._make_kline(key[0], key[1], *bar))
+
+    def _make_kline(self, symbol, kline_type, start, open, high, low, close, volume, turnover):
+        return Kline(platform=self._platforms.get(symbol, self._platform), symbol=symbol, open=open, high=high,
+                     low=low, close=close, volume=volume, coin_volume=turnover, timestamp=start,
+                     kline_type=kline_type)
+
+    async def _flush_expired(self, *args, **kwargs):
+        """ 心跳任务: 关闭时间窗口已经结束的时间K线
+        """
+        now = tools.get_cur_timestamp_ms()
+        for key in list(self._bars.keys()):
+            interval_ms = self._intervals.get(key[1])
+            if not interval_ms:
+                continue
+            if now >= self._bars[key][_START] + interval_ms + self._close_delay:
+                self._close_bar(key)
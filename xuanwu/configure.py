@@ -26,6 +26,8 @@ class Configure:
             PHONE_CALL：电话报警配置
             ACCOUNTS: 交易账户配置列表, 默认是 [].
             HEARTBEAT: 服务心跳配置, 默认是 {}.
+            HTTP: HTTP连接池配置, 默认是 {}, 参考`xuanwu.utils.http_client.AsyncHttpRequests.configure`.
+            MARKET_SERVER: 本机行情分发服务配置, 默认是 {}, 参考`xuanwu.market_server.MarketServer`.
     """
 
     def __init__(self):
@@ -42,6 +44,8 @@ class Configure:
         self.accounts = []
         self.markets = {}
         self.heartbeat = {}
+        self.http = {}
+        self.market_server = {}
         self.proxy = None
 
     def loads(self, config_file=None) -> None:
@@ -102,6 +106,8 @@ class Configure:
         self.accounts = update_fields.get("ACCOUNTS", [])
         self.markets = update_fields.get("MARKETS", {})
         self.heartbeat = update_fields.get("HEARTBEAT", {})
+        self.http = update_fields.get("HTTP", {})
+        self.market_server = update_fields.get("MARKET_SERVER", {})
         self.proxy = update_fields.get("PROXY", None)
 
         for k, v in update_fields.items():
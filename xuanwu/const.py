@@ -23,7 +23,9 @@ OKEX_SWAP = "okex_swap"  # okex永续
 OKEX_U_SWAP = "okex_u_swap"  # okex永续
 OKEX_V5 = "okex_v5"  # okex V5
 BINANCE_U_SWAP = "binance_u_swap"
+GATEIO = "gateio"  # Gate.io USDT永续
 FTX = "ftx"
+REPLAY = "replay"  # 历史数据回放
 
 # 频道类型常量
 CHANNEL_TYPE = ["spot", "margin", "futures", "swap", "option"]
@@ -9,7 +9,7 @@
 import time
 import operator
 from xuanwu.tasks import SingleTask
-from xuanwu.platforms.ftx.ftx import FTXMarket
+from xuanwu.market_bus import market_bus
 from xuanwu.configure import config
 from xuanwu.model.market import Orderbook
 from xuanwu.utils import logger
@@ -27,15 +27,11 @@ class SpreadCount:
         self.futu_symbol = futu_symbol
         self.perp_symbol = perp_symbol
         self._decimal = decimal
-        FTXMarket(
-            platform=config.accounts["platform"],
-            symbols=[self.futu_symbol, self.perp_symbol],
-            channels=["orderbook"],
-            orderbook_length=1,
-            orderbook_update_callback=self._orderbook_update_callback,
-            init_callback=self._init_callback,
-            error_callback=self._error_callback
-        )
+        # 通过行情总线订阅, 两个币对共用一个行情连接, 其他策略订阅同一盘口时也共享该连接
+        for symbol in [self.futu_symbol, self.perp_symbol]:
+            market_bus.subscribe(config.accounts["platform"], "orderbook", symbol, self._orderbook_update_callback,
+                                 orderbook_length=1, init_callback=self._init_callback,
+                                 error_callback=self._error_callback)
 
         self._futu_orderbook = {}  # 交割合约盘口
         self._swap_orderbook = {}  # 永续合约盘口
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/22 14:00
+  @ Description: 进程内行情数据总线
+  @ History:
+    1. 行情适配器(OkexV5Market / FTXMarket)把解析好的行情对象发布到主题 (platform, channel, symbol), 每条数据只解析一次;
+    2. 任意数量的消费者按主题订阅, 可以附加过滤函数;
+    3. 同一主题的多个订阅按引用计数共享同一个交易所行情连接;
+    4. 同一轮事件循环中订阅的同一交易所同一频道、连接参数相同的多个币对合并为一个行情连接.
+    使用:
+        sub_id = market_bus.subscribe(OKEX_V5, "orderbook", "BTC-USDT-SWAP", on_orderbook)
+        market_bus.subscribe(OKEX_V5, "trade", "BTC-USDT-SWAP", on_big_trade, filter=lambda t: float(t.quantity) > 100)
+        market_bus.unsubscribe(sub_id)
+
+    NOTE:
+        同一个行情对象会分发给所有消费者, 消费者不能修改收到的对象, 需要修改时请自行复制.
+"""
+import asyncio
+import itertools
+from xuanwu import const
+from xuanwu.utils import logger
+from xuanwu.tasks import SingleTask
+
+__all__ = ("market_bus", "MarketBus", )
+
+# 频道名称对应的行情回调参数
+CALLBACK_KWARGS = {
+    "orderbook": "orderbook_update_callback",
+    "trade": "trade_update_callback",
+    "kline": "kline_update_callback",
+    "ticker": "ticker_update_callback",
+}
+
+
+def _okex_v5_stream(symbols, channel, callback, **kwargs):
+    from xuanwu.platforms.okex_v5.okex_v5_market import OkexV5Market
+    return OkexV5Market(platform=const.OKEX_V5, symbols=symbols, channels=[channel],
+                        **{CALLBACK_KWARGS[channel]: callback}, **kwargs)
+
+
+def _ftx_stream(symbols, channel, callback, **kwargs):
+    from xuanwu.platforms.ftx.ftx import FTXMarket
+    return FTXMarket(platform=const.FTX, symbols=symbols, channels=[channel],
+                     **{CALLBACK_KWARGS[channel]: callback}, **kwargs)
+
+
+# 行情连接创建函数, `factory(symbols, channel, callback, **kwargs)` 返回行情适配器对象
+STREAMS = {
+    const.OKEX_V5: _okex_v5_stream,
+    const.FTX: _ftx_stream,
+}
+
+
+class MarketBus:
+    """ 行情数据总线, 通过进程内共享实例`market_bus`使用.
+    """
+
+    def __init__(self):
+        self._subscribers = {}  # {(platform, channel, symbol): {sub_id: (callback, filter)}}, symbol为None表示全部币对
+        self._topics = {}  # 订阅id对应的主题. e.g. {sub_id: (platform, channel, symbol), ... }
+        self._streams = {}  # 交易所行情连接, 等待创建时是None. e.g. {(platform, channel, symbol): adapter, ... }
+        self._pending = []  # 等待创建的行情连接. e.g. [(platform, channel, kwargs, [symbol, ...]), ... ]
+        self._pending_handle = None
+        self._refs = {}  # 主题引用计数. e.g. {(platform, channel, symbol): 2, ... }
+        self._ids = itertools.count(1)
+
+    @property
+    def stats(self):
+        """ 各主题的订阅数, e.g. {"okex_v5/orderbook/BTC-USDT-SWAP": 2, ... } """
+        return {"/".join(k for k in topic if k): count for topic, count in self._refs.items()}
+
+    def register_stream(self, platform, factory):
+        """ 注册交易所行情连接创建函数, 参考`STREAMS` """
+        STREAMS[platform] = factory
+
+    def subscribe(self, platform, channel, symbol, callback, filter=None, **kwargs):
+        """ 订阅行情
+
+        Attributes:
+            :param platform: 交易所名称, e.g. okex_v5.
+            :param channel: 频道, orderbook / trade / kline / ticker.
+            :param symbol: 交易币对, None表示只监听该交易所该频道已经发布的全部币对, 不建立行情连接.
+            :param callback: 异步回调函数, `async def callback(data): pass`.
+            :param filter: 过滤函数, `filter(data)`返回False时不回调.
+            :param kwargs: 建立行情连接的其他参数, e.g. orderbook_length / init_callback / error_callback,
+                           只在第一次订阅该主题时生效.
+        :returns:
+            :return sub_id: 订阅id, 用于取消订阅.
+        """
+        topic = (platform, channel, symbol)
+        sub_id = next(self._ids)
+        self._subscribers.setdefault(topic, {})[sub_id] = (callback, filter)
+        self._topics[sub_id] = topic
+        self._refs[topic] = self._refs.get(topic, 0) + 1
+        if symbol is not None and topic not in self._streams:
+            self._add_stream(platform, channel, symbol, kwargs)
+        return sub_id
+
+    def unsubscribe(self, sub_id):
+        """ 取消订阅, 主题没有订阅者之后不再分发数据, 行情连接保留给之后的订阅复用 """
+        topic = self._topics.pop(sub_id, None)
+        if not topic:
+            return
+        self._subscribers[topic].pop(sub_id, None)
+        self._refs[topic] -= 1
+        if self._refs[topic] <= 0:
+            self._refs.pop(topic)
+            self._subscribers.pop(topic)
+
+    def publish(self, platform, channel, symbol, data):
+        """ 发布行情数据, 分发给该主题和该频道全部币对的订阅者 """
+        for topic in ((platform, channel, symbol), (platform, channel, None)):
+            subscribers = self._subscribers.get(topic)
+            if not subscribers:
+                continue
+            for callback, filter_ in list(subscribers.values()):
+                if filter_ and not filter_(data):
+                    continue
+                SingleTask.run(callback, data)
+
+    def _add_stream(self, platform, channel, symbol, kwargs):
+        """ 币对加入等待创建的行情连接, 在下一轮事件循环中统一创建 """
+        if platform not in STREAMS:
+            logger.error("no market stream for platform:", platform, caller=self)
+            return
+        if channel not in CALLBACK_KWARGS:
+            logger.error("channel error! channel:", channel, caller=self)
+            return
+        self._streams[(platform, channel, symbol)] = None
+        for group in self._pending:
+            if group[0] == platform and group[1] == channel and group[2] == kwargs:
+                group[3].append(symbol)
+                break
+        else:
+            self._pending.append((platform, channel, kwargs, [symbol]))
+        if not self._pending_handle:
+            self._pending_handle = asyncio.get_event_loop().call_soon(self._create_streams)
+
+    def _create_streams(self):
+        self._pending_handle = None
+        pending, self._pending = self._pending, []
+        for platform, channel, kwargs, symbols in pending:
+            stream = self._create_stream(platform, channel, symbols, **kwargs)
+            for symbol in symbols:
+                if stream:
+                    self._streams[(platform, channel, symbol)] = stream
+                else:
+                    self._streams.pop((platform, channel, symbol), None)
+
+    def _create_stream(self, platform, channel, symbols, **kwargs):
+        async def on_data(data):
+            self.publish(platform, channel, data.symbol, data)
+
+        logger.info("create market stream:", platform, channel, symbols, caller=self)
+        try:
+            return STREAMS[platform](symbols, channel, on_data, **kwargs)
+        except Exception as e:
+            logger.exception("create market stream error:", e, caller=self)
+            return None
+
+
+market_bus = MarketBus()
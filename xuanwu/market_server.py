@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/22 18:00
+  @ Description: 通过Unix domain socket向本机其他进程分发行情
+  @ History:
+    1. 服务端运行在Quant进程中, 按客户端的订阅通过行情总线订阅行情, 同一主题只订阅一次, 每条行情只编码一次;
+    2. 客户端订阅之后的回调与本地`orderbook_update_callback`等回调一致, 收到的是Orderbook / Trade / Kline对象;
+    3. 消息帧: 4字节长度(大端) + 1字节类型 + 内容, 行情对象使用`xuanwu.model.codec`编码, 客户端收到的对象与本地回调一致.
+    使用:
+        # 行情进程, 配置文件 "MARKET_SERVER": {"path": "/tmp/xuanwu-market.sock"}, 由Quant启动; 或者手动启动
+        await MarketServer("/tmp/xuanwu-market.sock").start()
+        # 策略进程
+        client = MarketClient("/tmp/xuanwu-market.sock")
+        client.subscribe(OKEX_V5, "orderbook", "BTC-USDT-SWAP", on_orderbook)
+        await client.start()
+"""
+import os
+import json
+import struct
+import asyncio
+from xuanwu.utils import logger
+from xuanwu.tasks import SingleTask
+from xuanwu.model import codec
+from xuanwu.model.market import Orderbook, Trade, Kline, Ticker
+from xuanwu.market_bus import market_bus
+
+__all__ = ("MarketServer", "MarketClient", )
+
+# 消息类型
+MSG_SUBSCRIBE = 1  # 客户端 -> 服务端, json: {"platform": ..., "channel": ..., "symbol": ..., "kwargs": {...}}
+MSG_UNSUBSCRIBE = 2  # 客户端 -> 服务端, json: {"platform": ..., "channel": ..., "symbol": ...}
+MSG_MODEL = 5  # 服务端 -> 客户端, `codec.encode`编码的行情对象
+
+_FRAME = struct.Struct(">IB")
+_CHANNELS = {Orderbook: "orderbook", Trade: "trade", Kline: "kline", Ticker: "ticker"}
+
+
+def encode(channel, data):
+    """ 行情对象编码为消息帧, 字段值的类型原样保留(e.g. OKX字符串价格和4字段档位) """
+    payload = codec.encode(data)
+    return _FRAME.pack(len(payload) + 1, MSG_MODEL) + payload
+
+
+def decode(msg_type, payload):
+    """ 消息帧内容解码为行情对象
+
+    :returns:
+        channel: 频道, 不是行情消息时是None.
+        data: Orderbook / Trade / Kline / Ticker 对象, 与服务端收到的对象相等; 不是行情消息时是None.
+    """
+    if msg_type != MSG_MODEL:
+        return None, None
+    data = codec.decode(payload)
+    return _CHANNELS.get(type(data)), data
+
+
+async def _read_frame(reader):
+    header = await reader.readexactly(_FRAME.size)
+    length, msg_type = _FRAME.unpack(header)
+    payload = await reader.readexactly(length - 1)
+    return msg_type, payload
+
+
+def _frame(msg_type, d):
+    payload = json.dumps(d).encode()
+    return _FRAME.pack(len(payload) + 1, msg_type) + payload
+
+
+class MarketServer:
+    """ 行情分发服务端.
+
+    Attributes:
+        path: Unix domain socket文件路径.
+        max_buffer: 单个客户端的发送缓冲上限(字节), 超过时丢弃发给该客户端的行情, 避免慢客户端拖慢行情进程.
+    """
+
+    def __init__(self, path="/tmp/xuanwu-market.sock", max_buffer=4 * 1024 * 1024):
+        self._path = path
+        self._max_buffer = max_buffer
+        self._server = None
+        self._clients = {}  # 主题的订阅客户端. e.g. {(platform, channel, symbol): {writer, ...}, ... }
+        self._sub_ids = {}  # 主题在行情总线上的订阅id. e.g. {(platform, channel, symbol): sub_id, ... }
+        self._writers = set()  # 已连接的客户端
+        self._dropped = 0
+
+    @property
+    def stats(self):
+        return {
+            "clients": len(self._writers),
+            "topics": {"/".join(k for k in topic if k): len(clients) for topic, clients in self._clients.items()},
+            "dropped": self._dropped
+        }
+
+    async def start(self):
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        self._server = await asyncio.start_unix_server(self._on_client, path=self._path)
+        logger.info("market server started, path:", self._path, caller=self)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._writers):
+            writer.close()
+        for topic in list(self._sub_ids.keys()):
+            market_bus.unsubscribe(self._sub_ids.pop(topic))
+        self._clients = {}
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+    async def _on_client(self, reader, writer):
+        topics = set()
+        self._writers.add(writer)
+        try:
+            while True:
+                msg_type, payload = await _read_frame(reader)
+                d = json.loads(payload)
+                topic = (d["platform"], d["channel"], d["symbol"])
+                if msg_type == MSG_SUBSCRIBE:
+                    topics.add(topic)
+                    self._add(topic, writer, d.get("kwargs") or {})
+                elif msg_type == MSG_UNSUBSCRIBE:
+                    topics.discard(topic)
+                    self._remove(topic, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.exception("market client error:", e, caller=self)
+        finally:
+            self._writers.discard(writer)
+            for topic in topics:
+                self._remove(topic, writer)
+            writer.close()
+
+    def _add(self, topic, writer, kwargs):
+        self._clients.setdefault(topic, set()).add(writer)
+        if topic not in self._sub_ids:
+            platform, channel, symbol = topic
+
+            async def on_data(data):
+                # 同时订阅了该币对和全部币对的客户端只发送一次, 由客户端分发给两个主题的回调
+                skip = self._clients.get((platform, channel, data.symbol)) if symbol is None else None
+                self._publish(topic, encode(channel, data), skip)
+
+            self._sub_ids[topic] = market_bus.subscribe(platform, channel, symbol, on_data, **kwargs)
+
+    def _remove(self, topic, writer):
+        clients = self._clients.get(topic)
+        if clients is None:
+            return
+        clients.discard(writer)
+        if not clients:
+            self._clients.pop(topic)
+            market_bus.unsubscribe(self._sub_ids.pop(topic))
+
+    def _publish(self, topic, frame, skip=None):
+        for writer in list(self._clients.get(topic, ())):
+            if writer.is_closing() or (skip and writer in skip):
+                continue
+            if writer.transport.get_write_buffer_size() > self._max_buffer:
+                self._dropped += 1
+                continue
+            writer.write(frame)
+
+
+class MarketClient:
+    """ 行情分发客户端, 连接断开之后自动重连并重新订阅.
+
+    Attributes:
+        path: Unix domain socket文件路径.
+        reconnect_interval: 重连间隔(秒).
+    """
+
+    def __init__(self, path="/tmp/xuanwu-market.sock", reconnect_interval=1):
+        self._path = path
+        self._reconnect_interval = reconnect_interval
+        self._callbacks = {}  # {(platform, channel, symbol): [callback, ...]}
+        self._kwargs = {}  # {(platform, channel, symbol): kwargs}
+        self._writer = None
+        self._task = None
+
+    def subscribe(self, platform, channel, symbol, callback, **kwargs):
+        """ 订阅行情, 参数与`market_bus.subscribe`一致, callback 与本地行情回调一致 """
+        topic = (platform, channel, symbol)
+        first = topic not in self._callbacks
+        self._callbacks.setdefault(topic, []).append(callback)
+        self._kwargs.setdefault(topic, kwargs)
+        if first and self._writer:
+            self._send(MSG_SUBSCRIBE, topic)
+
+    def unsubscribe(self, platform, channel, symbol, callback=None):
+        """ 取消订阅, callback为None时取消该主题的全部回调 """
+        topic = (platform, channel, symbol)
+        callbacks = self._callbacks.get(topic)
+        if not callbacks:
+            return
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if callback is None or not callbacks:
+            self._callbacks.pop(topic)
+            self._kwargs.pop(topic, None)
+            if self._writer:
+                self._send(MSG_UNSUBSCRIBE, topic)
+
+    async def start(self):
+        """ 连接服务端, 在后台接收行情 """
+        if not self._task:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    def _send(self, msg_type, topic):
+        d = {"platform": topic[0], "channel": topic[1], "symbol": topic[2]}
+        if msg_type == MSG_SUBSCRIBE:
+            d["kwargs"] = self._kwargs.get(topic) or {}
+        self._writer.write(_frame(msg_type, d))
+
+    async def _run(self):
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self._path)
+                logger.info("market server connected, path:", self._path, caller=self)
+                for topic in self._callbacks:
+                    self._send(MSG_SUBSCRIBE, topic)
+                while True:
+                    msg_type, payload = await _read_frame(reader)
+                    channel, data = decode(msg_type, payload)
+                    if not channel:
+                        logger.warn("unknown message type:", msg_type, caller=self)
+                        continue
+                    # 与`market_bus.publish`一致, 分发给该币对和该频道全部币对的回调
+                    for topic in ((data.platform, channel, data.symbol), (data.platform, channel, None)):
+                        for callback in self._callbacks.get(topic, ()):
+                            SingleTask.run(callback, data)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.IncompleteReadError) as e:
+                logger.warn("market server disconnected:", e, caller=self)
+            except Exception as e:
+                logger.exception("market client error:", e, caller=self)
+            if self._writer:
+                self._writer.close()
+                self._writer = None
+            await asyncio.sleep(self._reconnect_interval)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/22 16:00
+  @ Description: 通过共享内存向本机其他进程分发订单簿和最新成交
+  @ History:
+    1. 每个币对一块共享内存, 保存最新的前N档订单簿和最近成交的环形缓冲区;
+    2. 单写多读, 使用seqlock版本号: 写入前版本号加1变为奇数, 写完再加1变为偶数, 读取前后版本号一致且为偶数才有效;
+    3. 读进程直接从共享内存读取, 不需要websocket连接和序列化.
+    使用:
+        # 行情进程
+        ShmMarketPublisher(OKEX_V5, ["BTC-USDT-SWAP"], depth=10)
+        # 策略进程
+        reader = ShmMarketReader(OKEX_V5, "BTC-USDT-SWAP")
+        orderbook = reader.orderbook()
+        trades = reader.trades()
+
+    共享内存布局(小端):
+        0   magic 8s | depth I | trade_capacity I
+        16  book_seq Q | trade_count Q
+        32  timestamp q | bids_len I | asks_len I | bids depth*(price d, size d) | asks depth*(price d, size d)
+        ... trades trade_capacity*(seq Q | timestamp q | price d | quantity d | side B | pad 7x)
+"""
+import re
+import struct
+from multiprocessing import shared_memory, resource_tracker
+from xuanwu.utils import logger
+from xuanwu.model.market import Orderbook, Trade
+from xuanwu.market_bus import market_bus
+
+__all__ = ("ShmMarketWriter", "ShmMarketReader", "ShmMarketPublisher", )
+
+MAGIC = b"XWSHM001"
+_HEADER = struct.Struct("<8sII")
+_U64 = struct.Struct("<Q")
+_BOOK_SEQ = 16
+_TRADE_COUNT = 24
+_BOOK = 32
+_TRADE = struct.Struct("<QqddB7x")
+_SIDES = {"BUY": 1, "SELL": 2}
+_SIDE_NAMES = {1: "BUY", 2: "SELL"}
+_OWNED = set()  # 本进程写入端创建的共享内存名称
+
+
+def shm_name(platform, symbol):
+    """ 共享内存名称, e.g. xuanwu_okex_v5_BTC-USDT-SWAP """
+    return re.sub(r"[^0-9A-Za-z_\-]", "_", f"xuanwu_{platform}_{symbol}")
+
+
+def _book_struct(depth):
+    return struct.Struct(f"<qII{depth * 4}d")
+
+
+def _attach(name):
+    """ 打开已有的共享内存, 读进程不负责回收, 避免退出时被resource_tracker删除 """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _OWNED:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class ShmMarketWriter:
+    """ 单个币对的共享内存写入端, 每个共享内存只能有一个写进程.
+
+    Attributes:
+        platform: 交易所名称.
+        symbol: 交易币对.
+        depth: 订单簿档位数.
+        trade_capacity: 成交环形缓冲区大小.
+    """
+
+    def __init__(self, platform, symbol, depth=10, trade_capacity=1024):
+        self._name = shm_name(platform, symbol)
+        self._depth = depth
+        self._capacity = trade_capacity
+        self._book = _book_struct(depth)
+        self._trades_offset = _BOOK + self._book.size
+        size = self._trades_offset + _TRADE.size * trade_capacity
+        try:
+            self._shm = shared_memory.SharedMemory(name=self._name, create=True, size=size)
+        except FileExistsError:
+            # 上一次写进程异常退出留下的共享内存
+            stale = shared_memory.SharedMemory(name=self._name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=self._name, create=True, size=size)
+        _OWNED.add(self._name)
+        self._buf = self._shm.buf
+        self._book_seq = 0
+        self._trade_count = 0
+        _HEADER.pack_into(self._buf, 0, MAGIC, depth, trade_capacity)
+        _U64.pack_into(self._buf, _BOOK_SEQ, 0)
+        _U64.pack_into(self._buf, _TRADE_COUNT, 0)
+
+    @property
+    def name(self):
+        return self._name
+
+    def write_orderbook(self, orderbook):
+        """ 写入订单簿, 超出depth的档位丢弃 """
+        depth = self._depth
+        bids = (orderbook.bids or [])[:depth]
+        asks = (orderbook.asks or [])[:depth]
+        values = [int(orderbook.timestamp or 0), len(bids), len(asks)]
+        for levels in (bids, asks):
+            for level in levels:
+                values.append(float(level[0]))
+                values.append(float(level[1]))
+            values.extend([0.0] * (2 * (depth - len(levels))))
+        self._book_seq += 1
+        _U64.pack_into(self._buf, _BOOK_SEQ, self._book_seq)
+        self._book.pack_into(self._buf, _BOOK, *values)
+        self._book_seq += 1
+        _U64.pack_into(self._buf, _BOOK_SEQ, self._book_seq)
+
+    def write_trade(self, trade):
+        """ 写入一笔成交, 缓冲区满时覆盖最早的成交 """
+        index = self._trade_count
+        offset = self._trades_offset + (index % self._capacity) * _TRADE.size
+        _U64.pack_into(self._buf, offset, 2 * index + 1)
+        _TRADE.pack_into(self._buf, offset, 2 * index + 1, int(trade.timestamp or 0), float(trade.price),
+                         float(trade.quantity), _SIDES.get(trade.side, 0))
+        _U64.pack_into(self._buf, offset, 2 * index + 2)
+        self._trade_count = index + 1
+        _U64.pack_into(self._buf, _TRADE_COUNT, self._trade_count)
+
+    def close(self, unlink=True):
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+            _OWNED.discard(self._name)
+
+
+class ShmMarketReader:
+    """ 单个币对的共享内存读取端, 任意数量的进程都可以同时读取.
+
+    Attributes:
+        platform: 交易所名称.
+        symbol: 交易币对.
+    """
+
+    def __init__(self, platform, symbol):
+        self._platform = platform
+        self._symbol = symbol
+        self._shm = _attach(shm_name(platform, symbol))
+        self._buf = self._shm.buf
+        magic, self._depth, self._capacity = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"bad shared memory magic: {magic}")
+        self._book = _book_struct(self._depth)
+        self._trades_offset = _BOOK + self._book.size
+        self._next_trade = _U64.unpack_from(self._buf, _TRADE_COUNT)[0]  # 从打开时的最新成交之后开始读
+        self._dropped = 0
+
+    @property
+    def dropped(self):
+        """ 读取太慢被覆盖的成交数量 """
+        return self._dropped
+
+    @property
+    def version(self):
+        """ 订单簿版本号, 没有变化时不需要重新读取 """
+        return _U64.unpack_from(self._buf, _BOOK_SEQ)[0]
+
+    def orderbook(self, retries=1000):
+        """ 读取最新订单簿, 写入过程中读取会重试, 超过重试次数或者还没有数据时返回None """
+        for _ in range(retries):
+            seq = _U64.unpack_from(self._buf, _BOOK_SEQ)[0]
+            if seq & 1:
+                continue
+            values = self._book.unpack_from(self._buf, _BOOK)
+            if _U64.unpack_from(self._buf, _BOOK_SEQ)[0] != seq:
+                continue
+            if seq == 0:
+                return None
+            timestamp, bids_len, asks_len = values[:3]
+            depth = self._depth
+            bids = [[values[3 + 2 * i], values[4 + 2 * i]] for i in range(bids_len)]
+            start = 3 + 2 * depth
+            asks = [[values[start + 2 * i], values[start + 1 + 2 * i]] for i in range(asks_len)]
+            return Orderbook(platform=self._platform, symbol=self._symbol, asks=asks, bids=bids, timestamp=timestamp)
+        logger.warn("read orderbook failed, writer too busy.", caller=self)
+        return None
+
+    def trades(self):
+        """ 读取上次读取之后的新成交 """
+        count = _U64.unpack_from(self._buf, _TRADE_COUNT)[0]
+        if count - self._next_trade > self._capacity:
+            self._dropped += count - self._next_trade - self._capacity
+            self._next_trade = count - self._capacity
+        result = []
+        while self._next_trade < count:
+            index = self._next_trade
+            offset = self._trades_offset + (index % self._capacity) * _TRADE.size
+            seq, timestamp, price, quantity, side = _TRADE.unpack_from(self._buf, offset)
+            if _U64.unpack_from(self._buf, offset)[0] != seq or seq != 2 * index + 2:
+                # 读取过程中被覆盖
+                self._dropped += 1
+            else:
+                result.append(Trade(platform=self._platform, symbol=self._symbol, side=_SIDE_NAMES.get(side),
+                                    price=price, quantity=quantity, timestamp=timestamp))
+            self._next_trade += 1
+        return result
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+
+class ShmMarketPublisher:
+    """ 通过行情总线订阅订单簿和成交, 写入共享内存.
+
+    Attributes:
+        platform: 交易所名称.
+        symbols: 交易币对列表.
+        depth: 订单簿档位数.
+        trade_capacity: 成交环形缓冲区大小.
+        channels: 发布的频道, orderbook / trade.
+    """
+
+    def __init__(self, platform, symbols, depth=10, trade_capacity=1024, channels=("orderbook", "trade")):
+        self._writers = {}  # {symbol: ShmMarketWriter}
+        self._sub_ids = []
+        for symbol in symbols:
+            self._writers[symbol] = ShmMarketWriter(platform, symbol, depth, trade_capacity)
+            if "orderbook" in channels:
+                self._sub_ids.append(market_bus.subscribe(platform, "orderbook", symbol, self._on_orderbook,
+                                                          orderbook_length=depth))
+            if "trade" in channels:
+                self._sub_ids.append(market_bus.subscribe(platform, "trade", symbol, self._on_trade))
+
+    async def _on_orderbook(self, orderbook):
+        writer = self._writers.get(orderbook.symbol)
+        if writer:
+            writer.write_orderbook(orderbook)
+
+    async def _on_trade(self, trade):
+        writer = self._writers.get(trade.symbol)
+        if writer:
+            writer.write_trade(trade)
+
+    def close(self):
+        for sub_id in self._sub_ids:
+            market_bus.unsubscribe(sub_id)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
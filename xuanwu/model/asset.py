@@ -21,6 +21,8 @@ class Asset:
         update: If any update? True or False.
     """
 
+    __slots__ = ("platform", "account", "assets", "timestamp", "update")
+
     def __init__(self, platform=None, account=None, assets=None, timestamp=None, update=False):
         """ Initialize. """
         self.platform = platform
@@ -40,6 +42,9 @@ class Asset:
         }
         return d
 
+    def __copy__(self):
+        return self.__class__(self.platform, self.account, self.assets, self.timestamp, self.update)
+
     def __str__(self):
         info = json.dumps(self.data)
         return info
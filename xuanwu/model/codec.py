@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/23 10:00
+  @ Description: 行情和交易模型的二进制编解码, 用于进程间通信、存储和回放
+  @ History:
+    1. 每条记录: 头部(magic 1字节 + 版本 1字节 + 类型 1字节) + 按schema顺序排列的字段值;
+    2. 字段值带1字节类型标记, 交易所原始的字符串/数字类型原样保留, 解码后与编码前相等;
+    3. 订单簿档位列表使用紧凑编码: 全部是float时打包为double数组, 全部是字符串时拼接为一个字符串;
+    4. schema按版本登记, 新版本只能在末尾追加字段, 旧版本的数据仍然可以解码.
+    使用:
+        data = encode(orderbook)
+        orderbook = decode(data)
+        # 存储和回放, 每条记录前加4字节长度
+        f.write(pack_records([trade1, trade2]))
+        for trade in iter_records(f.read()):
+            pass
+"""
+import struct
+from xuanwu.model.market import Orderbook, Ticker, Trade, Kline
+from xuanwu.model.order import Order, Fill
+from xuanwu.model.position import Position
+from xuanwu.model.asset import Asset
+
+__all__ = ("encode", "decode", "pack_records", "iter_records", "VERSION", )
+
+MAGIC = 0xC5
+VERSION = 2
+
+# 字段值类型标记
+T_NONE = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_FLOAT = 4
+T_SHORT_STR = 5  # 长度 < 256
+T_STR = 6
+T_LIST = 7
+T_DICT = 8
+T_MISSING = 9  # 没有赋值的__slots__字段
+T_FLOAT_LEVELS = 10  # 全部是float的档位列表, e.g. [[price, size], ...]
+T_STR_LEVELS = 11  # 全部是字符串的档位列表, e.g. [["43000.1", "5", "0", "2"], ...]
+T_BIG_INT = 12  # 超出int64范围的整数, 以字符串保存
+
+_HEADER = struct.Struct("<BBB")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_U32 = struct.Struct("<I")
+_LEVELS = struct.Struct("<IH")  # 档位数, 每档字段数
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+_SEP_FIELD = "\x1f"  # 字符串档位拼接的分隔符
+
+# 模型类型id, 已经分配的id不能修改
+TYPE_ORDERBOOK = 1
+TYPE_TICKER = 2
+TYPE_TRADE = 3
+TYPE_KLINE = 4
+TYPE_ORDER = 5
+TYPE_FILL = 6
+TYPE_POSITION = 7
+TYPE_ASSET = 8
+
+# 各版本的字段顺序. e.g. {version: {type_id: (model class, fields), ... }, ... }
+# 版本历史:
+#   1: 初始版本;
+#   2: Trade 末尾追加 count.
+SCHEMAS = {
+    1: {
+        TYPE_ORDERBOOK: (Orderbook, ("platform", "symbol", "asks", "bids", "timestamp")),
+        TYPE_TICKER: (Ticker, ("platform", "symbol", "asks", "asks_volume", "bids", "bids_volume", "best_price",
+                               "timestamp")),
+        TYPE_TRADE: (Trade, ("platform", "symbol", "side", "price", "trade_id", "quantity", "timestamp")),
+        TYPE_KLINE: (Kline, ("platform", "symbol", "open", "high", "low", "close", "volume", "coin_volume",
+                             "timestamp", "kline_type")),
+        TYPE_ORDER: (Order, ("platform", "account", "strategy", "symbol", "order_no", "action", "order_type",
+                             "price", "quantity", "remain", "status", "avg_price", "trade_type", "client_order_id",
+                             "order_price_type", "role", "trade_quantity", "trade_price", "ctime", "utime", "fee")),
+        TYPE_FILL: (Fill, ("platform", "account", "symbol", "strategy", "order_no", "fill_no", "price", "quantity",
+                           "side", "liquidity", "fee", "ctime")),
+        TYPE_POSITION: (Position, ("platform", "account", "strategy", "symbol", "margin_mode", "long_quantity",
+                                   "long_avail_qty", "long_open_price", "long_hold_price", "long_unrealised_pnl",
+                                   "long_leverage", "long_liquid_price", "long_margin", "short_quantity",
+                                   "short_avail_qty", "short_open_price", "short_hold_price", "short_liquid_price",
+                                   "short_unrealised_pnl", "short_leverage", "short_margin", "utime", "ctime",
+                                   "leverage", "liquid_price", "maint_margin_ratio", "created_time",
+                                   "long_avg_price", "long_pnl", "long_pnl_ratio", "long_pos_margin",
+                                   "short_avg_price", "short_pnl", "short_pnl_ratio", "short_pos_margin")),
+        TYPE_ASSET: (Asset, ("platform", "account", "assets", "timestamp", "update")),
+    }
+}
+SCHEMAS[2] = dict(SCHEMAS[1])
+SCHEMAS[2][TYPE_TRADE] = (Trade, SCHEMAS[1][TYPE_TRADE][1] + ("count", ))
+
+_TYPE_IDS = {cls: (type_id, fields) for type_id, (cls, fields) in SCHEMAS[VERSION].items()}
+_MISSING = object()
+
+
+def _encode_levels(buf, levels):
+    """ 档位列表的紧凑编码, 不满足条件时返回False """
+    width = len(levels[0]) if isinstance(levels[0], list) else 0
+    if not width or width > 0xFFFF:
+        return False
+    kind = type(levels[0][0])
+    if kind is not float and kind is not str:
+        return False
+    values = []
+    for level in levels:
+        if type(level) is not list or len(level) != width:
+            return False
+        values.extend(level)
+    if kind is float:
+        if not all(type(v) is float for v in values):
+            return False
+        buf.append(T_FLOAT_LEVELS)
+        buf += _LEVELS.pack(len(levels), width)
+        buf += struct.pack(f"<{len(values)}d", *values)
+        return True
+    if not all(type(v) is str for v in values):
+        return False
+    joined = _SEP_FIELD.join(values)
+    # 字符串中包含分隔符时不能使用拼接编码
+    if joined.count(_SEP_FIELD) != len(values) - 1:
+        return False
+    b = joined.encode()
+    buf.append(T_STR_LEVELS)
+    buf += _LEVELS.pack(len(levels), width)
+    buf += _U32.pack(len(b))
+    buf += b
+    return True
+
+
+def _encode_value(buf, v):
+    t = type(v)
+    if v is None:
+        buf.append(T_NONE)
+    elif t is str:
+        b = v.encode()
+        if len(b) < 256:
+            buf.append(T_SHORT_STR)
+            buf.append(len(b))
+        else:
+            buf.append(T_STR)
+            buf += _U32.pack(len(b))
+        buf += b
+    elif t is float:
+        buf.append(T_FLOAT)
+        buf += _FLOAT.pack(v)
+    elif t is bool:
+        buf.append(T_TRUE if v else T_FALSE)
+    elif t is int:
+        if _INT_MIN <= v <= _INT_MAX:
+            buf.append(T_INT)
+            buf += _INT.pack(v)
+        else:
+            b = str(v).encode()
+            buf.append(T_BIG_INT)
+            buf += _U32.pack(len(b))
+            buf += b
+    elif t is list or t is tuple:
+        if v and _encode_levels(buf, v):
+            return
+        buf.append(T_LIST)
+        buf += _U32.pack(len(v))
+        for item in v:
+            _encode_value(buf, item)
+    elif t is dict:
+        buf.append(T_DICT)
+        buf += _U32.pack(len(v))
+        for key, item in v.items():
+            _encode_value(buf, key)
+            _encode_value(buf, item)
+    elif v is _MISSING:
+        buf.append(T_MISSING)
+    else:
+        raise TypeError(f"Object of type {t.__name__} is not serializable")
+
+
+def _decode_value(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag == T_SHORT_STR:
+        n = data[offset]
+        offset += 1
+        return data[offset:offset + n].decode(), offset + n
+    if tag == T_FLOAT:
+        return _FLOAT.unpack_from(data, offset)[0], offset + 8
+    if tag == T_INT:
+        return _INT.unpack_from(data, offset)[0], offset + 8
+    if tag == T_NONE:
+        return None, offset
+    if tag == T_STR_LEVELS:
+        count, width = _LEVELS.unpack_from(data, offset)
+        offset += _LEVELS.size
+        n = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        values = data[offset:offset + n].decode().split(_SEP_FIELD)
+        return [values[i:i + width] for i in range(0, count * width, width)], offset + n
+    if tag == T_FLOAT_LEVELS:
+        count, width = _LEVELS.unpack_from(data, offset)
+        offset += _LEVELS.size
+        values = struct.unpack_from(f"<{count * width}d", data, offset)
+        return [list(values[i:i + width]) for i in range(0, count * width, width)], offset + 8 * count * width
+    if tag == T_STR or tag == T_BIG_INT:
+        n = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        s = data[offset:offset + n].decode()
+        return (s if tag == T_STR else int(s)), offset + n
+    if tag == T_FALSE or tag == T_TRUE:
+        return tag == T_TRUE, offset
+    if tag == T_LIST:
+        n = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        result = []
+        for _ in range(n):
+            item, offset = _decode_value(data, offset)
+            result.append(item)
+        return result, offset
+    if tag == T_DICT:
+        n = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        result = {}
+        for _ in range(n):
+            key, offset = _decode_value(data, offset)
+            result[key], offset = _decode_value(data, offset)
+        return result, offset
+    if tag == T_MISSING:
+        return _MISSING, offset
+    raise ValueError(f"unknown value tag: {tag}")
+
+
+def encode(obj):
+    """ 模型对象编码为bytes
+
+    Attributes:
+        :param obj: Orderbook / Ticker / Trade / Kline / Order / Fill / Position / Asset 对象.
+    """
+    schema = _TYPE_IDS.get(type(obj))
+    if not schema:
+        raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+    type_id, fields = schema
+    buf = bytearray(_HEADER.pack(MAGIC, VERSION, type_id))
+    for field in fields:
+        v = getattr(obj, field, _MISSING)
+        if type(v) is str:
+            # 短字符串最常见, 直接写入, 不经过_encode_value
+            b = v.encode()
+            if len(b) < 256:
+                buf.append(T_SHORT_STR)
+                buf.append(len(b))
+                buf += b
+                continue
+        _encode_value(buf, v)
+    return bytes(buf)
+
+
+def _decode(data, offset, end):
+    magic, version, type_id = _HEADER.unpack_from(data, offset)
+    if magic != MAGIC:
+        raise ValueError(f"bad magic: {magic}")
+    schema = SCHEMAS.get(version, {}).get(type_id)
+    if not schema:
+        raise ValueError(f"unknown schema, version: {version} type: {type_id}")
+    cls, fields = schema
+    obj = cls.__new__(cls)
+    offset += _HEADER.size
+    for field in fields:
+        if data[offset] == T_SHORT_STR:
+            n = data[offset + 1]
+            offset += 2
+            setattr(obj, field, data[offset:offset + n].decode())
+            offset += n
+            continue
+        value, offset = _decode_value(data, offset)
+        if value is not _MISSING:
+            setattr(obj, field, value)
+    if offset != end:
+        raise ValueError(f"record length mismatch, expect: {end} got: {offset}")
+    return obj
+
+
+def decode(data):
+    """ bytes解码为模型对象, 不经过模型的__init__, 字段值与编码前一致 """
+    return _decode(data, 0, len(data))
+
+
+def pack_records(objs):
+    """ 多个模型对象编码为记录流, 每条记录前加4字节长度 """
+    buf = bytearray()
+    for obj in objs:
+        record = encode(obj)
+        buf += _U32.pack(len(record))
+        buf += record
+    return bytes(buf)
+
+
+def iter_records(data):
+    """ 逐条解码`pack_records`生成的记录流, 末尾不完整的记录忽略 """
+    offset, size = 0, len(data)
+    while offset + 4 <= size:
+        n = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        if offset + n > size:
+            break
+        yield _decode(data, offset, offset + n)
+        offset += n
@@ -25,6 +25,8 @@ class Orderbook:
         timestamp: 订单簿更新时间.
     """
 
+    __slots__ = ("platform", "symbol", "asks", "bids", "timestamp")
+
     def __init__(self, platform=None, symbol=None, asks=None, bids=None, timestamp=None):
         """Initialize."""
         self.platform = platform
@@ -63,6 +65,9 @@ class Orderbook:
         self.timestamp = d["t"]
         return self
 
+    def __copy__(self):
+        return self.__class__(self.platform, self.symbol, self.asks, self.bids, self.timestamp)
+
     def __str__(self):
         info = json.dumps(self.data)
         return info
@@ -85,6 +90,8 @@ class Ticker:
         timestamp: 最新更新时间.
     """
 
+    __slots__ = ("platform", "symbol", "asks", "asks_volume", "bids", "bids_volume", "best_price", "timestamp")
+
     def __init__(self, platform=None, symbol=None, asks=None, asks_volume=None, bids=None, bids_volume=None,
                  best_price=None, timestamp=None):
         """Initialize."""
@@ -136,6 +143,9 @@ class Ticker:
         self.timestamp = d["t"]
         return self
 
+    def __copy__(self):
+        return self.__class__(self.platform, self.symbol, self.asks, self.asks_volume, self.bids, self.bids_volume, self.best_price, self.timestamp)
+
     def __str__(self):
         info = json.dumps(self.data)
         return info
@@ -155,9 +165,13 @@ class Trade:
         trade_id: 成交ID.
         quantity: 交易量.
         timestamp: 更新时间.
+        count: 合并推送的成交笔数, e.g. OKX `trades`频道合并同一吃单的多笔成交, trade_id是其中最后一笔的id.
     """
 
-    def __init__(self, platform=None, symbol=None, side=None, price=None, trade_id=None, quantity=None, timestamp=None):
+    __slots__ = ("platform", "symbol", "side", "price", "trade_id", "quantity", "timestamp", "count")
+
+    def __init__(self, platform=None, symbol=None, side=None, price=None, trade_id=None, quantity=None, timestamp=None,
+                 count=None):
         """Initialize."""
         self.platform = platform
         self.symbol = symbol
@@ -166,6 +180,7 @@ class Trade:
         self.trade_id = trade_id
         self.quantity = quantity
         self.timestamp = timestamp
+        self.count = count
 
     @property
     def data(self):
@@ -176,7 +191,8 @@ class Trade:
             "price": self.price,
             "trade_id": self.trade_id,
             "quantity": self.quantity,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "count": self.count
         }
         return d
 
@@ -189,20 +205,26 @@ class Trade:
             "P": self.price,
             "ti": self.trade_id,
             "q": self.quantity,
-            "t": self.timestamp
+            "t": self.timestamp,
+            "c": self.count
         }
         return d
 
     def load_smart(self, d):
         self.platform = d["p"]
-        self.symbol = d["s"]
+        self.symbol = d["sl"]
         self.side = d["sd"]
         self.price = d["P"]
         self.trade_id = d["ti"]
         self.quantity = d["q"]
         self.timestamp = d["t"]
+        self.count = d.get("c")
         return self
 
+    def __copy__(self):
+        return self.__class__(self.platform, self.symbol, self.side, self.price, self.trade_id, self.quantity, self.timestamp,
+                              self.count)
+
     def __str__(self):
         info = json.dumps(self.data)
         return info
@@ -226,6 +248,8 @@ class Kline:
         kline_type: K线级别, `kline`, `kline_5min`, `kline_15min` ... and so on.
     """
 
+    __slots__ = ("platform", "symbol", "open", "high", "low", "close", "volume", "coin_volume", "timestamp", "kline_type")
+
     def __init__(self, platform=None, symbol=None, open=None, high=None, low=None, close=None, volume=None,
                  coin_volume=None, timestamp=None, kline_type=None):
         """Initialize."""
@@ -285,6 +309,9 @@ class Kline:
         self.kline_type = d["kt"]
         return self
 
+    def __copy__(self):
+        return self.__class__(self.platform, self.symbol, self.open, self.high, self.low, self.close, self.volume, self.coin_volume, self.timestamp, self.kline_type)
+
     def __str__(self):
         info = json.dumps(self.data)
         return info
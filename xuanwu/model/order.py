@@ -47,6 +47,10 @@ TRADE_TYPE_BUY_CLOSE = 4  # Buy close, action = BUY & quantity < 0.
 
 
 class Order:
+    __slots__ = ("platform", "account", "strategy", "symbol", "order_no", "action", "order_type", "price", "quantity",
+                 "remain", "status", "avg_price", "trade_type", "client_order_id", "order_price_type", "role",
+                 "trade_quantity", "trade_price", "ctime", "utime", "fee")
+
     def __init__(self, account=None, platform=None, strategy=None, order_no=None, symbol=None, action=None, price=0,
                  quantity=0, remain=0, status=ORDER_STATUS_NONE, avg_price=0, order_type=ORDER_TYPE_LIMIT,
                  trade_type=TRADE_TYPE_NONE, client_order_id=None, order_price_type=None, role=None,
@@ -103,6 +107,14 @@ class Order:
         self.trade_price = trade_price
         self.ctime = ctime if ctime else tools.get_cur_timestamp_ms()
         self.utime = utime if utime else tools.get_cur_timestamp_ms()
+        self.fee = None  # 手续费, 部分交易所的订单推送中有
+
+    def __copy__(self):
+        # 不经过__init__, 避免 remain 为0时被重置为 quantity
+        obj = self.__class__.__new__(self.__class__)
+        for key in Order.__slots__:
+            setattr(obj, key, getattr(self, key))
+        return obj
 
     def __str__(self):
         d = {
@@ -152,6 +164,9 @@ class Fill:
         ctime: 成交时间
     """
 
+    __slots__ = ("platform", "account", "symbol", "strategy", "order_no", "fill_no", "price", "quantity", "side",
+                 "liquidity", "fee", "ctime")
+
     def __init__(self, platform=None, account=None, symbol=None, strategy=None, order_no=None, fill_no=None,
                  price=0, quantity=0, side=None, liquidity=None, fee=0, ctime=None):
         self.platform = platform
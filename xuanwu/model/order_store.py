@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/21 16:00
+  @ Description: 带二级索引的订单存储
+  @ History:
+    1. 按客户端订单id、币对、方向、状态、价格档位建立索引, 查询不需要遍历全部订单;
+    2. 快照是只读视图, 写时复制: 取快照不复制数据, 快照之后第一次修改时才复制一次主表;
+    3. 索引查询返回的实时视图存活期间对应的索引桶不会被删除, 订单清空之后再加入同一个键, 原来的视图仍然可以看到;
+       视图被回收之后空的索引桶随之删除, 查询过的键不会一直占用内存;
+    4. 按币对和方向维护有挂单的价格集合, price_levels 不需要遍历全部价格档位.
+    使用:
+        store = OrderStore()
+        store.upsert(order)
+        bids = store.open_orders("BTC-USDT-SWAP", ORDER_ACTION_BUY)
+        order = store.get_by_client_id("my-order-1")
+        orders = store.snapshot()
+"""
+import weakref
+from types import MappingProxyType
+from collections.abc import Mapping
+from xuanwu.model.order import ORDER_STATUS_FAILED, ORDER_STATUS_CANCELED, ORDER_STATUS_FILLED
+
+__all__ = ("OrderStore", )
+
+_FINISHED = (ORDER_STATUS_FAILED, ORDER_STATUS_CANCELED, ORDER_STATUS_FILLED)
+
+
+class _View(Mapping):
+    """ 索引桶的只读实时视图, 可以被弱引用 """
+
+    __slots__ = ("_bucket", "__weakref__")
+
+    def __init__(self, bucket):
+        self._bucket = bucket
+
+    def __getitem__(self, order_no):
+        return self._bucket[order_no]
+
+    def __iter__(self):
+        return iter(self._bucket)
+
+    def __len__(self):
+        return len(self._bucket)
+
+    def __contains__(self, order_no):
+        return order_no in self._bucket
+
+    def __repr__(self):
+        return repr(self._bucket)
+
+
+def _drop_empty(index, key, bucket):
+    """ 视图被回收时, 删除仍然为空的索引桶 """
+    if not bucket and index.get(key) is bucket:
+        del index[key]
+
+
+class OrderStore:
+    """ 订单存储, 主键是order_no.
+
+    NOTE:
+        `snapshot()`返回的视图在之后的修改中保持不变;
+        索引查询返回的是只读的实时视图, 之后的修改都会反映在视图中, 需要固定内容时请自行复制或者使用`snapshot()`.
+    """
+
+    def __init__(self):
+        self._orders = {}  # Order objects. e.g. {"order_no": Order, ... }
+        self._client_ids = {}  # {client_order_id: order_no}
+        self._by_symbol = {}  # {symbol: {order_no: Order}}
+        self._by_side = {}  # {(symbol, action): {order_no: Order}}
+        self._by_status = {}  # {status: {order_no: Order}}
+        self._by_price = {}  # {(symbol, action, price): {order_no: Order}}
+        self._levels = {}  # 有挂单的价格, 按插入顺序. e.g. {(symbol, action): {price: None, ... }}
+        self._views = weakref.WeakValueDictionary()  # 存活的实时视图, 对应的索引桶清空时保留. {(id(index), key): _View}
+        self._version = 0
+        self._snapshot = None  # 当前版本已经发出的快照
+        self._shared = False  # 主表是否被快照引用, 引用时修改之前先复制
+
+    @property
+    def version(self):
+        """ 每次修改加1, 可以用来判断缓存的查询结果是否过期 """
+        return self._version
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_no):
+        return order_no in self._orders
+
+    def snapshot(self):
+        """ 当前版本的只读快照 {order_no: Order}, 同一版本多次调用返回同一个对象 """
+        if self._snapshot is None:
+            self._snapshot = MappingProxyType(self._orders)
+            self._shared = True
+        return self._snapshot
+
+    def get(self, order_no):
+        return self._orders.get(order_no)
+
+    def get_by_client_id(self, client_order_id):
+        order_no = self._client_ids.get(client_order_id)
+        return self._orders.get(order_no) if order_no is not None else None
+
+    def by_symbol(self, symbol):
+        return self._view(self._by_symbol, symbol)
+
+    def open_orders(self, symbol, action=None):
+        """ 币对的挂单, 可以按方向过滤, e.g. open_orders("BTC-USDT-SWAP", ORDER_ACTION_BUY) """
+        if action is None:
+            return self._view(self._by_symbol, symbol)
+        return self._view(self._by_side, (symbol, action))
+
+    def by_status(self, status):
+        return self._view(self._by_status, status)
+
+    def at_price(self, symbol, action, price):
+        """ 某个价格档位上的挂单 """
+        return self._view(self._by_price, (symbol, action, price))
+
+    def price_levels(self, symbol, action):
+        """ 有挂单的价格档位 """
+        return list(self._levels.get((symbol, action), ()))
+
+    def upsert(self, order):
+        """ 新增或者替换订单, 已完成(成交/撤销/失败)的订单直接移除
+
+        :returns:
+            :return previous: 被替换或移除的订单, otherwise it's None.
+        """
+        if order.status in _FINISHED:
+            return self.remove(order.order_no)
+        self._before_write()
+        previous = self._orders.get(order.order_no)
+        if previous is not None:
+            self._unindex(previous)
+        self._orders[order.order_no] = order
+        self._index(order)
+        return previous
+
+    def remove(self, order_no):
+        if order_no not in self._orders:
+            return None
+        self._before_write()
+        order = self._orders.pop(order_no)
+        self._unindex(order)
+        return order
+
+    def clear(self):
+        self._before_write()
+        self._orders = {}
+        self._shared = False
+        self._client_ids.clear()
+        self._levels.clear()
+        for index in (self._by_symbol, self._by_side, self._by_status, self._by_price):
+            for key in list(index.keys()):
+                index[key].clear()
+                if (id(index), key) not in self._views:
+                    del index[key]
+
+    def _before_write(self):
+        self._version += 1
+        self._snapshot = None
+        if self._shared:
+            self._orders = dict(self._orders)
+            self._shared = False
+
+    def _view(self, index, key):
+        view = self._views.get((id(index), key))
+        if view is not None:
+            return view
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = {}
+        view = _View(bucket)
+        self._views[(id(index), key)] = view
+        weakref.finalize(view, _drop_empty, index, key, bucket)
+        return view
+
+    def _index(self, order):
+        if order.client_order_id:
+            self._client_ids[order.client_order_id] = order.order_no
+        self._by_symbol.setdefault(order.symbol, {})[order.order_no] = order
+        self._by_side.setdefault((order.symbol, order.action), {})[order.order_no] = order
+        self._by_status.setdefault(order.status, {})[order.order_no] = order
+        self._by_price.setdefault((order.symbol, order.action, order.price), {})[order.order_no] = order
+        self._levels.setdefault((order.symbol, order.action), {})[order.price] = None
+
+    def _unindex(self, order):
+        if order.client_order_id and self._client_ids.get(order.client_order_id) == order.order_no:
+            del self._client_ids[order.client_order_id]
+        for index, key in ((self._by_symbol, order.symbol),
+                           (self._by_side, (order.symbol, order.action)),
+                           (self._by_status, order.status),
+                           (self._by_price, (order.symbol, order.action, order.price))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(order.order_no, None)
+                if bucket:
+                    continue
+                if index is self._by_price:
+                    self._drop_level(order.symbol, order.action, order.price)
+                if (id(index), key) not in self._views:
+                    del index[key]
+
+    def _drop_level(self, symbol, action, price):
+        levels = self._levels.get((symbol, action))
+        if levels is not None:
+            levels.pop(price, None)
+            if not levels:
+                del self._levels[(symbol, action)]
@@ -21,6 +21,17 @@ class Position:
     """ 持仓对象
     """
 
+    __slots__ = ("platform", "account", "strategy", "symbol", "margin_mode",
+                 "long_quantity", "long_avail_qty", "long_open_price", "long_hold_price", "long_unrealised_pnl",
+                 "long_leverage", "long_liquid_price", "long_margin",
+                 "short_quantity", "short_avail_qty", "short_open_price", "short_hold_price", "short_liquid_price",
+                 "short_unrealised_pnl", "short_leverage", "short_margin",
+                 "utime", "ctime",
+                 # 部分交易所额外设置的字段, 初始化时不赋值
+                 "leverage", "liquid_price", "maint_margin_ratio", "created_time",
+                 "long_avg_price", "long_pnl", "long_pnl_ratio", "long_pos_margin",
+                 "short_avg_price", "short_pnl", "short_pnl_ratio", "short_pos_margin")
+
     def __init__(self, platform=None, account=None, strategy=None, symbol=None):
         """ 初始化持仓对象
         Attributes:
@@ -85,6 +96,15 @@ class Position:
         self.utime = utime
         self.ctime = ctime
 
+    def __copy__(self):
+        obj = self.__class__.__new__(self.__class__)
+        for key in Position.__slots__:
+            try:
+                setattr(obj, key, getattr(self, key))
+            except AttributeError:
+                pass
+        return obj
+
     def __str__(self):
         d = {
             "platform": self.platform,
@@ -8,6 +8,17 @@
  * @Date: 2020/9/2020:53
 """
 import json
+import math
+from decimal import Decimal
+
+
+def tick_precision(tick):
+    """ 最小变动单位对应的小数位数, e.g. 0.01 -> 2, "0.0005" -> 4, 1e-05 -> 5, 10 -> 0
+    """
+    if tick is None or tick == "":
+        return None
+    exponent = Decimal(str(tick)).normalize().as_tuple().exponent
+    return max(0, -exponent)
 
 
 class SymbolInfo:
@@ -45,6 +56,50 @@ class SymbolInfo:
         self.symbol_type = symbol_type
         self.is_inverse = is_inverse
         self.multiplier = multiplier
+        self._precisions = {}  # 精度缓存. e.g. {"price": (price_tick, 2), ... }
+
+    def _precision(self, name, tick):
+        cached = self._precisions.get(name)
+        if cached is None or cached[0] != tick:
+            cached = (tick, tick_precision(tick))
+            self._precisions[name] = cached
+        return cached[1]
+
+    @property
+    def price_precision(self):
+        """ 价格小数位数, 由price_tick计算并缓存 """
+        return self._precision("price", self.price_tick)
+
+    @property
+    def size_precision(self):
+        """ 数量小数位数, 由size_tick计算并缓存 """
+        return self._precision("size", self.size_tick)
+
+    def round_price(self, price, direction=None):
+        """ 价格按price_tick取整
+        Attributes:
+            :param price: 价格
+            :param direction: `down` 向下取整, `up` 向上取整, 默认四舍五入
+        """
+        return self._round(price, self.price_tick, self.price_precision, direction)
+
+    def round_size(self, size, direction="down"):
+        """ 数量按size_tick取整, 默认向下取整, 避免超出可用数量 """
+        return self._round(size, self.size_tick, self.size_precision, direction)
+
+    @staticmethod
+    def _round(value, tick, precision, direction):
+        if not tick:
+            return value
+        tick = float(tick)
+        steps = float(value) / tick
+        if direction == "down":
+            steps = math.floor(steps + 1e-9)
+        elif direction == "up":
+            steps = math.ceil(steps - 1e-9)
+        else:
+            steps = round(steps)
+        return round(steps * tick, precision)
 
     @property
     def data(self):
@@ -12,9 +12,11 @@ import hmac
 from urllib.parse import urljoin
 from xuanwu.utils.tools import get_cur_timestamp_ms
 from xuanwu.utils.http_client import AsyncHttpRequests
+from xuanwu.utils.rate_limiter import RateLimiter
+from xuanwu.utils.bootstrap import run_bootstrap
 from xuanwu.model.market import Orderbook, Kline, Trade
 from xuanwu.model.asset import Asset
-from xuanwu.model.position import Position
+from xuanwu.model.position import Position, CROSS, ISOLATED
 from xuanwu.error import Error
 from xuanwu.utils import logger
 from xuanwu.tasks import SingleTask, LoopRunTask
@@ -233,6 +235,7 @@ class BinanceUSwapRestApi:
         """initialize REST API client."""
         self._access_key = access_key
         self._secret_key = secret_key
+        self._rate_limiter = RateLimiter.get(BINANCE_U_SWAP)
 
     async def ping(self):
         """测试 Rest API连接状态"""
@@ -547,12 +550,27 @@ class BinanceUSwapRestApi:
             success: Success results, otherwise it's None.
             error: Error information, otherwise it's None.
         """
+        code, success, error = await AsyncHttpRequests.retry(
+            lambda: self._request(method, uri, copy.copy(params), body, copy.copy(headers), auth),
+            method, urljoin(BASE_REST, uri), params, body)
+        return success, error
+
+    async def _request(self, method, uri, params=None, body=None, headers=None, auth=False):
+        """ Sign and send the request once, see `request`.
+
+        :returns:
+            :return code, success, error: HTTP response code, success results and error information.
+        """
+        await self._rate_limiter.acquire(method, uri, account=self._access_key, params=params, body=body)
         url = urljoin(BASE_REST, uri)
         data = {}
         if params:
             data.update(params)
         if body:
             data.update(body)
+        if auth and "timestamp" in data:
+            # 重试时重新取时间戳, 避免超出 recvWindow (-1021)
+            data["timestamp"] = str(get_cur_timestamp_ms())
         if not headers:
             headers = {}
         if data:
@@ -565,8 +583,10 @@ class BinanceUSwapRestApi:
             headers["X-MBX-APIKEY"] = self._access_key
         if query:
             url += ("?" + query)
-        _, success, error = await AsyncHttpRequests.fetch(method, url, headers=headers, timeout=10)
-        return success, error
+        code, success, error = await AsyncHttpRequests.fetch(method, url, headers=headers, timeout=10)
+        if code in (418, 429):
+            self._rate_limiter.penalize(method, uri, account=self._access_key)
+        return code, success, error
 
 
 class BinanceUSwapTrade:
@@ -623,12 +643,16 @@ class BinanceUSwapTrade:
         self._order_update_callback = kwargs.get("order_update_callback")
         self._position_update_callback = kwargs.get("position_update_callback")
         self._init_success_callback = kwargs.get("init_success_callback")
+        self._init_timeout = kwargs.get("init_timeout", 10)  # 初始化截止时间(秒)
         self._error_callback = kwargs.get("error_callback")
+        # 持仓和资产由ACCOUNT_UPDATE推送维护, 只按较长的间隔通过REST对账, 0表示不对账
+        self._position_reconcile_interval = kwargs.get("position_reconcile_interval", 300)
+        self._listen_key_interval = kwargs.get("listen_key_interval", 1800)  # listen key 续期间隔(秒), 有效期60分钟
 
         self._ws = None
         self._ok = False  # Initialize successfully ?
-        self._assets = Asset(platform=self._platform,
-                             account=self._account)  # Asset detail, {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }.
+        self._assets = Asset(platform=self._platform, account=self._account,
+                             assets={})  # Asset detail, {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }.
         self._orders = {}  # Order objects, {"order_id": order, ...}.
         self._position = Position(self._platform, self._account, self._strategy, self._symbol)
         self._listen_key = None
@@ -641,6 +665,9 @@ class BinanceUSwapTrade:
             access_key=self._access_key
         )
         SingleTask.run(self._init_websocket)
+        LoopRunTask.register(self._reset_listen_key, self._listen_key_interval)
+        if self._position_reconcile_interval > 0:
+            LoopRunTask.register(self._check_position_update, self._position_reconcile_interval)
 
     @property
     def assets(self):
@@ -677,22 +704,32 @@ class BinanceUSwapTrade:
         self._listen_key = success["listenKey"]
         uri = "/ws/" + self._listen_key
         url = urljoin(self._wss, uri)
-        self._ws = Websocket(
-            url,
-            connected_callback=self.connected_callback,
-            process_callback=self.process_binary
-        )
+        self._ws = _UserDataStream(url, self)
+
+    async def _renew_listen_key(self):
+        """ listen key过期之后重新获取, 关闭连接之后由连接检查使用新地址重连 """
+        success, error = await self._rest_api.get_listen_key()
+        if error:
+            logger.error("get listen key failed:", error, caller=self)
+            return
+        self._listen_key = success["listenKey"]
+        self._ws.url = urljoin(self._wss, "/ws/" + self._listen_key)
+        if self._ws.ws and not self._ws.ws.closed:
+            await self._ws.ws.close()
 
     async def connected_callback(self):
 
         """After connect to Websocket server successfully, send a auth message to server."""
         logger.info("Websocket connection authorized successfully.", caller=self)
-        order_infos, error = await self._rest_api.get_open_orders(self._symbol)
+        results, timings, error = await run_bootstrap({
+            "orders": self._rest_api.get_open_orders(self._symbol),
+            "position": self._rest_api.get_position()
+        }, self._init_timeout)
         if error:
-            e = Error("get open orders error: {}".format(error))
-            SingleTask.run(self._init_success_callback, False, e)
+            e = Error("initialize error: {}".format(error))
+            SingleTask.run(self._init_success_callback, False, e, timings=timings)
             return
-        for order_info in order_infos:
+        for order_info in results["orders"]:
             order_no = "{}_{}".format(order_info["orderId"], order_info["clientOrderId"])
             if order_info["status"] == "NEW":
                 status = ORDER_STATUS_SUBMITTED
@@ -729,8 +766,11 @@ class BinanceUSwapTrade:
             order = Order(**info)
             self._orders[order_no] = order
             SingleTask.run(self._order_update_callback, copy.copy(order))
+        # 初始持仓从REST获取, 之后由ACCOUNT_UPDATE推送维护
+        self._reconcile_position(results["position"], force_callback=True)
         self._ok = True
-        SingleTask.run(self._init_success_callback, True, None)
+        logger.info("initialize success, timings:", timings, caller=self)
+        SingleTask.run(self._init_success_callback, True, None, timings=timings)
 
     @async_method_locker("OkexSwapTrade.process_binary.locker")
     async def process_binary(self, msg):
@@ -741,11 +781,15 @@ class BinanceUSwapTrade:
         if e == "ORDER_TRADE_UPDATE":  # Order update.
             self._update_order(msg["o"])
         elif e == "ACCOUNT_UPDATE":
-            m = msg["a"].get("m")
-            if m == "ORDER":
-                a = msg["a"]
+            # 下单成交、资金费、划转等所有原因引起的余额和持仓变化都会推送, 只包含发生变化的资产和持仓
+            a = msg["a"]
+            if a.get("B"):
                 self.on_asset_update(a["B"])
-                self.on_position_update(a["P"])
+            if a.get("P"):
+                self.on_position_update(a["P"], msg.get("E"))
+        elif e == "listenKeyExpired":
+            logger.warn("listen key expired, renew listen key.", caller=self)
+            SingleTask.run(self._renew_listen_key)
 
     async def create_order(self, symbol, action, price, quantity, order_type=ORDER_TYPE_LIMIT, client_oid=None,
                            *args, **kwargs):
@@ -877,39 +921,79 @@ class BinanceUSwapTrade:
             return None, error
 
     async def _check_position_update(self, *args, **kwargs):
-        """Check position update."""
+        """ 定时通过REST对账, 持仓正常由ACCOUNT_UPDATE推送维护, 与推送结果不一致时以REST为准并回调 """
         if not self._ok:
             return
-        update = False
         success, error = await self._rest_api.get_position()
         if error:
+            logger.warn("reconcile position failed:", error, caller=self)
             return
+        if self._reconcile_position(success):
+            logger.warn("position corrected by REST reconcile:", self._position, caller=self)
+
+    def _reconcile_position(self, items, force_callback=False):
+        """ 使用REST持仓数据(positionRisk)更新持仓
 
-        position_info = None
-        for item in success:
-            if item["symbol"] == self._symbol:
-                position_info = item
-                break
-
-        if not self._position.utime:  # Callback position info when initialized.
-            update = True
-            self._position.update()
-        size = float(position_info["positionAmt"])
-        average_price = float(position_info["entryPrice"])
-        if size > 0:
-            if self._position.long_quantity != size:
-                update = True
-                self._position.update(0, 0, size, average_price, 0)
-        elif size < 0:
-            if self._position.short_quantity != abs(size):
-                update = True
-                self._position.update(abs(size), average_price, 0, 0, 0)
-        elif size == 0:
-            if self._position.long_quantity != 0 or self._position.short_quantity != 0:
-                update = True
-                self._position.update()
-        if update:
-            await self._position_update_callback(copy.copy(self._position))
+        :returns:
+            changed: 持仓是否有变化.
+        """
+        changed = False
+        for item in items or []:
+            if item["symbol"] != self._symbol.upper():
+                continue
+            changed |= self._apply_position(item.get("positionSide", "BOTH"), float(item["positionAmt"]),
+                                            float(item["entryPrice"]), float(item["unRealizedProfit"]),
+                                            item.get("marginType"), float(item.get("liquidationPrice") or 0),
+                                            item.get("leverage"))
+        if changed or force_callback:
+            self._position.utime = tools.get_cur_timestamp_ms()
+            SingleTask.run(self._position_update_callback, copy.copy(self._position))
+        return changed
+
+    def _apply_position(self, side, amount, entry_price, unrealised_pnl, margin_mode=None, liquid_price=None,
+                        leverage=None):
+        """ 更新持仓
+
+        Attributes:
+            :param side: Binance持仓方向, BOTH(单向持仓) / LONG / SHORT(双向持仓).
+            :param amount: 持仓数量, 单向持仓时正数为多头, 负数为空头.
+            :param entry_price: 开仓均价.
+            :param unrealised_pnl: 未实现盈亏.
+            :param margin_mode: 保证金模式, cross / isolated.
+            :param liquid_price: 预估强平价格.
+            :param leverage: 杠杆倍数.
+        :returns:
+            changed: 持仓是否有变化.
+        """
+        p = self._position
+        before = (p.margin_mode, p.long_quantity, p.long_open_price, p.long_unrealised_pnl,
+                  p.short_quantity, p.short_open_price, p.short_unrealised_pnl)
+        is_long = side == "LONG" or (side == "BOTH" and amount > 0)
+        is_short = side == "SHORT" or (side == "BOTH" and amount < 0)
+        if side == "BOTH" and not is_long:
+            p.long_quantity = p.long_avail_qty = p.long_open_price = p.long_unrealised_pnl = 0
+        if side == "BOTH" and not is_short:
+            p.short_quantity = p.short_avail_qty = p.short_open_price = p.short_unrealised_pnl = 0
+        if is_long:
+            p.long_quantity = p.long_avail_qty = abs(amount)
+            p.long_open_price = entry_price
+            p.long_unrealised_pnl = unrealised_pnl
+            if liquid_price is not None:
+                p.long_liquid_price = liquid_price
+            if leverage:
+                p.long_leverage = leverage
+        if is_short:
+            p.short_quantity = p.short_avail_qty = abs(amount)
+            p.short_open_price = entry_price
+            p.short_unrealised_pnl = unrealised_pnl
+            if liquid_price is not None:
+                p.short_liquid_price = liquid_price
+            if leverage:
+                p.short_leverage = leverage
+        if margin_mode:
+            p.margin_mode = CROSS if margin_mode.lower() == "cross" else ISOLATED
+        return before != (p.margin_mode, p.long_quantity, p.long_open_price, p.long_unrealised_pnl,
+                          p.short_quantity, p.short_open_price, p.short_unrealised_pnl)
 
     def _update_order(self, order_info):
         """ Order update.
@@ -969,76 +1053,64 @@ class BinanceUSwapTrade:
             self._orders.pop(order_no)
         SingleTask.run(self._order_update_callback, copy.copy(order))
 
-    def on_position_update(self, data, *args, **kwargs):
-        """
-        :param data:
-        :param args:
-        :param kwargs:
-        :return:
+    def on_position_update(self, data, timestamp=None):
+        """ ACCOUNT_UPDATE推送的持仓更新
 
-        仓位更新 [{'s': 'ETHUSDT', 'pa': '-0.100', 'ep': '1321.93000', 'cr': '-0.06700000', 'up': '-0.00700000', 'mt': 'cross', 'iw': '0', 'ps': 'BOTH', 'ma': 'USDT'}]
-        仓位更新 [{'s': 'ETHUSDT', 'pa': '0.200', 'ep': '1309.37000', 'cr': '-1.00700000', 'up': '-0.24400000', 'mt': 'cross', 'iw': '0', 'ps': 'BOTH', 'ma': 'USDT'}]
-        仓位信息中"pa"表示持仓信息,正数为多头头寸,负数为空头头寸
+        Args:
+            data: 持仓列表, e.g. [{'s': 'ETHUSDT', 'pa': '-0.100', 'ep': '1321.93000', 'cr': '-0.06700000',
+                  'up': '-0.00700000', 'mt': 'cross', 'iw': '0', 'ps': 'BOTH', 'ma': 'USDT'}]
+                  "pa"表示持仓数量, 单向持仓时正数为多头头寸, 负数为空头头寸.
+            timestamp: 推送事件时间, millisecond.
         """
+        changed = False
         for posi in data:
-            s = posi.get("s")
-            if s != self._symbol:
-                return
-
-            pa = posi["pa"]
-            if pa > 0:
-                self.position.long_quantity = posi.get("pa")  # 多仓数量
-                self.position.long_avail_qty = posi.get("pa")  # 多仓可平仓数量
-                self.position.long_avg_price = posi.get("ep")  # 多仓持仓平均价格
-                self.position.long_pnl = posi.get("up")  # 多仓盈亏
-
-                self.position.short_quantity = "0"  # 空仓数量
-                self.position.short_avail_qty = "0"  # 空仓可平仓数量
-                self.position.short_avg_price = "0"  # 空仓持仓平均价格
-                self.position.short_pnl = "0"  # 空仓盈亏
-            elif pa < 0:
-                pa = posi.get("pa").split("-")[1]
-                self.position.long_quantity = "0"  # 多仓数量
-                self.position.long_avail_qty = "0"  # 多仓可平仓数量
-                self.position.long_avg_price = "0"  # 多仓持仓平均价格
-                self.position.long_pnl = "0"  # 多仓盈亏
-
-                self.position.short_quantity = pa  # 空仓数量
-                self.position.short_avail_qty = pa  # 空仓可平仓数量
-                self.position.short_avg_price = posi.get("ep")  # 空仓持仓平均价格
-                self.position.short_pnl = posi.get("up")  # 空仓盈亏
-            elif pa == 0:
-                self.position.short_quantity = "0"  # 空仓数量
-                self.position.short_avail_qty = "0"  # 空仓可平仓数量
-                self.position.short_avg_price = "0"  # 空仓持仓平均价格
-                self.position.short_pnl = "0"  # 空仓盈亏
-
-                self.position.long_quantity = "0"  # 多仓数量
-                self.position.long_avail_qty = "0"  # 多仓可平仓数量
-                self.position.long_avg_price = "0"  # 多仓持仓平均价格
-                self.position.long_pnl = "0"  # 多仓盈亏
-            else:
-                pass
-        SingleTask.run(self._position_update_callback, copy.copy(self._position))
+            if posi.get("s") != self._symbol.upper():
+                continue
+            changed |= self._apply_position(posi.get("ps", "BOTH"), float(posi["pa"]), float(posi["ep"]),
+                                            float(posi["up"]), posi.get("mt"))
+        if changed:
+            self._position.utime = timestamp or tools.get_cur_timestamp_ms()
+            SingleTask.run(self._position_update_callback, copy.copy(self._position))
 
     def on_asset_update(self, asset):
-        """ Asset data update callback.
+        """ ACCOUNT_UPDATE推送的余额更新, 只包含发生变化的币种, 合并到已有资产中
 
         Args:
-            asset: Asset object.
+            asset: 余额列表, e.g. [{'a': 'USDT', 'wb': '122624.12345678', 'cw': '100.12345678', 'bc': '50.12345678'}]
         """
+        assets = dict(self._assets.assets or {})
         for ass in asset:
-            assets = {}
-            a = ass.get("a")
             total = float(ass.get("wb"))
-            assets[a] = {
+            assets[ass.get("a")] = {
                 "total": "%.8f" % total,
                 "free": "%.8f" % 0,
                 "locked": "%.8f" % 0
             }
+        self._assets.assets = assets
+        self._assets.timestamp = tools.get_cur_timestamp_ms()
+        self._assets.update = True
+        SingleTask.run(self._asset_update_callback, copy.copy(self._assets))
+
+
+class _UserDataStream(Websocket):
+    """ 用户数据流连接, 连接和消息转发给BinanceUSwapTrade """
+
+    def __init__(self, url, trader):
+        super(_UserDataStream, self).__init__(url, send_hb_interval=0)
+        self._trader = trader
+        self.initialize()
 
-            self._assets.assets = assets
-            self._assets.timestamp = tools.get_cur_timestamp_ms()
-            self._assets.update = True
-            SingleTask.run(self._asset_update_callback, copy.copy(self._assets))
+    @property
+    def url(self):
+        return self._url
+
+    @url.setter
+    def url(self, url):
+        self._url = url
+
+    async def connected_callback(self):
+        await self._trader.connected_callback()
 
+    async def process(self, msg):
+        if isinstance(msg, dict):
+            await self._trader.process_binary(msg)
@@ -20,11 +20,12 @@ from xuanwu.model.symbol_info import SymbolInfo
 from xuanwu.error import Error
 from xuanwu.utils import logger
 from xuanwu.tasks import SingleTask
-from xuanwu.const import OKEX_V5
+from xuanwu.const import OKEX_V5, GATEIO
 from xuanwu.utils.websocket import Websocket
 from xuanwu.utils.decorator import async_method_locker
+from xuanwu.utils.bootstrap import run_bootstrap
 from xuanwu.model.order import *
-from xuanwu.utils.tools import decimal_digits
+from xuanwu.symbol_registry import SymbolRegistry
 from .gateio_usdt_rest import GateIORest
 
 __all__ = ("GateIOUsdtTrade",)
@@ -78,6 +79,7 @@ class GateIOUsdtTrade(Websocket):
         self._position_update_callback = kwargs.get("position_update_callback")
         self._asset_update_callback = kwargs.get("asset_update_callback")
         self._init_success_callback = kwargs.get("init_success_callback")
+        self._init_timeout = kwargs.get("init_timeout", 10)  # 初始化截止时间(秒)
 
         self._assets = {}  # Asset object. e.g. {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }
         self._orders = {}  # Order objects. e.g. {"order_no": Order, ... }
@@ -142,21 +144,32 @@ class GateIOUsdtTrade(Websocket):
         # 而是在订阅时进行签名以识别
 
     async def _sub_callback(self):
-        """数据订阅之后，初始化账户未成交订单和交易币对信息"""
-        # 查询未成交订单(未成交订单和部分成交)
-        orders, error = await self.get_open_orders()
+        """数据订阅之后，并发初始化交易币对信息、账户未成交订单和持仓, 完成后通过init_success_callback返回各步骤耗时"""
+        results, timings, error = await run_bootstrap({
+            "symbol_info": self._load_symbol_info(),
+            "orders": self._rest_api.get_open_orders(symbol=self._symbol),
+            "position": self.get_position()
+        }, self._init_timeout)
         if error:
-            logger.error(f"get_orders error: {orders}, {error}", caller=self)
-            # 初始化过程中发生错误,关闭网络连接,触发重连机制
+            logger.error("initialize failed:", error, "timings:", timings, caller=self)
+            SingleTask.run(self._init_success_callback, False, error, timings=timings)
             return
-        for o in orders:
-            SingleTask.run(self._order_update_callback, o)
-
-        position, error = await self.get_position()
+        for d in results["orders"].get("data") or []:
+            SingleTask.run(self._order_update_callback, self._convert_order_format(data=d))
+        SingleTask.run(self._position_update_callback, results["position"])
+        logger.info("initialize success, timings:", timings, caller=self)
+        SingleTask.run(self._init_success_callback, True, None, timings=timings)
+
+    async def _load_symbol_info(self):
+        """ 从共享的SymbolRegistry获取USDT结算合约信息 """
+        registry = SymbolRegistry.get(GATEIO, host=self._host)
+        symbol_info, error = await registry.load_symbol("USDT", self._symbol)
         if error:
-            logger.error(f"get_position error: {error}", caller=self)
-            return
-        SingleTask.run(self._position_update_callback, position)
+            return None, Error(f"get symbol info failed!, {error}")
+        if not symbol_info:
+            return None, Error(f"symbol info not found! symbol: {self._symbol}")
+        self._symbol_info = symbol_info
+        return symbol_info, None
 
     async def _login_callback(self):
         """登录成功之后，订阅相关数据"""
@@ -204,8 +217,8 @@ class GateIOUsdtTrade(Websocket):
                 pass
 
             if self._subscribe_order_ok and self._subscribe_position_ok and self._subscribe_assets_ok:
-                await self._sub_callback()
-                SingleTask.run(self._init_success_callback, True)
+                # 初始化在process锁之外执行, 避免锁超时取消初始化请求
+                SingleTask.run(self._sub_callback)
 
         else:
             if msg.get("channel"):
@@ -272,8 +285,17 @@ class GateIOUsdtTrade(Websocket):
                     self._position.utime = 0
                     self._position.ctime = 0
 
-                    self._position.netPosition = pos_size
-                    self._position.openPrice = open_price
+                    # 单向持仓, 按方向映射到多仓/空仓字段
+                    if pos_side == "long":
+                        self._position.long_quantity = pos_size
+                        self._position.long_open_price = open_price
+                        self._position.short_quantity = 0
+                        self._position.short_open_price = 0
+                    else:
+                        self._position.short_quantity = abs(pos_size)
+                        self._position.short_open_price = open_price
+                        self._position.long_quantity = 0
+                        self._position.long_open_price = 0
 
             SingleTask.run(self._position_update_callback, copy.copy(self._position))
 
@@ -383,10 +405,6 @@ class GateIOUsdtTrade(Websocket):
         trade_type = None
 
         quantity = data["size"]
-        if self._symbol_info.size_limit:
-            symbol_size_limit = decimal_digits(float(self._symbol_info.size_limit))
-        else:
-            symbol_size_limit = 6
         # below row was edited by Turkey Sui 2021/10/13 1:22 A.M.
         remain = data["left"]
 
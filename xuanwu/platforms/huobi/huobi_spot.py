@@ -16,6 +16,7 @@ import datetime
 import time
 from urllib.parse import urljoin
 from xuanwu.const import USER_AGENT
+from xuanwu.const import HUOBI
 from xuanwu.const import MARKET_TYPE_KLINE
 from xuanwu.model.market import Orderbook, Kline, Trade
 from urllib.parse import urljoin
@@ -26,6 +27,7 @@ from xuanwu.tasks import SingleTask
 from xuanwu.const import HUOBI_SWAP
 from xuanwu.utils.websocket import Websocket
 from xuanwu.utils.http_client import AsyncHttpRequests
+from xuanwu.utils.rate_limiter import RateLimiter
 from xuanwu.utils.decorator import async_method_locker
 from xuanwu.model.order import *
 
@@ -46,6 +48,7 @@ class HuobiSpotRestAPI:
         self._host = host
         self._access_key = access_key
         self._secret_key = secret_key
+        self._rate_limiter = RateLimiter.get(HUOBI)
         self._account_id = None
 
     async def get_spot_info(self):
@@ -393,6 +396,26 @@ class HuobiSpotRestAPI:
             success: Success results, otherwise it's None.
             error: Error information, otherwise it's None.
         """
+        code, success, error = await AsyncHttpRequests.retry(
+            lambda: self._request(method, uri, copy.copy(params), body, copy.copy(headers), auth),
+            method, urljoin(self._host, uri), params, body)
+        if error:
+            return None, error
+        if not isinstance(success, dict):
+            result = json.loads(success)
+        else:
+            result = success
+        if result.get("status") and result.get("status") != "ok":
+            return None, result
+        return result, None
+
+    async def _request(self, method, uri, params=None, body=None, headers=None, auth=False):
+        """ Sign and send the request once, see `request`.
+
+        :returns:
+            :return code, success, error: HTTP response code, success results and error information.
+        """
+        await self._rate_limiter.acquire(method, uri, account=self._access_key, params=params, body=body)
         if uri.startswith("http://") or uri.startswith("https://"):
             url = uri
         else:
@@ -413,22 +436,16 @@ class HuobiSpotRestAPI:
         if method == "GET":
             headers["Content-type"] = "application/x-www-form-urlencoded"
             headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
+            code, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
         else:
             headers["Accept"] = "application/json"
             headers["Content-type"] = "application/json"
             headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body, headers=headers,
-                                                              timeout=10)
-        if error:
-            return None, error
-        if not isinstance(success, dict):
-            result = json.loads(success)
-        else:
-            result = success
-        if result.get("status") and result.get("status") != "ok":
-            return None, result
-        return result, None
+            code, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body,
+                                                                 headers=headers, timeout=10)
+        if code == 429:
+            self._rate_limiter.penalize(method, uri, account=self._access_key)
+        return code, success, error
 
     def generate_signature(self, method, params, request_path):
         if request_path.startswith("http://") or request_path.startswith("https://"):
@@ -28,6 +28,8 @@ from xuanwu.tasks import SingleTask
 from xuanwu.const import HUOBI_SWAP
 from xuanwu.utils.websocket import Websocket
 from xuanwu.utils.http_client import AsyncHttpRequests
+from xuanwu.utils.rate_limiter import RateLimiter
+from xuanwu.utils.bootstrap import run_bootstrap
 from xuanwu.utils.decorator import async_method_locker
 
 __all__ = ("HuobiSwapMarket", "HuobiSwapTrade",)
@@ -47,6 +49,7 @@ class HuobiSwapRestAPI:
         self._host = host
         self._access_key = access_key
         self._secret_key = secret_key
+        self._rate_limiter = RateLimiter.get(HUOBI_SWAP)
 
     async def get_swap_info(self, contract_code=None):
         """ Get Swap Info
@@ -434,6 +437,26 @@ class HuobiSwapRestAPI:
             :return success: Success results, otherwise it's None.
             :return error: Error information, otherwise it's None.
         """
+        code, success, error = await AsyncHttpRequests.retry(
+            lambda: self._request(method, uri, copy.copy(params), body, copy.copy(headers), auth),
+            method, urljoin(self._host, uri), params, body)
+        if error:
+            return None, error
+        if not isinstance(success, dict):
+            result = json.loads(success)
+        else:
+            result = success
+        if result.get("status") != "ok":
+            return None, result
+        return result, None
+
+    async def _request(self, method, uri, params=None, body=None, headers=None, auth=False):
+        """ Sign and send the request once, see `request`.
+
+        :returns:
+            :return code, success, error: HTTP response code, success results and error information.
+        """
+        await self._rate_limiter.acquire(method, uri, account=self._access_key, params=params, body=body)
         if uri.startswith("http://") or uri.startswith("https://"):
             url = uri
         else:
@@ -454,22 +477,16 @@ class HuobiSwapRestAPI:
         if method == "GET":
             headers["Content-type"] = "application/x-www-form-urlencoded"
             headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
+            code, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
         else:
             headers["Accept"] = "application/json"
             headers["Content-type"] = "application/json"
             headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body, headers=headers,
-                                                              timeout=10)
-        if error:
-            return None, error
-        if not isinstance(success, dict):
-            result = json.loads(success)
-        else:
-            result = success
-        if result.get("status") != "ok":
-            return None, result
-        return result, None
+            code, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body,
+                                                                 headers=headers, timeout=10)
+        if code == 429:
+            self._rate_limiter.penalize(method, uri, account=self._access_key)
+        return code, success, error
 
     def generate_signature(self, method, params, request_path):
         if request_path.startswith("http://") or request_path.startswith("https://"):
@@ -738,6 +755,7 @@ class HuobiSwapTrade(Websocket):
         self._position_update_callback = kwargs.get("position_update_callback")
         self._asset_update_callback = kwargs.get("asset_update_callback")
         self._init_success_callback = kwargs.get("init_success_callback")
+        self._init_timeout = kwargs.get("init_timeout", 10)  # 初始化截止时间(秒)
 
         url = self._wss + "/swap-notification"
         super(HuobiSwapTrade, self).__init__(url, send_hb_interval=5)
@@ -848,19 +866,24 @@ class HuobiSwapTrade(Websocket):
             self._subscribe_asset_ok = True
         if self._subscribe_order_ok and self._subscribe_position_ok \
                 and self._subscribe_asset_ok:
-            success, error = await self._rest_api.get_open_orders(self._symbol)
+            results, timings, error = await run_bootstrap({
+                "orders": self._rest_api.get_open_orders(self._symbol)
+            }, self._init_timeout)
             if error:
-                e = Error("get open orders failed!")
-                SingleTask.run(self._init_success_callback, False, e)
-            elif "data" in success and "orders" in success["data"]:
+                logger.error("initialize failed:", error, "timings:", timings, caller=self)
+                SingleTask.run(self._init_success_callback, False, error, timings=timings)
+                return
+            success = results["orders"]
+            if "data" in success and "orders" in success["data"]:
                 for order_info in success["data"]["orders"]:
                     order_info["ts"] = order_info["created_at"]
                     self._update_order(order_info)
-                SingleTask.run(self._init_success_callback, True, None)
+                logger.info("initialize success, timings:", timings, caller=self)
+                SingleTask.run(self._init_success_callback, True, None, timings=timings)
             else:
                 logger.warn("get open orders:", success, caller=self)
                 e = Error("Get Open Orders Unknown error")
-                SingleTask.run(self._init_success_callback, False, e)
+                SingleTask.run(self._init_success_callback, False, e, timings=timings)
 
     @async_method_locker("HuobiSwapTrade.process_binary.locker")
     async def process_binary(self, raw):
@@ -14,6 +14,7 @@ import urllib
 import hashlib
 import datetime
 import time
+import asyncio
 from urllib.parse import urljoin
 from xuanwu.const import HUOBI_USDT_SWAP, USER_AGENT
 from xuanwu.model.asset import Asset
@@ -24,6 +25,9 @@ from xuanwu.utils import tools, logger
 from xuanwu.tasks import SingleTask
 from xuanwu.utils.websocket import Websocket
 from xuanwu.utils.http_client import AsyncHttpRequests
+from xuanwu.utils.rate_limiter import RateLimiter
+from xuanwu.utils.batcher import RequestBatcher
+from xuanwu.utils.bootstrap import run_bootstrap
 from xuanwu.utils.decorator import async_method_locker
 
 __all__ = ("HuobiUsdtSwapTrade",)
@@ -43,6 +47,7 @@ class HuobiUsdtSwapRestAPI:
         self._host = host
         self._access_key = access_key
         self._secret_key = secret_key
+        self._rate_limiter = RateLimiter.get(HUOBI_USDT_SWAP)
 
     async def get_swap_info(self, contract_code=None):
         """ Get Swap Info
@@ -513,6 +518,26 @@ class HuobiUsdtSwapRestAPI:
             :return success: Success results, otherwise it's None.
             :return error: Error information, otherwise it's None.
         """
+        code, success, error = await AsyncHttpRequests.retry(
+            lambda: self._request(method, uri, copy.copy(params), body, copy.copy(headers), auth),
+            method, urljoin(self._host, uri), params, body)
+        if error:
+            return None, error
+        if not isinstance(success, dict):
+            result = json.loads(success)
+        else:
+            result = success
+        if result.get("status") != "ok":
+            return None, result
+        return result, None
+
+    async def _request(self, method, uri, params=None, body=None, headers=None, auth=False):
+        """ Sign and send the request once, see `request`.
+
+        :returns:
+            :return code, success, error: HTTP response code, success results and error information.
+        """
+        await self._rate_limiter.acquire(method, uri, account=self._access_key, params=params, body=body)
         if uri.startswith("http://") or uri.startswith("https://"):
             url = uri
         else:
@@ -533,22 +558,16 @@ class HuobiUsdtSwapRestAPI:
         if method == "GET":
             headers["Content-type"] = "application/x-www-form-urlencoded"
             headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
+            code, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
         else:
             headers["Accept"] = "application/json"
             headers["Content-type"] = "application/json"
             headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body, headers=headers,
-                                                              timeout=10)
-        if error:
-            return None, error
-        if not isinstance(success, dict):
-            result = json.loads(success)
-        else:
-            result = success
-        if result.get("status") != "ok":
-            return None, result
-        return result, None
+            code, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body,
+                                                                 headers=headers, timeout=10)
+        if code == 429:
+            self._rate_limiter.penalize(method, uri, account=self._access_key)
+        return code, success, error
 
     def generate_signature(self, method, params, request_path):
         if request_path.startswith("http://") or request_path.startswith("https://"):
@@ -622,6 +641,7 @@ class HuobiUsdtSwapTrade(Websocket):
         self._position_update_callback = kwargs.get("position_update_callback")
         self._asset_update_callback = kwargs.get("asset_update_callback")
         self._init_success_callback = kwargs.get("init_success_callback")
+        self._init_timeout = kwargs.get("init_timeout", 10)  # 初始化截止时间(秒)
 
         url = self._wss + "/linear-swap-notification"
         super(HuobiUsdtSwapTrade, self).__init__(url, send_hb_interval=5)
@@ -641,6 +661,14 @@ class HuobiUsdtSwapTrade(Websocket):
 
         self._rest_api = HuobiUsdtSwapRestAPI(self._host, self._access_key, self._secret_key)
 
+        # 可选的下单/撤单微批量合并, batch_window 时间窗口(秒)内的请求通过批量接口发送, 每批最多10个
+        self._order_batcher = None
+        self._cancel_batcher = None
+        if kwargs.get("batch_orders"):
+            batch_window = kwargs.get("batch_window", 0.005)
+            self._order_batcher = RequestBatcher(self._send_order_batch, max_batch=10, window=batch_window)
+            self._cancel_batcher = RequestBatcher(self._send_cancel_batch, max_batch=10, window=batch_window)
+
         self.initialize()
 
     @property
@@ -728,19 +756,24 @@ class HuobiUsdtSwapTrade(Websocket):
         elif data["topic"] == self._asset_channel:
             self._subscribe_asset_ok = True
         if self._subscribe_order_ok and self._subscribe_position_ok and self._subscribe_asset_ok:
-            success, error = await self._rest_api.get_open_orders(self._symbol)
+            results, timings, error = await run_bootstrap({
+                "orders": self._rest_api.get_open_orders(self._symbol)
+            }, self._init_timeout)
             if error:
-                e = Error("get open orders failed!")
-                SingleTask.run(self._init_success_callback, False, e)
-            elif "data" in success and "orders" in success["data"]:
+                logger.error("initialize failed:", error, "timings:", timings, caller=self)
+                SingleTask.run(self._init_success_callback, False, error, timings=timings)
+                return
+            success = results["orders"]
+            if "data" in success and "orders" in success["data"]:
                 for order_info in success["data"]["orders"]:
                     order_info["ts"] = order_info["created_at"]
                     self._update_order(order_info)
-                SingleTask.run(self._init_success_callback, True, None)
+                logger.info("initialize success, timings:", timings, caller=self)
+                SingleTask.run(self._init_success_callback, True, None, timings=timings)
             else:
                 logger.warn("get open orders:", success, caller=self)
                 e = Error("Get Open Orders Unknown error")
-                SingleTask.run(self._init_success_callback, False, e)
+                SingleTask.run(self._init_success_callback, False, e, timings=timings)
 
     async def process(self, msg):
         """只继承，不实现"""
@@ -824,6 +857,19 @@ class HuobiUsdtSwapTrade(Websocket):
             return None, "order type error"
 
         quantity = abs(int(quantity))
+        if self._order_batcher:
+            order = {
+                "contract_code": self._symbol,
+                "price": price,
+                "volume": quantity,
+                "direction": direction,
+                "offset": offset,
+                "lever_rate": lever_rate,
+                "order_price_type": order_price_type
+            }
+            if client_order_id:
+                order["client_order_id"] = client_order_id
+            return await self._order_batcher.submit(order)
         result, error = await self._rest_api.create_order(self._symbol, price, quantity, direction, offset, lever_rate,
                                                           order_price_type, client_order_id)
         if error:
@@ -910,7 +956,10 @@ class HuobiUsdtSwapTrade(Websocket):
                               cancel an order. If you set multiple param, you can cancel multiple orders.
                               Do not set param length more than 100.
         :returns:
-            :return Success or error, see bellow.
+            0 param: (True, None) if successfully, otherwise (False, error).
+            1 param: (order_no, error), error is None if successfully.
+            multiple params: (order_nos, errors), order_nos is the list of revoked order ids, errors is the list of
+                             error information of failed orders, None if all succeeded.
         """
         if len(order_nos) == 0:
             success, error = await self._rest_api.revoke_order_all(self._symbol)
@@ -920,22 +969,37 @@ class HuobiUsdtSwapTrade(Websocket):
                 return False, success["errors"]
             return True, None
 
+        order_nos = [str(o) for o in order_nos]
+        if self._cancel_batcher:
+            results = await asyncio.gather(*[self._cancel_batcher.submit(o) for o in order_nos])
+        else:
+            results = await self._send_cancel_batch(order_nos)
         if len(order_nos) == 1:
-            success, error = await self._rest_api.revoke_order(self._symbol, order_nos[0])
-            if error:
-                return order_nos[0], error
-            if success.get("errors"):
-                return False, success["errors"]
-            else:
-                return order_nos[0], None
+            return results[0]
+        errors = [error for _, error in results if error]
+        return [order_no for order_no, error in results if not error], errors if errors else None
 
-        if len(order_nos) > 1:
-            success, error = await self._rest_api.revoke_orders(self._symbol, order_nos)
-            if error:
-                return order_nos[0], error
-            if success.get("errors"):
-                return False, success["errors"]
-            return success, error
+    async def _send_order_batch(self, orders):
+        """ 批量下单, 返回与orders一一对应的 [(order_no, error), ...] """
+        result, error = await self._rest_api.create_orders({"orders_data": orders})
+        if error:
+            return [(None, error)] * len(orders)
+        results = [(None, result)] * len(orders)
+        data = result.get("data") or {}
+        for d in data.get("success") or []:  # index 从1开始
+            results[d["index"] - 1] = (str(d["order_id"]), None)
+        for d in data.get("errors") or []:
+            results[d["index"] - 1] = (None, d)
+        return results
+
+    async def _send_cancel_batch(self, order_nos):
+        """ 批量撤单, 返回与order_nos一一对应的 [(order_no, error), ...] """
+        result, error = await self._rest_api.revoke_orders(self._symbol, order_nos)
+        if error:
+            return [(order_no, error) for order_no in order_nos]
+        data = result.get("data") or {}
+        errors = {str(d["order_id"]): d for d in data.get("errors") or []}
+        return [(order_no, errors.get(order_no)) for order_no in order_nos]
 
     async def get_open_order_nos(self):
         """ Get open order id list.
@@ -13,6 +13,7 @@ import hmac
 import base64
 import time
 import zlib
+import asyncio
 from xuanwu.model.asset import Asset
 from xuanwu.model.order import Order
 from xuanwu.model.position import Position
@@ -29,6 +30,7 @@ from xuanwu.model.order import ORDER_STATUS_SUBMITTED, ORDER_STATUS_PARTIAL_FILL
     TRADE_TYPE_SELL_CLOSE
 from urllib.parse import urljoin
 from xuanwu.utils.http_client import AsyncHttpRequests
+from xuanwu.utils.batcher import RequestBatcher
 from collections import deque
 from xuanwu.model.market import Orderbook, Kline, Trade
 
@@ -864,6 +866,14 @@ class OkexFutureTrade:
             passphrase=self._passphrase
         )
 
+        # 可选的下单/撤单微批量合并, batch_window 时间窗口(秒)内的请求通过批量接口发送, 每批最多10个
+        self._order_batcher = None
+        self._cancel_batcher = None
+        if kwargs.get("batch_orders"):
+            batch_window = kwargs.get("batch_window", 0.005)
+            self._order_batcher = RequestBatcher(self._send_order_batch, max_batch=10, window=batch_window)
+            self._cancel_batcher = RequestBatcher(self._send_cancel_batch, max_batch=10, window=batch_window)
+
     @property
     def assets(self):
         return copy.copy(self._assets)
@@ -1058,6 +1068,15 @@ class OkexFutureTrade:
             logger.error("order_type error! order_type:", order_type, caller=self)
             return None
 
+        if self._order_batcher:
+            return await self._order_batcher.submit({
+                "order_type": order_type,
+                "client_oid": client_oid or "",
+                "type": _type,
+                "price": price,
+                "size": abs(int(quantity)),
+                "match_price": match_price
+            })
         result, error = await self.rest_api.create_order(symbol=self._symbol,
                                                          type=_type,
                                                          price=price,
@@ -1144,8 +1163,9 @@ class OkexFutureTrade:
             如果函数调用成功,但是多个订单有成功有失败的情况,比如输入3个订单id,成功2个,失败1个,那么
             返回值统一都类似:
             return [(成功订单ID, None),(成功订单ID, None),(失败订单ID, "失败原因")], None
+            开启batch_orders时, 单个订单返回 (order_no, error), 多个订单返回 (撤单成功的订单ID列表, 失败的错误信息列表 or None)
 
-        注意: 每次撤销订单只能固定撤销最多10个, 接口限制
+        注意: 每次撤销订单只能固定撤销最多10个, 接口限制; 开启batch_orders时不限制数量, 按每批10个合并撤单
         """
         if len(order_nos) == 0:
             success, error = await self.rest_api.revoke_orders_all(self._symbol)
@@ -1155,6 +1175,13 @@ class OkexFutureTrade:
                 order_nos = success.get("ids") if success.get("ids") else success.get("client_oids")
                 return order_nos, None
 
+        if self._cancel_batcher:
+            results = await asyncio.gather(*[self._cancel_batcher.submit(str(o)) for o in order_nos])
+            if len(order_nos) == 1:
+                return results[0]
+            errors = [error for _, error in results if error]
+            return [order_no for order_no, error in results if not error], errors if errors else None
+
         if len(order_nos) == 1:
             success, error = await self.rest_api.revoke_order(symbol=self._symbol, order_no=order_nos[0])
             if error:
@@ -1171,6 +1198,26 @@ class OkexFutureTrade:
 
                 return order_nos, None
 
+    async def _send_order_batch(self, orders):
+        """ 批量下单, 返回与orders一一对应的 [(order_no, error), ...] """
+        result, error = await self._rest_api.create_orders(self._symbol, orders)
+        if error:
+            return [(None, error)] * len(orders)
+        data = result.get("order_info") or []
+        if len(data) != len(orders):
+            return [(None, result)] * len(orders)
+        return [(d["order_id"], None) if d.get("error_code") in ("0", "", 0, None) else (None, d) for d in data]
+
+    async def _send_cancel_batch(self, order_nos):
+        """ 批量撤单, 返回与order_nos一一对应的 [(order_no, error), ...] """
+        success, error = await self._rest_api.revoke_orders(self._symbol, order_ids=order_nos)
+        if error:
+            return [(order_no, error) for order_no in order_nos]
+        if not success.get("result"):
+            return [(order_no, success) for order_no in order_nos]
+        revoked = {str(o) for o in success.get("order_ids") or success.get("ids") or []}
+        return [(order_no, None if order_no in revoked else success) for order_no in order_nos]
+
     async def get_open_order_nos(self):
         """ Get open order id list.
 
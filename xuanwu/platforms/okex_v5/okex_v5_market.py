@@ -8,6 +8,7 @@
 """
 import copy
 import zlib
+import random
 from xuanwu.utils import logger
 from xuanwu.utils.websocket import Websocket
 from xuanwu.const import KLINE_TYPE
@@ -21,15 +22,17 @@ class OkexV5Market(Websocket):
     Attributes:
         kwargs:
             platform: Exchange platform name, must be `huobi_usdt_swap`.
-            wss: Exchange Websocket host address.
+            wss: Exchange Websocket host address, default is `wss://ws.okex.com:8443`.
             symbols: Trade pair list, e.g. ["BTC_USDT"].
             channels: channel list, only `orderbook`, `kline` and `trade` to be enabled.
             orderbook_length: The length of orderbook's data to be published via OrderbookEvent, default is 10.
+            checksum_interval: 每多少次订单簿增量校验一次checksum, 默认100, 1表示每次都校验, 0表示只校验快照.
+            checksum_sample_rate: 订单簿增量的checksum随机抽查比例, 0~1, 默认0.
     """
 
     def __init__(self, **kwargs):
         self._platform = kwargs["platform"]
-        self._wss = kwargs.get("wss", "wss://ws.okex.com:8443")
+        self._wss = kwargs.get("wss") or "wss://ws.okex.com:8443"
         self._symbols = list(set(kwargs.get("symbols")))
         self._channels = list(set(kwargs.get("channels")))
         self._orderbook_length = kwargs.get("orderbook_length", 10)
@@ -37,8 +40,16 @@ class OkexV5Market(Websocket):
         self._kline_update_callback = kwargs.get("kline_update_callback")
         self._trade_update_callback = kwargs.get("trade_update_callback")
 
+        self._checksum_interval = kwargs.get("checksum_interval", 100)
+        self._checksum_sample_rate = kwargs.get("checksum_sample_rate", 0)
+
         self._c_to_s = {}  # {"channel": "symbol"}
         self._orderbook = {}
+        self._seq_ids = {}  # 订单簿最新的seqId. e.g. {"BTC-USDT-SWAP": 123456, ... }
+        self._update_count = {}  # 快照之后的增量次数
+        self._seq_gaps = 0
+        self._checksums = 0
+        self._checksum_failures = 0
 
         self.heartbeat_msg = "ping"
 
@@ -163,6 +174,9 @@ class OkexV5Market(Websocket):
 
     async def process_orderbook(self, data):
         """ orderbook数据处理
+
+            增量数据首先按 prevSeqId 与上一次的 seqId 校验连续性, 不连续说明丢失了推送, 立即重新订阅;
+            checksum需要重建字符串并计算crc32, 只按`checksum_interval`和`checksum_sample_rate`抽查.
         """
         action = data.get("action")
         arg = data.get("arg")
@@ -171,9 +185,10 @@ class OkexV5Market(Websocket):
         symbol = self._c_to_s.get(f"orderbook-{arg['instId']}")
         if not symbol:
             return
+        inst_id = arg['instId']
         if action == "snapshot":
             ob = Orderbook(platform=self._platform)
-            ob.symbol = arg['instId']
+            ob.symbol = inst_id
             ob.bids = data[0]["bids"]
             ob.asks = data[0]["asks"]
             ob.timestamp = data[0]["ts"]
@@ -183,37 +198,80 @@ class OkexV5Market(Websocket):
             if check_num == checksum:
                 logger.info("订单簿首次推送校验结果为：True", caller=self)
             else:
-                # 发送订阅
-                logger.info("校验错误，重新连接WS......", caller=self)
-                SingleTask.run(self._reconnect)
+                logger.info(f"{inst_id}, 快照校验错误，正在重新订阅……", caller=self)
+                self._checksum_failures += 1
+                SingleTask.run(self._resubscribe_orderbook, inst_id)
+                return
 
-            self._orderbook[f"{arg['instId']}"] = ob
+            self._orderbook[inst_id] = ob
+            self._seq_ids[inst_id] = data[0].get("seqId")
+            self._update_count[inst_id] = 0
 
         if action == "update":
-            asks = data[0]["asks"]
-            bids = data[0]["bids"]
-            bids_p = self._orderbook[f"{arg['instId']}"].bids
-            asks_p = self._orderbook[f"{arg['instId']}"].asks
-
-            bids_p = self.update_bids(bids, bids_p)
-            asks_p = self.update_asks(asks, asks_p)
-
-
-            checksum = data[0]['checksum']
-            check_num = self.check(bids_p, asks_p)
-            if check_num == checksum:
-                pass
-            else:
-                logger.info(f"{arg['instId']}, Update 校验结果为：False，正在重新订阅……", caller=self)
-                SingleTask.run(self._reconnect)
-
-            d = copy.copy(self._orderbook[f"{arg['instId']}"])
+            ob = self._orderbook.get(inst_id)
+            if not ob:
+                # 重新订阅之后, 收到新的快照之前的增量丢弃
+                return
+            seq_id = data[0].get("seqId")
+            prev_seq_id = data[0].get("prevSeqId")
+            last_seq_id = self._seq_ids.get(inst_id)
+            if seq_id is not None and last_seq_id is not None and prev_seq_id != last_seq_id:
+                logger.warn(f"{inst_id}, seqId不连续, 上一次seqId: {last_seq_id}, prevSeqId: {prev_seq_id}，正在重新订阅……", caller=self)
+                self._seq_gaps += 1
+                self._drop_orderbook(inst_id)
+                SingleTask.run(self._resubscribe_orderbook, inst_id)
+                return
+            # 交易所维护时seqId会重置为更小的值, prevSeqId连续即可接受
+            self._seq_ids[inst_id] = seq_id
+
+            bids_p = self.update_bids(data[0]["bids"], ob.bids)
+            asks_p = self.update_asks(data[0]["asks"], ob.asks)
+
+            self._update_count[inst_id] += 1
+            if self._should_verify(inst_id):
+                self._checksums += 1
+                if self.check(bids_p, asks_p) != data[0]['checksum']:
+                    logger.info(f"{inst_id}, Update 校验结果为：False，正在重新订阅……", caller=self)
+                    self._checksum_failures += 1
+                    self._drop_orderbook(inst_id)
+                    SingleTask.run(self._resubscribe_orderbook, inst_id)
+                    return
+
+            d = copy.copy(ob)
             d.asks = d.asks[:self._orderbook_length]
             d.bids = d.bids[:self._orderbook_length]
             d.timestamp = data[0]['ts']
 
             SingleTask.run(self._orderbook_update_callback, d)
 
+    @property
+    def orderbook_stats(self):
+        """ 订单簿校验计数 """
+        return {
+            "seq_gaps": self._seq_gaps,
+            "checksums": self._checksums,
+            "checksum_failures": self._checksum_failures
+        }
+
+    def _should_verify(self, inst_id):
+        """ 本次增量是否校验checksum """
+        if self._checksum_interval and self._update_count[inst_id] % self._checksum_interval == 0:
+            return True
+        return self._checksum_sample_rate > 0 and random.random() < self._checksum_sample_rate
+
+    def _drop_orderbook(self, inst_id):
+        self._orderbook.pop(inst_id, None)
+        self._seq_ids.pop(inst_id, None)
+
+    async def _resubscribe_orderbook(self, inst_id):
+        """ 重新订阅单个币对的订单簿, 交易所会重新推送全量快照 """
+        channel = {
+            "channel": "books50-l2-tbt",
+            "instId": inst_id
+        }
+        await self.ws.send_json({"op": "unsubscribe", "args": [channel]})
+        await self.ws.send_json({"op": "subscribe", "args": [channel]})
+
     async def process_trade(self, data):
         """ trade数据处理
         """
@@ -233,8 +291,10 @@ class OkexV5Market(Websocket):
                 "symbol": symbol,
                 "side": direction.upper(),
                 "price": price,
+                "trade_id": tick.get("tradeId"),
                 "quantity": quantity,
-                "timestamp": tick.get("ts")
+                "timestamp": tick.get("ts"),
+                "count": int(tick["count"]) if tick.get("count") else None
             }
             trade = Trade(**info)
             SingleTask.run(self._trade_update_callback, copy.copy(trade))
@@ -7,13 +7,15 @@
   @ History:
 """
 import hmac
+import copy
 import base64
 import datetime
 from urllib.parse import urljoin
-from xuanwu.const import CHANNEL_TYPE
+from xuanwu.const import CHANNEL_TYPE, OKEX_V5
 from xuanwu.model.order import *
 from xuanwu.utils import logger
 from xuanwu.utils.http_client import AsyncHttpRequests
+from xuanwu.utils.rate_limiter import RateLimiter
 
 __all__ = ("OkexV5Rest",)
 
@@ -39,6 +41,7 @@ class OkexV5Rest:
         self._access_key = access_key
         self._secret_key = secret_key
         self._passphrase = passphrase
+        self._rate_limiter = RateLimiter.get(OKEX_V5)
 
     # --------------------------------------------------- Public API ---------------------------------------------------
 
@@ -876,6 +879,18 @@ class OkexV5Rest:
             :return success: Success results, otherwise it's None.
             :return error: Error information, otherwise it's None.
         """
+        code, success, error = await AsyncHttpRequests.retry(
+            lambda: self._request(method, uri, copy.copy(params), body, copy.copy(headers), auth),
+            method, urljoin(self._host, uri), params, body)
+        return success, error
+
+    async def _request(self, method, uri, params=None, body=None, headers=None, auth=False):
+        """ Sign and send the request once, see `request`.
+
+        :returns:
+            :return code, success, error: HTTP response code, success results and error information.
+        """
+        await self._rate_limiter.acquire(method, uri, account=self._access_key, params=params, body=body)
         if params:
             query = "&".join(["{}={}".format(k, params[k]) for k in sorted(params.keys())])
             uri += "?" + query
@@ -904,5 +919,7 @@ class OkexV5Rest:
             headers["OK-ACCESS-PASSPHRASE"] = self._passphrase
             headers['x-simulated-trading'] = "0"
 
-        _, success, error = await AsyncHttpRequests.fetch(method, url, body=body, headers=headers, timeout=10)
-        return success, error
+        code, success, error = await AsyncHttpRequests.fetch(method, url, body=body, headers=headers, timeout=10)
+        if code == 429:
+            self._rate_limiter.penalize(method, uri, account=self._access_key)
+        return code, success, error
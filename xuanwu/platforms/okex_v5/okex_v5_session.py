@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/20 18:00
+  @ Description: OKX V5 多币对交易会话, 多个OkexV5Trade共享一个私有websocket连接和REST客户端
+  @ History:
+    1. 按instType订阅订单和持仓频道, 推送数据按instId分发到对应币对的OkexV5Trade;
+    2. 初始化时按instType一次性查询未成交订单和持仓, 交易币对信息从SymbolRegistry读取, 不再每个币对单独请求;
+    3. 登录和websocket交易请求与OkexV5Trade共用`PrivateWsMixin`, 账户推送只转换和回调一次.
+    使用:
+        session = OkexV5TradeSession(account=..., contract_type="swap", access_key=..., secret_key=...,
+                                     passphrase=...)
+        btc = OkexV5Trade(session=session, strategy=..., symbol="BTC-USDT-SWAP", order_update_callback=..., ...)
+        eth = OkexV5Trade(session=session, strategy=..., symbol="ETH-USDT-SWAP", order_update_callback=..., ...)
+"""
+import copy
+from xuanwu.error import Error
+from xuanwu.utils import logger
+from xuanwu.tasks import SingleTask
+from xuanwu.utils.websocket import Websocket
+from xuanwu.utils.decorator import async_method_locker
+from xuanwu.utils.bootstrap import run_bootstrap
+from .okex_v5_rest import OkexV5Rest
+from .okex_v5_trade import PrivateWsMixin
+
+__all__ = ("OkexV5TradeSession",)
+
+
+class OkexV5TradeSession(PrivateWsMixin, Websocket):
+    """ OKX V5 private connection shared by many OkexV5Trade.
+
+    Attributes:
+        kwargs:
+            account: Account name for this trade exchange.
+            contract_type: Instrument type of all symbols in this session, e.g. swap / futures / spot.
+            host: HTTP request host, default is `https://www.okex.com`.
+            wss: Websocket address, default is `wss://ws.okex.com:8443`.
+            access_key: Account's ACCESS KEY.
+            secret_key: Account's SECRET KEY.
+            passphrase: Account's PASSPHRASE.
+            ws_order_timeout: Timeout(seconds) of websocket trade requests, default is 3.
+            init_timeout: Initialize deadline(seconds), default is 10.
+            init_success_callback: Called after all registered symbols initialized, asynchronous function.
+    """
+
+    def __init__(self, **kwargs):
+        self._valid = False  # 参数检查通过之后才可以被OkexV5Trade使用
+        e = None
+        if not kwargs.get("account"):
+            e = Error("param account miss")
+        if not kwargs.get("contract_type"):
+            e = Error("param contract_type miss")
+        if not kwargs.get("host"):
+            kwargs["host"] = "https://www.okex.com"
+        if not kwargs.get("wss"):
+            kwargs["wss"] = "wss://ws.okex.com:8443"
+        if not kwargs.get("access_key"):
+            e = Error("param access_key miss")
+        if not kwargs.get("secret_key"):
+            e = Error("param secret_key miss")
+        if not kwargs.get("passphrase"):
+            e = Error("param passphrase miss")
+        if e:
+            logger.error(e, caller=self)
+            if kwargs.get("init_success_callback"):
+                SingleTask.run(kwargs["init_success_callback"], False, e)
+            return
+        self._account = kwargs["account"]
+        self._contract_type = kwargs["contract_type"]
+        self._host = kwargs["host"]
+        self._wss = kwargs["wss"]
+        self._access_key = kwargs["access_key"]
+        self._secret_key = kwargs["secret_key"]
+        self._passphrase = kwargs["passphrase"]
+        self._init_success_callback = kwargs.get("init_success_callback")
+        self._init_timeout = kwargs.get("init_timeout", 10)
+
+        self._traders = {}  # OkexV5Trade objects. e.g. {"BTC-USDT-SWAP": OkexV5Trade, ... }
+        self._assets = {}  # 账户资产, 所有币对共享. e.g. {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }
+        self._initialized = False
+
+        self._subscribe_order_ok = False
+        self._subscribe_assets_ok = False
+        self._subscribe_position_ok = False
+
+        self._init_ws_requests(kwargs.get("ws_order_timeout", 3))
+
+        self.heartbeat_msg = "ping"
+
+        self._rest_api = OkexV5Rest(self._host, self._access_key, self._secret_key, self._passphrase)
+        self._valid = True
+        url = self._wss + "/ws/v5/private"
+        super(OkexV5TradeSession, self).__init__(url, send_hb_interval=15)
+        self.initialize()
+
+    @property
+    def valid(self):
+        """ 初始化参数是否完整, 参数缺失的session不能共享给OkexV5Trade """
+        return self._valid
+
+    @property
+    def account(self):
+        return self._account
+
+    @property
+    def contract_type(self):
+        return self._contract_type
+
+    @property
+    def host(self):
+        return self._host
+
+    @property
+    def wss(self):
+        return self._wss
+
+    @property
+    def access_key(self):
+        return self._access_key
+
+    @property
+    def secret_key(self):
+        return self._secret_key
+
+    @property
+    def passphrase(self):
+        return self._passphrase
+
+    @property
+    def rest_api(self):
+        return self._rest_api
+
+    @property
+    def traders(self):
+        return dict(self._traders)
+
+    def register(self, trader):
+        """ 注册币对交易对象, 会话初始化完成之后注册的币对单独初始化 """
+        self._traders[trader.symbol] = trader
+        if self._initialized:
+            SingleTask.run(self._init_trader, trader)
+
+    async def _init_trader(self, trader):
+        await trader._sub_callback()
+
+    async def connected_callback(self):
+        self._ws_logged_in = False
+        self._subscribe_order_ok = False
+        self._subscribe_assets_ok = False
+        self._subscribe_position_ok = False
+        await self._ws_login()
+
+    async def _login_callback(self):
+        """登录成功之后, 按instType订阅订单、持仓和账户频道"""
+        inst_type = self._contract_type.upper()
+        data = {
+            "op": "subscribe",
+            "args": [
+                {"channel": "positions", "instType": inst_type},
+                {"channel": "orders", "instType": inst_type},
+                {"channel": "account"}
+            ]
+        }
+        await self.ws.send_json(data)
+
+    async def _sub_callback(self):
+        """数据订阅之后, 并发初始化所有币对的交易币对信息、未成交订单和持仓"""
+        inst_type = self._contract_type.upper()
+        results, timings, error = await run_bootstrap({
+            "symbol_info": self._load_symbol_infos(),
+            "orders": self._get_open_orders(inst_type),
+            "position": self._rest_api.get_position(inst_type=inst_type)
+        }, self._init_timeout)
+        if error:
+            logger.error("initialize failed:", error, "timings:", timings, caller=self)
+            for trader in self._traders.values():
+                SingleTask.run(trader._init_success_callback, False, error, timings=timings)
+            if self._init_success_callback:
+                SingleTask.run(self._init_success_callback, False, error, timings=timings)
+            return
+
+        for symbol, items in self._group_by_symbol(results["orders"]).items():
+            self._traders[symbol]._update_order({"arg": {"channel": "orders", "instId": symbol}, "data": items})
+        positions = self._group_by_symbol(results["position"].get("data") or [])
+        for symbol, trader in self._traders.items():
+            if symbol in positions:
+                trader._update_position({"data": positions[symbol]})
+            else:
+                SingleTask.run(trader._position_update_callback, trader.position)
+
+        self._initialized = True
+        logger.info("initialize success, symbols:", len(self._traders), "timings:", timings, caller=self)
+        for trader in self._traders.values():
+            SingleTask.run(trader._init_success_callback, True, None, timings=timings)
+        if self._init_success_callback:
+            SingleTask.run(self._init_success_callback, True, None, timings=timings)
+
+    async def _load_symbol_infos(self):
+        """ 所有币对的交易币对信息, 同一产品类型只请求一次, 之后从SymbolRegistry读取 """
+        for trader in self._traders.values():
+            _, error = await trader._load_symbol_info()
+            if error:
+                return None, error
+        return True, None
+
+    async def _get_open_orders(self, inst_type):
+        """ 分页查询产品类型下全部未成交订单 """
+        orders = []
+        after = ""
+        while True:
+            success, error = await self._rest_api.get_open_orders(inst_type=inst_type, after=after)
+            if error:
+                return None, error
+            data = success.get("data") or []
+            orders.extend(data)
+            if len(data) < 100:
+                return orders, None
+            after = data[-1]["ordId"]
+
+    def _group_by_symbol(self, data):
+        """ 按instId分组, 忽略没有注册的币对 """
+        result = {}
+        for d in data:
+            if d.get("instId") in self._traders:
+                result.setdefault(d["instId"], []).append(d)
+        return result
+
+    @async_method_locker("OkexV5TradeSession.process.locker")
+    async def process(self, msg):
+        if isinstance(msg, str) and msg == "pong":
+            return
+        if self._ws_response(msg):
+            return
+        if msg.get("event"):
+            if msg.get("event") == "error":
+                logger.error(f"私有接口订阅失败, error msg: {msg}", caller=self)
+                return
+            elif msg.get("event") == "login":
+                logger.info("Private API Connected Successed!", caller=self)
+                self._ws_logged_in = True
+                await self._login_callback()
+            elif msg.get("event") == "subscribe":
+                if msg.get("arg")["channel"] == "account":
+                    self._subscribe_assets_ok = True
+                if msg.get("arg")["channel"] == "positions":
+                    self._subscribe_position_ok = True
+                if msg.get("arg")["channel"] == "orders":
+                    self._subscribe_order_ok = True
+                if self._subscribe_order_ok and self._subscribe_position_ok and self._subscribe_assets_ok:
+                    SingleTask.run(self._sub_callback)
+            return
+
+        arg = msg.get("arg")
+        if not arg:
+            return
+        if arg["channel"] == "account":
+            self._update_asset(msg)
+        elif arg["channel"] == "positions":
+            for symbol, items in self._group_by_symbol(msg.get("data") or []).items():
+                self._traders[symbol]._update_position({"arg": arg, "data": items})
+        elif arg["channel"] == "orders":
+            for symbol, items in self._group_by_symbol(msg.get("data") or []).items():
+                self._traders[symbol]._update_order({"arg": dict(arg, instId=symbol), "data": items})
+
+    async def process_binary(self, msg):
+        """只继承，不实现"""
+        pass
+
+    def _update_asset(self, msg):
+        """ 账户推送对所有币对相同, 只转换一次, 共用同一个回调函数的币对只回调一次 """
+        if not msg.get("data") or not self._traders:
+            return
+        trader = next(iter(self._traders.values()))
+        ast = trader._convert_asset_format(msg["data"][0])
+        callbacks = []
+        for trader in self._traders.values():
+            if trader._asset_update_callback not in callbacks:
+                callbacks.append(trader._asset_update_callback)
+        for callback in callbacks:
+            SingleTask.run(callback, copy.copy(ast))
+
+    async def ws_request(self, op, args):
+        """ 通过私有websocket发送交易请求, 供注册的OkexV5Trade使用, 返回值参考`_send_ws_request` """
+        return await self._send_ws_request(op, args)
@@ -11,9 +11,11 @@ import hmac
 import base64
 import time
 import asyncio
+import itertools
 from xuanwu.model.asset import Asset
 from xuanwu.model.position import Position, CROSS, ISOLATED
 from xuanwu.model.symbol_info import SymbolInfo
+from xuanwu.symbol_registry import SymbolRegistry
 from xuanwu.error import Error
 from xuanwu.utils import logger
 from xuanwu.tasks import SingleTask
@@ -21,14 +23,105 @@ from xuanwu.const import OKEX_V5
 from xuanwu.utils.websocket import Websocket
 from xuanwu.utils.decorator import async_method_locker
 from xuanwu.model.order import *
-from xuanwu.utils.tools import decimal_digits
+from xuanwu.model.order_store import OrderStore
+from xuanwu.utils.batcher import RequestBatcher
+from xuanwu.utils.bootstrap import run_bootstrap
+from xuanwu.utils.quoter import LadderQuoter
 from .okex_v5_rest import OkexV5Rest
 
 __all__ = ("OkexV5Trade",)
 
+WS_TRADE_OPS = ["order", "batch-orders", "cancel-order", "batch-cancel-orders", "amend-order", "batch-amend-orders"]
 
-class OkexV5Trade(Websocket):
+
+class PrivateWsMixin:
+    """ 私有websocket的登录和交易请求, OkexV5Trade和OkexV5TradeSession共用.
+
+    使用前调用`_init_ws_requests`, 连接建立之后调用`_ws_login`, `process`中先交给`_ws_response`处理.
+    """
+
+    def _init_ws_requests(self, timeout):
+        self._ws_order_timeout = timeout  # websocket交易请求超时时间(秒)
+        self._ws_logged_in = False
+        self._ws_requests = {}  # websocket交易请求. e.g. {"request id": future, ... }
+        self._ws_request_ids = itertools.count(1)
+
+    async def _ws_login(self):
+        """ 发送登录请求, 连接断开之前没有收到响应的交易请求结果未知 """
+        self._ws_logged_in = False
+        for future in self._ws_requests.values():
+            if not future.done():
+                future.set_result(None)
+        timestamp = int(time.time())
+        msg = str(timestamp) + "GET" + '/users/self/verify'
+        mac = hmac.new(bytes(self._secret_key, encoding='utf8'), bytes(msg, encoding='utf-8'), digestmod='sha256')
+        d = mac.digest()
+        sign = base64.b64encode(d)
+        login_param = {
+            "op": "login",
+            "args": [{
+                "apiKey": self._access_key,
+                "passphrase": self._passphrase,
+                "timestamp": timestamp,
+                "sign": sign.decode("utf-8")
+            }]
+        }
+        await self.ws.send_json(login_param)
+
+    def _ws_response(self, msg):
+        """ 交易请求的响应交给等待的请求, 是交易请求的响应时返回True """
+        if msg.get("op") not in WS_TRADE_OPS:
+            return False
+        future = self._ws_requests.get(msg.get("id"))
+        if future and not future.done():
+            future.set_result(msg)
+        return True
+
+    async def _send_ws_request(self, op, args):
+        """ 通过私有websocket发送交易请求, 按请求id匹配响应
+
+        :returns:
+            success: 响应数据, otherwise it's None.
+            error: Error information, otherwise it's None.
+            retry: 是否可以安全地通过REST重新发送. 请求没有发出时总是可以;
+                   超时或者连接断开时, 撤单/改单可以重发, 下单只有全部带有clOrdId时才可以重发(交易所拒绝重复的clOrdId).
+        """
+        if not self._ws_logged_in or not self.ws or self.ws.closed:
+            return None, Error("private websocket not logged in"), True
+        request_id = str(next(self._ws_request_ids))
+        future = asyncio.get_event_loop().create_future()
+        self._ws_requests[request_id] = future
+        try:
+            try:
+                await self.ws.send_json({"id": request_id, "op": op, "args": args})
+            except Exception as e:
+                return None, Error(f"send websocket request failed: {e}"), True
+            idempotent = op not in ["order", "batch-orders"] or all(a.get("clOrdId") for a in args)
+            try:
+                success = await asyncio.wait_for(future, self._ws_order_timeout)
+            except asyncio.TimeoutError:
+                return None, Error(f"websocket {op} request timeout, id: {request_id}"), idempotent
+            if success is None:
+                return None, Error(f"websocket disconnected, {op} request id: {request_id}"), idempotent
+            return success, None, False
+        finally:
+            self._ws_requests.pop(request_id, None)
+
+
+class OkexV5Trade(PrivateWsMixin, Websocket):
     def __init__(self, **kwargs):
+        # 传入session(OkexV5TradeSession)时, 共享session的私有websocket连接和REST客户端, 不再单独建立连接
+        session = kwargs.get("session")
+        if session and not session.valid:
+            e = Error("param session invalid")
+            logger.error(e, caller=self)
+            if kwargs.get("init_success_callback"):
+                SingleTask.run(kwargs["init_success_callback"], False, e)
+            return
+        if session:
+            for key in ["account", "contract_type", "host", "wss", "access_key", "secret_key", "passphrase"]:
+                if not kwargs.get(key):
+                    kwargs[key] = getattr(session, key)
         e = None
         if not kwargs.get("account"):
             e = Error("param account miss")
@@ -75,9 +168,11 @@ class OkexV5Trade(Websocket):
         self._position_update_callback = kwargs.get("position_update_callback")
         self._asset_update_callback = kwargs.get("asset_update_callback")
         self._init_success_callback = kwargs.get("init_success_callback")
+        self._init_timeout = kwargs.get("init_timeout", 10)  # 初始化截止时间(秒)
 
-        self._assets = {}  # Asset object. e.g. {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }
-        self._orders = {}  # Order objects. e.g. {"order_no": Order, ... }
+        # Asset object. e.g. {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }, 共享session时使用session的资产
+        self._assets = session._assets if session else {}
+        self._order_store = OrderStore()  # Order objects, 按order_no/clOrdId/方向/状态/价格档位索引
         self._position = Position(platform=self._platform,
                                   account=self._account,
                                   strategy=self._strategy,
@@ -91,11 +186,43 @@ class OkexV5Trade(Websocket):
 
         self.heartbeat_msg = "ping"
 
-        self._rest_api = OkexV5Rest(self._host, self._access_key, self._secret_key, self._passphrase)
+        # 通过私有websocket下单/撤单/改单, 可以在每次调用时通过via_ws参数单独指定
+        self._order_via_ws = kwargs.get("order_via_ws", False)
+        self._init_ws_requests(kwargs.get("ws_order_timeout", 3))
+
+        self._session = session
+        if self._session:
+            self._rest_api = self._session.rest_api
+        else:
+            self._rest_api = OkexV5Rest(self._host, self._access_key, self._secret_key, self._passphrase)
+
+        # 可选的下单/撤单微批量合并, batch_window 时间窗口(秒)内的请求通过批量接口发送, 每批最多20个
+        self._order_batcher = None
+        self._cancel_batcher = None
+        if kwargs.get("batch_orders"):
+            batch_window = kwargs.get("batch_window", 0.005)
+            self._order_batcher = RequestBatcher(self._send_order_batch, max_batch=20, window=batch_window)
+            self._cancel_batcher = RequestBatcher(self._send_cancel_batch, max_batch=20, window=batch_window)
+
+        # 报价梯度管理, 参考`requote`; quote_pending_ttl 请求发出后等待推送确认的时间(秒)
+        # 报价下单的clOrdId以quote_client_prefix开头, requote只管理这些挂单, 不会改动通过create_order下的其他订单;
+        # 同一账户同一币对有多个报价对象时请使用不同的前缀(字母和数字, 最长12位)
+        self._quote_client_prefix = kwargs.get("quote_client_prefix", "xwq")
+        self._quote_client_ids = itertools.count(1)
+        self._quoter = LadderQuoter(self._live_quotes, self._send_quotes, pending_ttl=kwargs.get("quote_pending_ttl", 3))
+        self._quote_order_args = (None, ORDER_TYPE_MAKER)  # 报价新下单的交易模式和订单类型
+
+        if self._session:
+            self._session.register(self)
+            return
         url = self._wss + "/ws/v5/private"
         super(OkexV5Trade, self).__init__(url, send_hb_interval=15)
         self.initialize()
 
+    @property
+    def symbol(self):
+        return self._symbol
+
     @property
     def assets(self):
         return copy.copy(self._assets)
@@ -106,7 +233,13 @@ class OkexV5Trade(Websocket):
 
     @property
     def orders(self):
-        return copy.copy(self._orders)
+        """ 挂单只读快照 {order_no: Order}, 订单没有变化时多次访问不会复制 """
+        return self._order_store.snapshot()
+
+    @property
+    def order_store(self):
+        """ 带索引的订单存储, e.g. trader.order_store.open_orders(trader.symbol, ORDER_ACTION_BUY) """
+        return self._order_store
 
     @property
     def position(self):
@@ -117,67 +250,40 @@ class OkexV5Trade(Websocket):
         return self._rest_api
 
     async def connected_callback(self):
-        timestamp = int(time.time())
-        msg = str(timestamp) + "GET" + '/users/self/verify'
-        mac = hmac.new(bytes(self._secret_key, encoding='utf8'), bytes(msg, encoding='utf-8'), digestmod='sha256')
-        d = mac.digest()
-        sign = base64.b64encode(d)
-        login_param = {
-            "op": "login",
-            "args": [{
-                "apiKey": self._access_key,
-                "passphrase": self._passphrase,
-                "timestamp": timestamp,
-                "sign": sign.decode("utf-8")
-            }]
-        }
-        await self.ws.send_json(login_param)
+        await self._ws_login()
 
     async def _sub_callback(self):
-        """数据订阅之后，初始化账户未成交订单和交易币对信息"""
-        # 查询未成交订单(未成交订单和部分成交)
-        orders, error = await self.get_open_orders()
+        """数据订阅之后，并发初始化交易币对信息、未成交订单和持仓, 完成后通过init_success_callback返回各步骤耗时"""
+        results, timings, error = await run_bootstrap({
+            "symbol_info": self._load_symbol_info(),
+            "orders": self._rest_api.get_open_orders(symbol=self._symbol),
+            "position": self._rest_api.get_position(symbol=self._symbol)
+        }, self._init_timeout)
         if error:
-            logger.error(f"get_orders error: {orders}, {error}", caller=self)
-            # 初始化过程中发生错误,关闭网络连接,触发重连机制
+            logger.error("initialize failed:", error, "timings:", timings, caller=self)
+            SingleTask.run(self._init_success_callback, False, error, timings=timings)
             return
-        for o in orders:
-            SingleTask.run(self._order_update_callback, o)
 
-        position, error = await self.get_position()
+        # 订单数量精度和持仓方向依赖交易币对信息, 在全部请求返回之后再处理
+        if results["orders"].get("data"):
+            self._update_order({"arg": {"instId": self._symbol}, "data": results["orders"]["data"]})
+        if results["position"].get("data"):
+            self._update_position(results["position"])
+        else:
+            SingleTask.run(self._position_update_callback, self.position)
+        logger.info("initialize success, timings:", timings, caller=self)
+        SingleTask.run(self._init_success_callback, True, None, timings=timings)
+
+    async def _load_symbol_info(self):
+        """ 从共享的SymbolRegistry获取交易币对信息 """
+        registry = SymbolRegistry.get(self._platform, host=self._host)
+        symbol_info, error = await registry.load_symbol(self._contract_type, self._symbol)
         if error:
-            logger.error(f"get_position error: {error}", caller=self)
-            return
-        SingleTask.run(self._position_update_callback, position)
-
-        # 查询交易币对基础规则及数据
-        success, error = await self._rest_api.get_all_markets(inst_type=self._contract_type.upper(),
-                                                              symbol=self._symbol)
-        if error:
-            e = Error(f"get symbol info failed!, {error}")
-            logger.error(e, caller=self)
-            return
-        if success and success["data"]:
-            data = success["data"]
-            for d in data:
-                self._symbol_info = SymbolInfo(platform=self._platform)
-                self._symbol_info.symbol = d["instId"]
-                self._symbol_info.price_tick = d["tickSz"]
-                self._symbol_info.size_tick = d["tickSz"]
-                self._symbol_info.size_limit = d["minSz"]
-                self._symbol_info.value_tick = None
-                self._symbol_info.value_limit = None
-                if d["instType"] in ["SPOT", "MARGIN"]:
-                    self._symbol_info.base_currency = d["baseCcy"]
-                    self._symbol_info.quote_currency = d["quoteCcy"]
-                    self._symbol_info.settlement_currency = d["quoteCcy"]
-                else:
-                    self._symbol_info.base_currency = d["ctValCcy"]
-                    self._symbol_info.quote_currency = d["settleCcy"]
-                    self._symbol_info.settlement_currency = d["settleCcy"]
-                self._symbol_info.symbol_type = d["instType"]
-                self._symbol_info.is_inverse = True if d["ctType"] == "inverse" else False
-                self._symbol_info.multiplier = d["ctVal"]
+            return None, Error(f"get symbol info failed!, {error}")
+        if not symbol_info:
+            return None, Error(f"symbol info not found! symbol: {self._symbol}")
+        self._symbol_info = symbol_info
+        return symbol_info, None
 
     async def _login_callback(self):
         """登录成功之后，订阅相关数据"""
@@ -212,12 +318,15 @@ class OkexV5Trade(Websocket):
     async def process(self, msg):
         if isinstance(msg, str) and msg == "pong":
             return
+        if self._ws_response(msg):
+            return
         if msg.get("event"):
             if msg.get("event") == "error":
                 logger.error(f"私有接口订阅失败, error msg: {msg}", caller=self)
                 return
             elif msg.get("event") == "login":
                 logger.info("Private API Connected Successed!")
+                self._ws_logged_in = True
                 await self._login_callback()
             elif msg.get("event") == "subscribe":
                 if msg.get("arg")["channel"] == "account":
@@ -230,8 +339,8 @@ class OkexV5Trade(Websocket):
                 pass
 
             if self._subscribe_order_ok and self._subscribe_position_ok and self._subscribe_assets_ok:
-                await self._sub_callback()
-                SingleTask.run(self._init_success_callback, True)
+                # 初始化在process锁之外执行, 避免锁超时取消初始化请求
+                SingleTask.run(self._sub_callback)
 
         else:
             if msg.get("arg"):
@@ -293,7 +402,7 @@ class OkexV5Trade(Websocket):
                     self._position.utime = d["uTime"]
                     self._position.ctime = d["cTime"]
 
-            SingleTask.run(self._position_update_callback, copy.copy(self._position))
+            SingleTask.run(self._position_update_callback, self.position)
 
     def _update_order(self, data):
         if data.get("arg").get("instId") != self._symbol:
@@ -302,13 +411,7 @@ class OkexV5Trade(Websocket):
             for d in data.get("data"):
                 o = self._convert_order_format(d)
                 SingleTask.run(self._order_update_callback, o)
-                if self._orders.get(o.order_no):
-                    if o.status in [ORDER_STATUS_FAILED, ORDER_STATUS_CANCELED, ORDER_STATUS_FILLED]:
-                        self._orders.pop(o.order_no)
-                    else:
-                        self._orders[o.order_no] = o
-                else:
-                    self._orders[o.order_no] = o
+                self._order_store.upsert(o)
 
     def _update_asset(self, data):
         if data.get("data"):
@@ -382,8 +485,8 @@ class OkexV5Trade(Websocket):
                 trade_type = TRADE_TYPE_SELL_OPEN
 
         quantity = data["sz"]
-        if self._symbol_info.size_limit:
-            symbol_size_limit = decimal_digits(float(self._symbol_info.size_limit))
+        if self._symbol_info.size_tick:
+            symbol_size_limit = self._symbol_info.size_precision
         else:
             symbol_size_limit = 6
         # below row was edited by Turkey Sui 2021/10/13 1:22 A.M.
@@ -457,10 +560,39 @@ class OkexV5Trade(Websocket):
             :param order_type: 订单类型，默认是limit订单
             kwargs:
                 client_no: 客户端ID
+                via_ws: 是否通过websocket下单, 默认使用实例的order_via_ws设置
         :returns:
             order_no: Order ID if created successfully, otherwise it's None.
             error: Error information, otherwise it's None.
         """
+        order, error = self._build_order(td_mode, side, price, quantity, order_type, kwargs.get("client_no"))
+        if error:
+            return None, error
+        if self._order_batcher:
+            return await self._order_batcher.submit(order)
+        result, error = await self._trade_request(
+            "order", [order], kwargs.get("via_ws"),
+            lambda: self._rest_api.create_order(symbol=self._symbol,
+                                                td_mode=td_mode,
+                                                side=order["side"],
+                                                sz=order["sz"],
+                                                ord_type=order["ordType"],
+                                                cl_ordId=order.get("clOrdId", ""),
+                                                pos_side=order["posSide"],
+                                                px=order["px"]))
+        if error:
+            return None, error
+        if result["code"] != "0":
+            return None, result
+        return str(result["data"][0]["ordId"]), None
+
+    def _build_order(self, td_mode, side, price, quantity, order_type=ORDER_TYPE_LIMIT, client_no=None):
+        """ 生成V5下单请求参数, 参数说明见`create_order`
+
+        :returns:
+            order: 下单请求参数, otherwise it's None.
+            error: Error information, otherwise it's None.
+        """
         if quantity > 0:
             if side == ORDER_ACTION_BUY:  # 买入开多
                 direction = "buy"
@@ -498,21 +630,18 @@ class OkexV5Trade(Websocket):
             return None, "order type error"
 
         quantity = abs(int(quantity))
-        result, error = await self._rest_api.create_order(
-                                                symbol=self._symbol,
-                                                td_mode=td_mode,
-                                                side=direction,
-                                                sz=str(quantity),
-                                                ord_type=order_price_type,
-                                                cl_ordId=kwargs.get("client_no") if kwargs.get("client_no") else "",
-                                                pos_side=offset,
-                                                px=str(price)
-                                            )
-        if error:
-            return None, error
-        if result["code"] != "0":
-            return None, result
-        return str(result["data"][0]["ordId"]), None
+        order = {
+            "instId": self._symbol,
+            "tdMode": td_mode,
+            "side": direction,
+            "ordType": order_price_type,
+            "sz": str(quantity),
+            "posSide": offset,
+            "px": str(price)
+        }
+        if client_no:
+            order["clOrdId"] = client_no
+        return order, None
 
     # This function was added by Donkey Khan 2021/10/12 00:24
     # Designed to create orders of RAW list(dict(Order))
@@ -524,13 +653,18 @@ class OkexV5Trade(Websocket):
             return None, result
         return str(result), None
 
-    async def revoke_order(self, order_nos):
+    async def revoke_order(self, order_nos, via_ws=None):
         """ 删除订单
         Attributes:
             :param order_nos: 订单号码列表
                               如果传入0，则删除所有挂单，
                               否则删除指定订单，最大数量为20
-        :returns:Success or error, see bellow.
+                              开启batch_orders时不限制数量，按每批20个合并撤单
+            :param via_ws: 是否通过websocket撤单, 默认使用实例的order_via_ws设置
+        :returns:
+            删除所有挂单: (True, None) if successfully, otherwise (False, error).
+            单个订单: (order_no, error), error is None if successfully.
+            多个订单: (order_nos, errors), order_nos 撤单成功的订单号列表, errors 失败订单的错误信息列表, 全部成功时是None.
         """
         if len(order_nos) == 0:  # 删除指定符号下所有订单
             result, error = await self._rest_api.get_open_orders(symbol=self._symbol)
@@ -543,24 +677,171 @@ class OkexV5Trade(Websocket):
                     if error:
                         return False, error
                     await asyncio.sleep(0.1)
-                return True, None
-
+            return True, None
+
+        order_detail = [{"instId": self._symbol, "ordId": d} for d in order_nos]
+        if self._cancel_batcher:
+            results = await asyncio.gather(*[self._cancel_batcher.submit(o) for o in order_detail])
+        elif len(order_nos) == 1:
+            success, error = await self._trade_request(
+                "cancel-order", order_detail, via_ws,
+                lambda: self._rest_api.revoke_order(symbol=self._symbol, order_id=order_nos[0]))
+            results = [(order_nos[0], error)]
+        else:
+            results = await self._send_cancel_batch(order_detail, via_ws)
         if len(order_nos) == 1:
-            success, error = await self._rest_api.revoke_order(symbol=self._symbol, order_id=order_nos[0])
-            if error:
-                return order_nos[0], error
-            else:
-                return order_nos[0], None
-        if len(order_nos) > 1:
-            order_detail = [{"instId": self._symbol, "ordId": d} for d in order_nos]
-            success, error = await self._rest_api.revoke_orders(order_detail)
+            return results[0]
+        errors = [error for _, error in results if error]
+        return [order_no for order_no, error in results if not error], errors if errors else None
+
+    async def amend_order(self, order_no, price=None, quantity=None, via_ws=None):
+        """ 修改订单价格或数量
+        Attributes:
+            :param order_no: 订单号码
+            :param price: 新的委托价格
+            :param quantity: 新的委托数量, 部分成交的订单应包含已成交数量
+            :param via_ws: 是否通过websocket改单, 默认使用实例的order_via_ws设置
+        :returns:
+            order_no: Order ID if amended successfully, otherwise it's None.
+            error: Error information, otherwise it's None.
+        """
+        if price is None and quantity is None:
+            return None, "price and quantity both empty"
+        new_px = "" if price is None else str(price)
+        new_sz = "" if quantity is None else str(abs(int(quantity)))
+        amend = {"instId": self._symbol, "ordId": order_no}
+        if new_px:
+            amend["newPx"] = new_px
+        if new_sz:
+            amend["newSz"] = new_sz
+        result, error = await self._trade_request(
+            "amend-order", [amend], via_ws,
+            lambda: self._rest_api.change_order(symbol=self._symbol, new_sz=new_sz, new_px=new_px, ord_id=order_no))
+        if error:
+            return None, error
+        if result["code"] != "0":
+            return None, result
+        return str(result["data"][0]["ordId"]), None
+
+    async def requote(self, bids, asks, td_mode, order_type=ORDER_TYPE_MAKER):
+        """ 按目标报价梯度调整挂单, 与当前挂单比较之后只发送必要的改单/下单/撤单, 每类请求按20个一批发送.
+            上一次报价的请求没有完成时, 只保留最新的目标报价, 完成之后再执行.
+            只比较和调整报价下的挂单(clOrdId以quote_client_prefix开头), 其他订单不受影响.
+        Attributes:
+            :param bids: 买单目标报价 [(price, quantity), ...], quantity含义与`create_order`一致, e.g. 正数买入开多
+            :param asks: 卖单目标报价 [(price, quantity), ...], e.g. 负数卖出开空
+            :param td_mode: 新下单的交易模式 isolated：逐仓 ；cross：全仓；cash：非保证金
+            :param order_type: 新下单的订单类型, 默认只做maker
+        :returns:
+            stats: 发送的请求数量 {"amend": n, "create": n, "cancel": n}, 合并到进行中的报价时是None.
+            error: Error information, otherwise it's None.
+        """
+        round_price = self._symbol_info.round_price
+        self._quote_order_args = (td_mode, order_type)
+        return await self._quoter.requote([(round_price(price), quantity) for price, quantity in bids],
+                                          [(round_price(price), quantity) for price, quantity in asks])
+
+    def _live_quotes(self, action):
+        """ 当前币对某个方向由报价下的挂单 {order_no: (price, remain, filled)}, 按clOrdId前缀区分 """
+        prefix = self._quote_client_prefix
+        return {o.order_no: (o.price, o.remain, o.quantity - o.remain)
+                for o in self._order_store.open_orders(self._symbol, action).values()
+                if o.client_order_id and o.client_order_id.startswith(prefix)}
+
+    def _quote_client_no(self):
+        """ 报价下单的clOrdId, 前缀 + 毫秒时间戳 + 序号, 不超过32位 """
+        return f"{self._quote_client_prefix}{int(time.time() * 1000)}{next(self._quote_client_ids) % 100000}"
+
+    async def _send_quotes(self, amends, creates, cancels):
+        """ 批量发送报价的改单/下单/撤单, 返回与三个列表一一对应的结果 """
+        td_mode, order_type = self._quote_order_args
+        amend_args = [{"instId": self._symbol, "ordId": order_no, "newPx": str(price), "newSz": str(int(size + filled))}
+                      for order_no, price, size, filled in amends]
+        create_results = [None] * len(creates)
+        orders, indexes = [], []
+        for i, (action, price, quantity) in enumerate(creates):
+            order, error = self._build_order(td_mode, action, price, quantity, order_type, self._quote_client_no())
             if error:
-                return False, error
-            if success and success.get("code") == "0":
-                order_ids = [i["ordId"] for i in success.get("data")]
+                create_results[i] = (None, error)
             else:
-                return None, success
-            return order_ids, None
+                orders.append(order)
+                indexes.append(i)
+        cancel_args = [{"instId": self._symbol, "ordId": order_no} for order_no in cancels]
+
+        def chunks(items):
+            return [items[i:i + 20] for i in range(0, len(items), 20)]
+
+        amend_batches, order_batches, cancel_batches = chunks(amend_args), chunks(orders), chunks(cancel_args)
+        results = await asyncio.gather(*[self._send_amend_batch(b) for b in amend_batches],
+                                       *[self._send_order_batch(b) for b in order_batches],
+                                       *[self._send_cancel_batch(b) for b in cancel_batches])
+        flat = [[r for batch in results[begin:end] for r in batch] for begin, end in
+                ((0, len(amend_batches)),
+                 (len(amend_batches), len(amend_batches) + len(order_batches)),
+                 (len(amend_batches) + len(order_batches), len(results)))]
+        for i, result in zip(indexes, flat[1]):
+            create_results[i] = result
+        return flat[0], create_results, flat[2]
+
+    async def _trade_request(self, op, args, via_ws, rest_request):
+        """ 发送交易请求, 优先使用私有websocket, websocket不可用时回退到REST接口
+
+        Attributes:
+            :param op: websocket操作, e.g. order / batch-orders / cancel-order / amend-order
+            :param args: websocket请求参数列表, 与REST请求体一致
+            :param via_ws: 是否通过websocket发送, None表示使用实例的order_via_ws设置
+            :param rest_request: 回退使用的REST请求, 无参数的函数, 返回协程
+        :returns:
+            success: 响应数据, 与REST接口返回格式一致.
+            error: Error information, otherwise it's None.
+        """
+        if via_ws is None:
+            via_ws = self._order_via_ws
+        if via_ws:
+            success, error, retry = await self._ws_request(op, args)
+            if not error or not retry:
+                return success, error
+            logger.warn("websocket", op, "failed, fallback to REST:", error, caller=self)
+        return await rest_request()
+
+    async def _ws_request(self, op, args):
+        """ 通过私有websocket发送交易请求, 共享session时通过session的连接发送, 返回值参考`_send_ws_request` """
+        if self._session:
+            return await self._session.ws_request(op, args)
+        return await self._send_ws_request(op, args)
+
+    async def _send_order_batch(self, orders):
+        """ 批量下单, 返回与orders一一对应的 [(order_no, error), ...] """
+        success, error = await self._trade_request("batch-orders", orders, None,
+                                                   lambda: self._rest_api.create_orders(orders))
+        if error:
+            return [(None, error)] * len(orders)
+        data = success.get("data") or []
+        if len(data) != len(orders):
+            return [(None, success)] * len(orders)
+        return [(str(d["ordId"]), None) if d.get("sCode") == "0" else (None, d) for d in data]
+
+    async def _send_amend_batch(self, amends):
+        """ 批量改单, 返回与amends一一对应的 [(order_no, error), ...] """
+        success, error = await self._trade_request("batch-amend-orders", amends, None,
+                                                   lambda: self._rest_api.change_orders(amends))
+        if error:
+            return [(a["ordId"], error) for a in amends]
+        data = success.get("data") or []
+        if len(data) != len(amends):
+            return [(a["ordId"], success) for a in amends]
+        return [(a["ordId"], None if d.get("sCode") == "0" else d) for a, d in zip(amends, data)]
+
+    async def _send_cancel_batch(self, orders, via_ws=None):
+        """ 批量撤单, 返回与orders一一对应的 [(order_no, error), ...] """
+        success, error = await self._trade_request("batch-cancel-orders", orders, via_ws,
+                                                   lambda: self._rest_api.revoke_orders(orders))
+        if error:
+            return [(o["ordId"], error) for o in orders]
+        data = success.get("data") or []
+        if len(data) != len(orders):
+            return [(o["ordId"], success) for o in orders]
+        return [(o["ordId"], None if d.get("sCode") == "0" else d) for o, d in zip(orders, data)]
 
     async def get_open_orders(self):
         """ 获取当前币对挂单信息
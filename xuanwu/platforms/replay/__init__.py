@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 11:00
+  @ Description: 
+  @ History:
+"""
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/19 11:00
+  @ Description: 历史行情回放, 读取`FileWriter`录制的数据文件并按时间戳合并推送
+  @ History:
+"""
+import os
+import time
+import heapq
+import asyncio
+from operator import itemgetter
+from xuanwu.utils import logger
+from xuanwu.tasks import SingleTask
+from xuanwu.const import REPLAY
+from xuanwu.model.market import Orderbook, Trade
+
+__all__ = ("ReplayMarket",)
+
+# 录制文件的字段顺序, 与`data_listener`中`Listener`写入的字段一致
+ORDERBOOK_COLUMNS = ["symbol", "timestamp",
+                     "ap1", "ap2", "ap3", "ap4", "ap5",
+                     "bp1", "bp2", "bp3", "bp4", "bp5",
+                     "az1", "az2", "az3", "az4", "az5",
+                     "bz1", "bz2", "bz3", "bz4", "bz5"]
+TRADE_COLUMNS = ["price", "symbol", "side", "quantity", "timestamp"]
+
+# 文件名中的数据类型, e.g. `OKEX-BTC-USDT-SWAP-orderbook-2021-10-22.0001`
+FILE_CHANNELS = {
+    "orderbook": "orderbook",
+    "trade": "trade"
+}
+
+
+class ReplayMarket:
+    """ Replay Market Server.
+
+    回调函数签名与`OkexV5Market`一致, 策略不需要修改即可使用录制数据回测.
+
+    Attributes:
+        kwargs:
+            platform: Platform name stamped on replayed objects, default is `replay`.
+            symbols: Trade pair list, e.g. ["BTC-USDT-SWAP"], empty means all symbols found.
+            channels: channel list, only `orderbook` and `trade` to be enabled.
+            file_url: Directory of recorded files, files are selected by symbols and channels.
+            files: Recorded file list, e.g. [("orderbook", "/data/xxx-orderbook-2021-10-22.0001"), ...].
+            speed: Replay speed, `0` means as fast as possible, `1` real time, `10` ten times real time.
+            auto_start: Start replaying immediately after initialized, default is True.
+            orderbook_update_callback: Orderbook callback, asynchronous function.
+            trade_update_callback: Trade callback, asynchronous function.
+            done_callback: Called with stats dict after all data replayed, asynchronous function.
+    """
+
+    def __init__(self, **kwargs):
+        self._platform = kwargs.get("platform") or REPLAY
+        self._symbols = list(set(kwargs.get("symbols") or []))
+        self._channels = list(set(kwargs.get("channels") or FILE_CHANNELS.keys()))
+        self._file_url = kwargs.get("file_url")
+        self._files = kwargs.get("files") or []
+        self._speed = kwargs.get("speed", 0)
+        self._orderbook_update_callback = kwargs.get("orderbook_update_callback")
+        self._trade_update_callback = kwargs.get("trade_update_callback")
+        self._done_callback = kwargs.get("done_callback")
+
+        self._events = 0  # 已推送事件数
+        self._errors = 0  # 格式错误行数
+        self._elapsed = 0  # 回放耗时(秒)
+        self._running = False
+
+        if kwargs.get("auto_start", True):
+            self.initialize()
+
+    @property
+    def stats(self):
+        return {
+            "events": self._events,
+            "errors": self._errors,
+            "elapsed": self._elapsed,
+            "events_per_sec": self._events / self._elapsed if self._elapsed > 0 else 0
+        }
+
+    def initialize(self):
+        """ 初始化, 在事件循环中启动回放
+        """
+        asyncio.get_event_loop().create_task(self.run())
+
+    def stop(self):
+        """ 停止回放
+        """
+        self._running = False
+
+    async def run(self):
+        """ 按时间戳合并所有数据文件并推送
+        """
+        files = self._select_files()
+        if not files:
+            logger.error("no recorded file to replay! file_url:", self._file_url, caller=self)
+            return
+        logger.info("replay files:", len(files), "speed:", self._speed, caller=self)
+
+        loop = asyncio.get_event_loop()
+        streams = [self._read_file(path, channel) for channel, path in files]
+        start = time.perf_counter()
+        wall_start = None
+        data_start = None
+        self._running = True
+        for ts, channel, obj in heapq.merge(*streams, key=itemgetter(0)):
+            if not self._running:
+                break
+            if self._speed and self._speed > 0:
+                if wall_start is None:
+                    wall_start = loop.time()
+                    data_start = ts
+                delay = wall_start + (ts - data_start) / 1000 / self._speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif self._events % 1000 == 0:
+                # 全速回放时定期让出事件循环, 保证回调中创建的任务可以执行
+                await asyncio.sleep(0)
+            if channel == "orderbook":
+                await self._orderbook_update_callback(obj)
+            else:
+                await self._trade_update_callback(obj)
+            self._events += 1
+        self._running = False
+        self._elapsed = time.perf_counter() - start
+
+        stats = self.stats
+        logger.info("replay finished, events:", stats["events"], "errors:", stats["errors"],
+                    "elapsed:", round(stats["elapsed"], 3), "events/sec:", int(stats["events_per_sec"]), caller=self)
+        if self._done_callback:
+            SingleTask.run(self._done_callback, stats)
+
+    def _select_files(self):
+        """ 根据币对和频道筛选数据文件
+
+        :returns:
+            :return: [(channel, path), ...]
+        """
+        files = []
+        for channel, path in self._files:
+            if channel in self._channels:
+                files.append((channel, path))
+        if not self._file_url:
+            return files
+        for filename in sorted(os.listdir(self._file_url)):
+            for channel in self._channels:
+                if channel not in FILE_CHANNELS:
+                    continue
+                tag = f"-{FILE_CHANNELS[channel]}-"
+                if tag not in filename:
+                    continue
+                if self._symbols and not [s for s in self._symbols if f"-{s}{tag}" in filename]:
+                    continue
+                files.append((channel, os.path.join(self._file_url, filename)))
+        return files
+
+    def _read_file(self, path, channel):
+        """ 逐行读取数据文件
+
+        :returns:
+            :return: generator of (timestamp, channel, Orderbook or Trade)
+        """
+        if channel == "orderbook" and not self._orderbook_update_callback:
+            return
+        if channel == "trade" and not self._trade_update_callback:
+            return
+        with open(path) as f:
+            for line in f:
+                row = line.rstrip("\n").split(",")
+                try:
+                    if channel == "orderbook":
+                        obj = self._make_orderbook(row)
+                    else:
+                        obj = self._make_trade(row)
+                except (IndexError, ValueError):
+                    self._errors += 1
+                    continue
+                if self._symbols and obj.symbol not in self._symbols:
+                    continue
+                yield obj.timestamp, channel, obj
+
+    def _make_orderbook(self, row):
+        """ symbol, timestamp, ap1...apN, bp1...bpN, az1...azN, bz1...bzN
+        """
+        depth = (len(row) - 2) // 4
+        if depth <= 0 or len(row) != depth * 4 + 2:
+            raise ValueError("orderbook row length error")
+        ap = row[2:2 + depth]
+        bp = row[2 + depth:2 + depth * 2]
+        az = row[2 + depth * 2:2 + depth * 3]
+        bz = row[2 + depth * 3:]
+        return Orderbook(platform=self._platform,
+                         symbol=row[0],
+                         asks=[[float(p), float(q)] for p, q in zip(ap, az)],
+                         bids=[[float(p), float(q)] for p, q in zip(bp, bz)],
+                         timestamp=int(float(row[1])))
+
+    def _make_trade(self, row):
+        """ price, symbol, side, quantity, timestamp
+        """
+        if len(row) != len(TRADE_COLUMNS):
+            raise ValueError("trade row length error")
+        return Trade(platform=self._platform,
+                     symbol=row[1],
+                     side=row[2],
+                     price=float(row[0]),
+                     quantity=float(row[3]),
+                     timestamp=int(float(row[4])))
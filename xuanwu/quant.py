@@ -18,6 +18,7 @@ class Quant:
 
     def __init__(self):
         self.loop = None
+        self.market_server = None
 
     def initialize(self, config_module=None):
         """ Initialize.
@@ -29,6 +30,8 @@ class Quant:
         self._load_settings(config_module)
         self._init_logger()
         self._init_db_instance()
+        self._init_http_pool()
+        self._init_market_server()
         self._do_heartbeat()
 
     def start(self):
@@ -79,6 +82,50 @@ class Quant:
             from xuanwu.utils.mongo import MongoDB
             MongoDB.mongodb_init(**config.mongodb)
 
+    def _init_http_pool(self):
+        """Initialize HTTP connection pool, warm up and keep alive trading hosts, and REST retry policy (disabled
+        if no `retry`).
+
+        e.g.
+            "HTTP": {
+                "limit": 100,
+                "keepalive_timeout": 60,
+                "hosts": {"www.okex.com": {"limit_per_host": 20}},
+                "keepalive": ["https://www.okex.com/api/v5/public/time"],
+                "keepalive_interval": 30,
+                "keepalive_connections": 2,
+                "retry": {"max_retries": 2, "failure_threshold": 5, "recovery_timeout": 10, "exempt_cancels": true}
+            }
+        """
+        if not config.http:
+            return
+        from xuanwu.utils.http_client import AsyncHttpRequests
+        from xuanwu.utils.retry_policy import RetryPolicy
+        AsyncHttpRequests.configure(**config.http)
+        retry = config.http.get("retry")
+        if retry:
+            AsyncHttpRequests.set_retry_policy(RetryPolicy(**retry))
+        urls = config.http.get("keepalive")
+        if urls:
+            AsyncHttpRequests.start_keepalive(urls, interval=config.http.get("keepalive_interval", 30),
+                                              connections=config.http.get("keepalive_connections", 1))
+
+    def _init_market_server(self):
+        """Start market data fan-out server on a Unix domain socket for local processes.
+
+        e.g.
+            "MARKET_SERVER": {
+                "path": "/tmp/xuanwu-market.sock",
+                "max_buffer": 4194304
+            }
+        """
+        if not config.market_server:
+            return
+        from xuanwu.tasks import SingleTask
+        from xuanwu.market_server import MarketServer
+        self.market_server = MarketServer(**config.market_server)
+        SingleTask.run(self.market_server.start)
+
     def _do_heartbeat(self):
         """Start server heartbeat."""
         from xuanwu.heartbeat import heartbeat
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/21 10:00
+  @ Description: 进程内共享的交易币对基础信息
+  @ History:
+    1. 每个交易所每个产品类型只请求一次交易币对信息, 所有行情/交易对象共享;
+    2. 查询结果缓存在本地文件中, 有效期内重启进程直接读取缓存;
+    3. 第一次加载成功之后通过心跳定时在后台刷新;
+    4. 缓存中没有的币对(e.g. 缓存之后新上线)忽略缓存重新请求一次;
+    5. 支持 OKX V5 (产品类型 SWAP / FUTURES / SPOT ...) 和 Gate.io 合约 (结算币种 USDT / BTC).
+    使用:
+        registry = SymbolRegistry.get(OKEX_V5)
+        info, error = await registry.load_symbol("SWAP", "BTC-USDT-SWAP")
+        price = info.round_price(43000.06)
+"""
+import os
+import json
+import time
+import asyncio
+import tempfile
+from xuanwu import const
+from xuanwu.utils import logger
+from xuanwu.heartbeat import heartbeat
+from xuanwu.model.symbol_info import SymbolInfo
+
+__all__ = ("SymbolRegistry", )
+
+
+async def _load_okex_v5(inst_type, host="https://www.okex.com"):
+    """ 通过OKX V5公共接口查询产品类型下的全部交易币对信息
+
+    :returns:
+        :return symbols: [SymbolInfo, ...], otherwise it's None.
+        :return error: Error information, otherwise it's None.
+    """
+    from xuanwu.platforms.okex_v5.okex_v5_rest import OkexV5Rest
+    rest_api = OkexV5Rest(host, "", "", "")
+    success, error = await rest_api.get_all_markets(inst_type=inst_type.upper())
+    if error:
+        return None, error
+    if success.get("code") != "0":
+        return None, success
+    symbols = []
+    for d in success.get("data") or []:
+        info = SymbolInfo(platform=const.OKEX_V5, symbol=d["instId"], price_tick=d["tickSz"], size_tick=d["lotSz"],
+                          size_limit=d["minSz"], symbol_type=d["instType"],
+                          is_inverse=d.get("ctType") == "inverse", multiplier=d.get("ctVal") or 1)
+        if d["instType"] in ["SPOT", "MARGIN"]:
+            info.base_currency = d["baseCcy"]
+            info.quote_currency = d["quoteCcy"]
+            info.settlement_currency = d["quoteCcy"]
+        else:
+            info.base_currency = d["ctValCcy"]
+            info.quote_currency = d["settleCcy"]
+            info.settlement_currency = d["settleCcy"]
+        symbols.append(info)
+    return symbols, None
+
+
+async def _load_gateio(inst_type, host="https://api.gateio.ws/api/v4"):
+    """ 通过Gate.io合约公共接口查询结算币种下的全部合约信息
+
+    Attributes:
+        :param inst_type: 结算币种, e.g. USDT.
+    :returns:
+        :return symbols: [SymbolInfo, ...], otherwise it's None.
+        :return error: Error information, otherwise it's None.
+    """
+    from xuanwu.utils.http_client import AsyncHttpRequests
+    settle = inst_type.lower()
+    _, success, error = await AsyncHttpRequests.fetch("GET", f"{host}/futures/{settle}/contracts", timeout=10)
+    if error:
+        return None, error
+    if not isinstance(success, list):
+        return None, success
+    symbols = []
+    for d in success:
+        base_currency, _, quote_currency = d["name"].partition("_")
+        # 合约张数为整数
+        info = SymbolInfo(platform=const.GATEIO, symbol=d["name"], price_tick=d["order_price_round"], size_tick="1",
+                          size_limit=str(d.get("order_size_min") or 1), base_currency=base_currency,
+                          quote_currency=quote_currency, settlement_currency=settle.upper(), symbol_type="SWAP",
+                          is_inverse=d.get("type") == "inverse", multiplier=d.get("quanto_multiplier") or 1)
+        symbols.append(info)
+    return symbols, None
+
+
+# 交易币对信息加载函数, `loader(inst_type, **kwargs)` 返回 ([SymbolInfo, ...], error)
+LOADERS = {
+    const.OKEX_V5: _load_okex_v5,
+    const.GATEIO: _load_gateio,
+}
+
+
+class SymbolRegistry:
+    """ 交易币对基础信息注册表.
+
+    Attributes:
+        platform: 交易所名称.
+        loader: 加载函数, 默认使用`LOADERS[platform]`.
+        cache_dir: 本地缓存目录, 默认是系统临时目录下的`xuanwu-symbols`, None表示不使用文件缓存.
+        ttl: 缓存有效期(秒), 默认1小时.
+        refresh_interval: 后台刷新间隔(秒), 默认与ttl相同, 0或None表示不刷新.
+        loader_kwargs: 传给加载函数的参数, e.g. host.
+
+    NOTE:
+        通过`SymbolRegistry.get(platform)`获取进程内共享实例.
+    """
+
+    _REGISTRIES = {}  # {platform: SymbolRegistry}
+
+    def __init__(self, platform, loader=None, cache_dir=os.path.join(tempfile.gettempdir(), "xuanwu-symbols"),
+                 ttl=3600, refresh_interval=-1, **loader_kwargs):
+        self._platform = platform
+        self._loader = loader or LOADERS.get(platform)
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self._refresh_interval = ttl if refresh_interval == -1 else refresh_interval
+        self._loader_kwargs = loader_kwargs
+        self._symbols = {}  # {symbol: SymbolInfo}
+        self._loaded = {}  # 产品类型加载时间. e.g. {"SWAP": 1634900000, ... }
+        self._loading = {}  # 正在加载的产品类型. e.g. {"SWAP": future, ... }
+        self._refresh_task_id = None
+
+    @classmethod
+    def get(cls, platform, **kwargs):
+        """ 获取交易所的共享实例, kwargs只在第一次创建实例时生效 """
+        if platform not in cls._REGISTRIES:
+            cls._REGISTRIES[platform] = SymbolRegistry(platform, **kwargs)
+        return cls._REGISTRIES[platform]
+
+    @property
+    def symbols(self):
+        return dict(self._symbols)
+
+    def get_symbol(self, symbol):
+        """ 获取交易币对信息, 没有加载时返回None """
+        return self._symbols.get(symbol)
+
+    async def load_symbol(self, inst_type, symbol):
+        """ 加载产品类型并获取交易币对信息, 缓存中没有该币对时忽略缓存重新请求一次
+
+        :returns:
+            :return info: SymbolInfo, otherwise it's None.
+            :return error: Error information, otherwise it's None.
+        """
+        success, error = await self.load(inst_type)
+        if error:
+            return None, error
+        info = self._symbols.get(symbol)
+        if info:
+            return info, None
+        success, error = await self.load(inst_type, force=True)
+        if error:
+            return None, error
+        return self._symbols.get(symbol), None
+
+    async def load(self, inst_type, force=False):
+        """ 加载产品类型下的全部交易币对信息, 优先使用内存和本地文件缓存, 并发调用只请求一次
+
+        Attributes:
+            :param inst_type: 产品类型, e.g. SWAP / FUTURES / SPOT.
+            :param force: 忽略缓存重新请求.
+        :returns:
+            :return success: True if loaded, otherwise it's None.
+            :return error: Error information, otherwise it's None.
+        """
+        inst_type = inst_type.upper()
+        if not force and inst_type in self._loaded and time.time() - self._loaded[inst_type] < self._ttl:
+            return True, None
+        if not force and self._load_cache(inst_type):
+            return True, None
+        if inst_type in self._loading:
+            return await asyncio.shield(self._loading[inst_type])
+
+        future = asyncio.get_event_loop().create_future()
+        self._loading[inst_type] = future
+        result = None, f"load {inst_type} symbols cancelled"
+        try:
+            result = await self._fetch(inst_type)
+        finally:
+            self._loading.pop(inst_type, None)
+            future.set_result(result)
+        return result
+
+    async def _fetch(self, inst_type):
+        if not self._loader:
+            return None, f"no symbol loader for platform: {self._platform}"
+        try:
+            symbols, error = await self._loader(inst_type, **self._loader_kwargs)
+        except Exception as e:
+            logger.exception("load symbols error:", e, caller=self)
+            return None, e
+        if error:
+            logger.error("load symbols failed! platform:", self._platform, "inst_type:", inst_type, "error:", error,
+                         caller=self)
+            return None, error
+        self._update(symbols)
+        self._loaded[inst_type] = time.time()
+        self._save_cache(inst_type, symbols)
+        if self._refresh_interval:
+            self.start_refresh(self._refresh_interval)
+        logger.info("symbols loaded, platform:", self._platform, "inst_type:", inst_type, "count:", len(symbols),
+                    caller=self)
+        return True, None
+
+    def _update(self, symbols):
+        """ 已存在的SymbolInfo原地更新, 保证持有引用的对象拿到最新数据 """
+        for info in symbols:
+            existing = self._symbols.get(info.symbol)
+            if existing:
+                existing.__dict__.update(info.__dict__)
+            else:
+                self._symbols[info.symbol] = info
+
+    def _cache_file(self, inst_type):
+        return os.path.join(self._cache_dir, f"{self._platform}-{inst_type}.json")
+
+    def _load_cache(self, inst_type):
+        if not self._cache_dir:
+            return False
+        try:
+            with open(self._cache_file(inst_type)) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if time.time() - cache.get("timestamp", 0) >= self._ttl:
+            return False
+        self._update([SymbolInfo(**d) for d in cache.get("symbols", [])])
+        self._loaded[inst_type] = cache["timestamp"]
+        if self._refresh_interval:
+            self.start_refresh(self._refresh_interval)
+        return True
+
+    def _save_cache(self, inst_type, symbols):
+        if not self._cache_dir:
+            return
+        path = self._cache_file(inst_type)
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"timestamp": int(time.time()), "symbols": [s.data for s in symbols]}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warn("save symbols cache failed:", e, caller=self)
+
+    def start_refresh(self, interval=3600):
+        """ 在后台定时刷新已经加载的产品类型 """
+        if self._refresh_task_id:
+            return
+        self._refresh_task_id = heartbeat.register(self._refresh, interval)
+
+    def stop_refresh(self):
+        if self._refresh_task_id:
+            heartbeat.unregister(self._refresh_task_id)
+            self._refresh_task_id = None
+
+    async def _refresh(self, *args, **kwargs):
+        for inst_type in list(self._loaded.keys()):
+            await self.load(inst_type, force=True)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/20 14:00
+  @ Description: 下单/撤单请求微批量合并
+  @ History:
+    1. 在一个很短的时间窗口内收集调用方提交的请求, 窗口结束或者达到单批上限时通过批量接口一次发送;
+    2. 每个调用方各自等待自己的结果, 批量接口中单个订单的失败只影响对应的调用方.
+"""
+import asyncio
+from xuanwu.error import Error
+from xuanwu.utils import logger
+
+__all__ = ("RequestBatcher", )
+
+
+class RequestBatcher:
+    """ 请求微批量合并.
+
+    Attributes:
+        send: 批量发送函数, 异步函数`send(items)`, 返回与items一一对应的结果列表 [(result, error), ...].
+        max_batch: 单批最大请求数, 与交易所批量接口的上限一致.
+        window: 收集请求的时间窗口(秒), 从第一个请求进入队列开始计时.
+    """
+
+    def __init__(self, send, max_batch=20, window=0.005):
+        self._send = send
+        self._max_batch = max_batch
+        self._window = window
+        self._pending = []  # [(item, future), ...]
+        self._timer = None
+        self._batches = 0  # 已发送批次
+        self._items = 0  # 已发送请求数
+
+    @property
+    def stats(self):
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0,
+            "pending": len(self._pending)
+        }
+
+    async def submit(self, item):
+        """ 提交一个请求, 等待所在批次返回
+
+        :returns:
+            :return result: 该请求的结果, otherwise it's None.
+            :return error: Error information, otherwise it's None.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self.flush)
+        return await future
+
+    def flush(self):
+        """ 立即发送队列中的全部请求 """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_event_loop()
+        while self._pending:
+            batch = self._pending[:self._max_batch]
+            self._pending = self._pending[self._max_batch:]
+            loop.create_task(self._send_batch(batch))
+
+    async def _send_batch(self, batch):
+        self._batches += 1
+        self._items += len(batch)
+        items = [item for item, _ in batch]
+        try:
+            results = await self._send(items)
+        except Exception as e:
+            logger.exception("send batch error:", e, caller=self)
+            results = [(None, Error(f"send batch error: {e}"))] * len(batch)
+        if not results or len(results) != len(batch):
+            results = [(None, Error(f"batch results mismatch: {results}"))] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
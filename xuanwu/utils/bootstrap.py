@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/21 14:00
+  @ Description: 交易对象初始化, 并发执行互不依赖的REST请求并统计耗时
+  @ History:
+"""
+import time
+import asyncio
+from xuanwu.error import Error
+from xuanwu.utils import logger
+
+__all__ = ("run_bootstrap", )
+
+
+async def run_bootstrap(steps, timeout=None):
+    """ 并发执行初始化步骤, 整体超过timeout未完成时返回错误
+
+    Attributes:
+        :param steps: 初始化步骤, e.g. {"orders": coroutine, "position": coroutine}, 每个协程返回 (result, error).
+        :param timeout: 初始化截止时间(秒), None表示不限制.
+    :returns:
+        :return results: 各步骤结果 {name: result}, otherwise it's None.
+        :return timings: 各步骤耗时(毫秒), 包含`total`总耗时, e.g. {"orders": 35.2, "position": 41.7, "total": 41.9}.
+        :return error: Error information, otherwise it's None.
+    """
+    timings = {}
+    names = list(steps.keys())
+    start = time.perf_counter()
+
+    async def timed(name, coro):
+        t = time.perf_counter()
+        result = await coro
+        timings[name] = round((time.perf_counter() - t) * 1000, 3)
+        return result
+
+    error = None
+    outputs = None
+    try:
+        outputs = await asyncio.wait_for(asyncio.gather(*[timed(n, steps[n]) for n in names]), timeout)
+    except asyncio.TimeoutError:
+        pending = [n for n in names if n not in timings]
+        error = Error(f"bootstrap timeout after {timeout}s, pending: {pending}")
+    except Exception as e:
+        logger.exception("bootstrap error:", e)
+        error = Error(f"bootstrap error: {e}")
+    timings["total"] = round((time.perf_counter() - start) * 1000, 3)
+    if error:
+        return None, timings, error
+
+    results = {}
+    for name, (result, err) in zip(names, outputs):
+        if err:
+            return None, timings, Error(f"{name} failed: {err}")
+        results[name] = result
+    return results, timings, None
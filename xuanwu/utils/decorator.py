@@ -6,7 +6,6 @@
   @ Description:
   @ History:
 """
-import time
 import asyncio
 import functools
 
@@ -62,16 +61,15 @@ class StopRetry(Exception):
 
 def retry(max_retries: int = 5, delay: (float) = 0, step: (float) = 0,
           exceptions: (BaseException, tuple, list) = BaseException,
-          sleep=time.sleep, callback=None, validate=None):
+          sleep=asyncio.sleep, callback=None, validate=None):
     """
     函数执行出现异常时自动重试的简单装饰器。
     :param max_retries:  最多重试次数。
     :param delay:  每次重试的延迟，单位秒。
     :param step:  每次重试后延迟递增，单位秒。
     :param exceptions:  触发重试的异常类型，单个异常直接传入异常类型，多个异常以tuple或list传入。
-    :param sleep:  实现延迟的方法，默认为time.sleep。
-    在一些异步框架，如tornado中，使用time.sleep会导致阻塞，可以传入自定义的方法来实现延迟。
-    自定义方法函数签名应与time.sleep相同，接收一个参数，为延迟执行的时间。
+    :param sleep:  实现延迟的方法，默认为asyncio.sleep，不会阻塞事件循环。
+    自定义方法函数签名应与time.sleep相同，接收一个参数，为延迟执行的时间，可以是普通函数或者协程函数。
     :param callback: 回调函数，函数签名应接收一个参数，每次出现异常时，会将异常对象传入。
     可用于记录异常日志，中断重试等。
     如回调函数正常执行，并返回True，则表示告知重试装饰器异常已经处理，重试装饰器终止重试，并且不会抛出任何异常。
@@ -89,26 +87,27 @@ def retry(max_retries: int = 5, delay: (float) = 0, step: (float) = 0,
     def wrapper(func):
         @functools.wraps(func)
         async def _wrapper(*args, **kwargs):
-            nonlocal delay, step, max_retries
+            # 每次调用单独计数, 不修改装饰器的参数
+            retries, wait = max_retries, delay
             func_ex = StopRetry
-            while max_retries > 0:
+            while retries > 0:
+                retries -= 1
                 try:
                     success, error = await func(*args, **kwargs)
                     # 验证函数返回False时，表示告知装饰器验证不通过，继续重试
-                    if callable(validate) and validate(error) is False:
-                        continue
-                    else:
+                    if not (callable(validate) and validate(error) is False):
                         return success, error
                 except exceptions as ex:
                     func_ex = ex
                     # 回调函数返回True时，表示告知装饰器异常已经处理，终止重试
                     if callable(callback) and callback(ex) is True:
                         return
-                finally:
-                    max_retries -= 1
-                    if delay > 0 or step > 0:
-                        sleep(delay)
-                        delay += step
+                # 只在需要重试时等待, 成功返回和最后一次失败之后不等待
+                if retries > 0 and (wait > 0 or step > 0):
+                    result = sleep(wait)
+                    if asyncio.iscoroutine(result):
+                        await result
+                    wait += step
             else:
                 raise func_ex
 
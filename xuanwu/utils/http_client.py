@@ -8,10 +8,13 @@
  * @Date: 2020/9/2021:14
 """
 import json
+import time
+import asyncio
 import aiohttp
 from xuanwu.configure import config
 from urllib.parse import urlparse
 from xuanwu.utils import logger
+from xuanwu.utils.retry_policy import is_idempotent, is_cancel
 
 
 __all__ = ("AsyncHttpRequests", )
@@ -24,6 +27,57 @@ class AsyncHttpRequests(object):
     # Every domain name holds a connection session, for less system resource utilization and faster request speed.
     _SESSIONS = {}  # {"domain-name": session, ... }
 
+    # Connection pool settings, `hosts` overrides the default settings per domain name.
+    _POOL_CONFIG = {
+        "limit": 100,  # Total connections of one domain's pool.
+        "limit_per_host": 0,  # Connections per (host, port, ssl), 0 means no limit.
+        "ttl_dns_cache": 300,  # DNS cache time(seconds), None means cache forever.
+        "keepalive_timeout": 60,  # Idle connection keep-alive time(seconds).
+        "hosts": {}  # e.g. {"www.okex.com": {"limit_per_host": 20, "keepalive_timeout": 120}}
+    }
+
+    # Request metrics per endpoint. `{"GET www.okex.com/api/v5/public/time": {...}, ... }`
+    _METRICS = {}
+
+    _KEEPALIVE_TASK_ID = None
+
+    # Retry and per-host circuit breaker policy used by `retry`, None means every request is sent only once.
+    # Enabled by `HTTP.retry` in config file, see `Quant._init_http_pool`.
+    _RETRY_POLICY = None
+
+    @classmethod
+    def set_retry_policy(cls, policy):
+        """ Replace the retry policy, e.g. `RetryPolicy(max_retries=3)`, None disables retry and circuit breaker.
+        """
+        cls._RETRY_POLICY = policy
+
+    @classmethod
+    async def retry(cls, send, method, url, params=None, body=None):
+        """ Send a request under `_RETRY_POLICY`.
+
+        Args:
+            send: Asynchronous function without arguments, which signs, acquires rate limit token and sends the
+                request once, returns (code, success, error). Every attempt calls it again, so that the signature
+                timestamp is fresh and the rate limiter counts every attempt.
+            method: HTTP request method.
+            url: Request url, circuit breaker counts failures per domain name.
+            params: HTTP query params, used to check if the request is idempotent.
+            body: HTTP request body (dict or list), used to check if the request is idempotent.
+
+        Return:
+            code, success, error: Result of the last attempt.
+
+        NOTE:
+            Network errors and 5xx responses are retried with jittered backoff, only if the request is idempotent:
+            GET/DELETE, or a write request that carries a client order id.
+        """
+        policy = cls._RETRY_POLICY
+        if not policy:
+            return await send()
+        host = urlparse(url).netloc
+        idempotent = is_idempotent(method, url, params, data=body)
+        return await policy.run(send, host, idempotent, cancel=is_cancel(method, url))
+
     @classmethod
     async def fetch(cls, method, url, params=None, body=None, data=None, headers=None, timeout=30, **kwargs):
         """ Create a HTTP request.
@@ -48,10 +102,14 @@ class AsyncHttpRequests(object):
         Raises:
             HTTP request exceptions or response data parse exceptions. All the exceptions will be captured and return
             Error information.
+
+        NOTE:
+            The request is sent only once, signed requests are retried by the platform's `request` through `retry`.
         """
         session = cls._get_session(url)
         if not kwargs.get("proxy"):
             kwargs["proxy"] = config.proxy
+        start = time.perf_counter()
         try:
             if method == "GET":
                 response = await session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
@@ -68,12 +126,14 @@ class AsyncHttpRequests(object):
                 error = "http method error!"
                 return None, None, error
         except Exception as e:
+            cls._record(method, url, start, error=True)
             logger.error("method:", method, "url:", url, "headers:", headers, "params:", params, "body:", body,
                          "data:", data, "Error:", e, caller=cls)
             return None, None, e
         code = response.status
         if code not in (200, 201, 202, 203, 204, 205, 206):
             text = await response.text()
+            cls._record(method, url, start, error=True)
             logger.error("method:", method, "url:", url, "headers:", headers, "params:", params, "body:", body,
                          "data:", data, "code:", code, "result:", text, caller=cls)
             return code, None, text
@@ -81,6 +141,7 @@ class AsyncHttpRequests(object):
             result = await response.json()
         except:
             result = await response.text()
+        cls._record(method, url, start)
         logger.debug("method:", method, "url:", url, "headers:", headers, "params:", params, "body:", body,
                      "data:", data, "code:", code, "result:", json.dumps(result), caller=cls)
         return code, result, None
@@ -126,7 +187,129 @@ class AsyncHttpRequests(object):
         parsed_url = urlparse(url)
         key = parsed_url.netloc or parsed_url.hostname
         if key not in cls._SESSIONS:
-            session = aiohttp.ClientSession()
+            settings = cls._pool_settings(key)
+            connector = aiohttp.TCPConnector(limit=settings["limit"],
+                                             limit_per_host=settings["limit_per_host"],
+                                             ttl_dns_cache=settings["ttl_dns_cache"],
+                                             use_dns_cache=True,
+                                             keepalive_timeout=settings["keepalive_timeout"])
+            session = aiohttp.ClientSession(connector=connector)
             cls._SESSIONS[key] = session
         return cls._SESSIONS[key]
 
+    @classmethod
+    def _pool_settings(cls, key):
+        """ Connection pool settings for a domain name, default settings updated by `hosts`.
+        """
+        settings = {k: v for k, v in cls._POOL_CONFIG.items() if k != "hosts"}
+        hostname = key.split(":")[0]
+        settings.update(cls._POOL_CONFIG["hosts"].get(key) or cls._POOL_CONFIG["hosts"].get(hostname) or {})
+        return settings
+
+    @classmethod
+    def configure(cls, limit=None, limit_per_host=None, ttl_dns_cache=None, keepalive_timeout=None, hosts=None,
+                  **kwargs):
+        """ Update connection pool settings, only sessions created later take effect.
+
+        Args:
+            limit: Total connections of one domain's pool, default is 100.
+            limit_per_host: Connections per (host, port, ssl), default is 0 (no limit).
+            ttl_dns_cache: DNS cache time(seconds), default is 300.
+            keepalive_timeout: Idle connection keep-alive time(seconds), default is 60.
+            hosts: Settings per domain name, e.g. `{"www.okex.com": {"limit_per_host": 20}}`.
+        """
+        if limit is not None:
+            cls._POOL_CONFIG["limit"] = limit
+        if limit_per_host is not None:
+            cls._POOL_CONFIG["limit_per_host"] = limit_per_host
+        if ttl_dns_cache is not None:
+            cls._POOL_CONFIG["ttl_dns_cache"] = ttl_dns_cache
+        if keepalive_timeout is not None:
+            cls._POOL_CONFIG["keepalive_timeout"] = keepalive_timeout
+        if hosts:
+            cls._POOL_CONFIG["hosts"].update(hosts)
+
+    @classmethod
+    async def warmup(cls, url, connections=1, timeout=10):
+        """ Open connections (DNS + TCP + TLS) to url's domain in advance, so that the first order doesn't pay for it.
+
+        Args:
+            url: Any cheap url of the domain, e.g. `https://www.okex.com/api/v5/public/time`.
+            connections: How many connections to be opened concurrently.
+            timeout: Request timeout(seconds).
+        """
+        session = cls._get_session(url)
+
+        async def _open():
+            start = time.perf_counter()
+            try:
+                async with session.get(url, timeout=timeout, proxy=config.proxy) as response:
+                    await response.read()
+            except Exception as e:
+                cls._record("GET", url, start, error=True)
+                logger.warn("warm up connection failed! url:", url, "Error:", e, caller=cls)
+                return
+            cls._record("GET", url, start)
+
+        await asyncio.gather(*[_open() for _ in range(connections)])
+
+    @classmethod
+    def start_keepalive(cls, urls, interval=30, connections=1):
+        """ Warm up urls now and then request them periodically, to keep the pooled connections alive.
+
+        Args:
+            urls: Url list, one cheap url per trading host.
+            interval: Keep alive interval(seconds), should be less than `keepalive_timeout`.
+            connections: Connections to be kept per url.
+        """
+        from xuanwu.heartbeat import heartbeat
+
+        async def _keepalive(*args, **kwargs):
+            await asyncio.gather(*[cls.warmup(url, connections) for url in urls])
+
+        if cls._KEEPALIVE_TASK_ID:
+            heartbeat.unregister(cls._KEEPALIVE_TASK_ID)
+        asyncio.get_event_loop().create_task(_keepalive())
+        if interval > 0:
+            cls._KEEPALIVE_TASK_ID = heartbeat.register(_keepalive, interval)
+
+    @classmethod
+    def _record(cls, method, url, start, error=False):
+        """ Record request latency and error count per endpoint.
+        """
+        cost = (time.perf_counter() - start) * 1000
+        parsed_url = urlparse(url)
+        key = f"{method} {parsed_url.netloc}{parsed_url.path}"
+        m = cls._METRICS.get(key)
+        if not m:
+            m = {"count": 0, "errors": 0, "total_ms": 0, "max_ms": 0, "last_ms": 0}
+            cls._METRICS[key] = m
+        m["count"] += 1
+        if error:
+            m["errors"] += 1
+        m["total_ms"] += cost
+        m["last_ms"] = cost
+        if cost > m["max_ms"]:
+            m["max_ms"] = cost
+
+    @classmethod
+    def metrics(cls, reset=False):
+        """ Request metrics per endpoint.
+
+        Returns:
+            `{"GET www.okex.com/api/v5/public/time": {"count": 10, "errors": 0, "avg_ms": 12.3, "max_ms": 30.1,
+                "last_ms": 11.2}, ... }`
+        """
+        result = {}
+        for key, m in cls._METRICS.items():
+            result[key] = {
+                "count": m["count"],
+                "errors": m["errors"],
+                "avg_ms": m["total_ms"] / m["count"] if m["count"] else 0,
+                "max_ms": m["max_ms"],
+                "last_ms": m["last_ms"]
+            }
+        if reset:
+            cls._METRICS = {}
+        return result
+
@@ -8,12 +8,17 @@
   Update: 2018/12/11  1. 取消初始化使用类变量 DB 和 COLLECTION，直接在 self.__init__ 函数传入 db 和 collection;
                       2. 修改名称 self.conn 到 self._conn;
                       3. 修改名称 self.cursor 到 self._cursor;
+  Update: 2026/10/23  1. 增加 MongoBulkWriter, 缓冲高频写入, 按数量或时间间隔通过 bulk_write 批量写入;
+                      2. 增加 iter_list, 按批次流式读取查询结果;
 """
 
 import copy
+import asyncio
 
 import pymongo
 import motor.motor_asyncio
+from pymongo import InsertOne, UpdateOne, UpdateMany
+from pymongo.errors import BulkWriteError, ConnectionFailure
 from bson.objectid import ObjectId
 from urllib.parse import quote_plus
 from functools import wraps
@@ -21,7 +26,7 @@ from functools import wraps
 from xuanwu.utils import logger
 from xuanwu.tasks import SingleTask
 
-__all__ = ("MongoDB",)
+__all__ = ("MongoDB", "MongoBulkWriter", )
 
 DELETE_FLAG = "delete"  # Delete flag, `True` is deleted, otherwise is not deleted.
 
@@ -108,6 +113,11 @@ class MongoDB(object):
         self._collection = collection
         self._cursor = self._mongo_client[db][collection]
 
+    def bulk_writer(self, **kwargs):
+        """ 创建当前集合的缓冲批量写入对象, 参数参考`MongoBulkWriter`.
+        """
+        return MongoBulkWriter(self, **kwargs)
+
     def new_cursor(self, db, collection):
         """ 创建新的游标.
 
@@ -139,6 +149,48 @@ class MongoDB(object):
         NOTE:
             必须传入limit，否则默认返回数据条数可能因为pymongo的默认值而改变
         """
+        result = self._find(spec, fields, sort, skip, limit, cursor)
+        datas = []
+        async for item in result:
+            datas.append(item)
+        return datas, None
+
+    async def iter_list(self, spec=None, fields=None, sort=None, skip=0, limit=0, batch_size=500, str_id=False,
+                        cursor=None):
+        """ 流式获取数据, 异步迭代器, 每次从数据库取回batch_size条, 内存占用与结果总数无关
+        Args:
+            :param spec 查询条件
+            :param fields 返回数据的字段
+            :param sort 排序规则
+            :param skip 查询起点
+            :param limit 返回数据条数, 0表示不限制
+            :param batch_size 每批从数据库取回的条数
+            :param str_id 是否把返回数据的_id转换为字符串, 逐条转换
+            :param cursor 查询游标，如不指定默认使用self._cursor
+        Yield:
+            :yield data: 单条数据字典.
+
+        NOTE:
+            与其他方法不同, 连接断开或者查询出错时直接抛出异常.
+            提前break时服务端游标在迭代器回收时释放, 需要立即释放请使用`contextlib.aclosing`.
+            e.g.
+                async for order in mongo.iter_list({"symbol": "BTC-USDT-SWAP"}, batch_size=1000):
+                    pass
+        """
+        if not self._connected:
+            raise Exception("mongodb connection lost")
+        result = self._find(dict(spec) if spec else None, fields, sort, skip, limit, cursor, batch_size=batch_size)
+        try:
+            async for item in result:
+                if str_id and "_id" in item:
+                    item["_id"] = str(item["_id"])
+                yield item
+        finally:
+            # 提前结束迭代时释放服务端游标
+            await result.close()
+
+    def _find(self, spec, fields, sort, skip, limit, cursor, **kwargs):
+        """ 创建查询游标, 过滤已删除数据 """
         if not spec:
             spec = {}
         if not sort:
@@ -148,11 +200,7 @@ class MongoDB(object):
         if "_id" in spec:
             spec["_id"] = self._convert_id_object(spec["_id"])
         spec[DELETE_FLAG] = {"$ne": True}
-        datas = []
-        result = cursor.find(spec, fields, sort=sort, skip=skip, limit=limit)
-        async for item in result:
-            datas.append(item)
-        return datas, None
+        return cursor.find(spec, fields, sort=sort, skip=skip, limit=limit, **kwargs)
 
     @forestall
     async def find_one(self, spec=None, fields=None, sort=None, cursor=None):
@@ -384,3 +432,156 @@ class MongoDB(object):
             for key, value in origin.items():
                 origin[key] = self._convert_id_object(value)
         return origin
+
+
+class MongoBulkWriter:
+    """ 缓冲批量写入, 通过`MongoDB.bulk_writer`创建.
+
+    Attributes:
+        mongo: MongoDB 对象, 写入它的集合.
+        max_batch: 单批最多写入的操作数, 队列达到该数量时立即写入.
+        flush_interval: 第一个操作进入队列之后最多等待多少秒写入.
+        max_pending: 队列上限, 队列满时 insert / update 等待写入完成(背压), 数据库断开时操作保留在队列中;
+                     写入过程中连接断开或超时(AutoReconnect / NetworkTimeout等)时整批放回队列稍后重试,
+                     已经执行的插入重试时可能报重复主键错误.
+        ordered: 是否按顺序写入, 默认False(unordered, 单个操作失败不影响其他操作);
+                 同一批次中对同一文档先插入再更新的场景需要设置为True.
+        failure_callback: 单个操作写入失败的回调, `async def failure_callback(op, error): pass`,
+                          op 是 pymongo 的 InsertOne / UpdateOne / UpdateMany 对象.
+
+    NOTE:
+        批次按顺序逐个写入, 同一时间只有一个批次在写.
+    """
+
+    def __init__(self, mongo, max_batch=500, flush_interval=0.5, max_pending=10000, ordered=False,
+                 failure_callback=None):
+        self._mongo = mongo
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._ordered = ordered
+        self._failure_callback = failure_callback
+        self._queue = []  # [(op, future or None), ...]
+        self._timer = None
+        self._lock = asyncio.Lock()
+        self._space = asyncio.Event()  # 队列未满
+        self._space.set()
+        self._batches = 0
+        self._written = 0
+        self._failures = 0
+        self._write_time = 0
+
+    @property
+    def stats(self):
+        return {
+            "pending": len(self._queue),
+            "batches": self._batches,
+            "written": self._written,
+            "failures": self._failures,
+            "avg_batch_ms": round(self._write_time / self._batches * 1000, 3) if self._batches else 0
+        }
+
+    async def insert(self, doc, wait=False):
+        """ 插入数据, 进入队列之后即返回
+
+        Args:
+            :param doc 插入数据 dict
+            :param wait 是否等待写入完成
+        Return:
+            :return success: 写入成功时是True, wait=False 时入队之后返回True.
+            :return error: 写入失败的原因, otherwise it's None.
+        """
+        return await self._put(InsertOne(copy.deepcopy(doc)), wait)
+
+    async def update(self, spec, update_fields, upsert=False, multi=False, wait=False):
+        """ 更新数据, 参数参考`MongoDB.update`
+
+        Args:
+            :param wait 是否等待写入完成
+        Return:
+            :return success: 写入成功时是True, wait=False 时入队之后返回True.
+            :return error: 写入失败的原因, otherwise it's None.
+        """
+        spec = dict(spec)
+        spec[DELETE_FLAG] = {"$ne": True}
+        if "_id" in spec:
+            spec["_id"] = self._mongo._convert_id_object(spec["_id"])
+        update_fields = copy.deepcopy(update_fields)
+        op = UpdateMany(spec, update_fields, upsert=upsert) if multi else UpdateOne(spec, update_fields, upsert=upsert)
+        return await self._put(op, wait)
+
+    async def flush(self):
+        """ 写入队列中的全部操作 """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            while self._queue and MongoDB.is_connected():
+                batch = self._queue[:self._max_batch]
+                self._queue = self._queue[self._max_batch:]
+                self._release()
+                if not await self._write(batch):
+                    break
+        if self._queue:
+            # 数据库断开, 稍后重试
+            self._schedule()
+
+    async def _put(self, op, wait):
+        while len(self._queue) >= self._max_pending:
+            self._space.clear()
+            await self._space.wait()
+        future = asyncio.get_event_loop().create_future() if wait else None
+        self._queue.append((op, future))
+        if len(self._queue) >= self._max_batch:
+            SingleTask.run(self.flush)
+        else:
+            self._schedule()
+        if future:
+            return await future
+        return True, None
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(self._flush_interval, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        SingleTask.run(self.flush)
+
+    def _release(self):
+        if len(self._queue) < self._max_pending:
+            self._space.set()
+
+    async def _write(self, batch):
+        """ 写入一个批次, 连接错误时整批放回队列头部并返回False """
+        ops = [op for op, _ in batch]
+        errors = {}
+        start = asyncio.get_event_loop().time()
+        try:
+            await self._mongo._cursor.bulk_write(ops, ordered=self._ordered)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                errors[err["index"]] = Exception(err.get("errmsg"))
+            if self._ordered and errors:
+                # 顺序写入时第一个失败之后的操作都没有执行
+                first = min(errors)
+                for i in range(first + 1, len(ops)):
+                    errors.setdefault(i, Exception("not executed after previous error"))
+        except ConnectionFailure as e:
+            logger.warn("mongodb bulk write connection error, retry later:", e, caller=self)
+            self._queue = batch + self._queue
+            return False
+        except Exception as e:
+            logger.error("mongodb bulk write ERROR:", e, caller=self)
+            errors = {i: e for i in range(len(ops))}
+        self._write_time += asyncio.get_event_loop().time() - start
+        self._batches += 1
+        self._written += len(ops) - len(errors)
+        self._failures += len(errors)
+        for i, (op, future) in enumerate(batch):
+            error = errors.get(i)
+            if error and self._failure_callback:
+                SingleTask.run(self._failure_callback, op, error)
+            if future and not future.done():
+                future.set_result((None, error) if error else (True, None))
+        return True
@@ -5,7 +5,12 @@
   @ Date:     2020/9/29 14:50
   @ Description:
   @ History:
+    2026/10/23: 增加 AsyncDataBase, 连接池 + 线程池执行, 不阻塞事件循环, 参数化 executemany 批量写入.
 """
+import re
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import pymysql
 from pymysql.converters import escape_string
 from xuanwu.utils import logger
@@ -41,7 +46,11 @@ class DataBase:
         return db, cursor
 
     def _reconn(self):
-        self._conn(self.conf)
+        try:
+            self.db.close()
+        except Exception:
+            pass
+        self.db, self.cursor = self._conn(self.conf)
 
     def status(self):
         # 连接状态
@@ -316,4 +325,232 @@ class DataClient:
                 self.conns.setdefault(db_name, db)
             else:
                 raise NameError("db name error")
-        return db
\ No newline at end of file
+        return db
+
+
+_IDENTIFIER = re.compile(r"[A-Za-z0-9_$]+(\.[A-Za-z0-9_$]+)?")
+# 连接断开的错误, 出现后丢弃该连接, 下次使用时重新连接
+_CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+
+def _quote(name):
+    """ 表名/字段名加反引号, 只允许字母数字下划线, 避免拼接SQL注入 """
+    if not isinstance(name, str) or not _IDENTIFIER.fullmatch(name):
+        raise ValueError(f"invalid identifier: {name}")
+    return ".".join(f"`{part}`" for part in name.split("."))
+
+
+class AsyncDataBase:
+    """ 异步MySQL访问, 连接池中的pymysql连接在线程池中执行, 不阻塞事件循环.
+
+    Attributes:
+        conf: 连接配置, 与`DataBase`一致, e.g. {"host": "", "port": 3306, "username": "", "password": "", "schema": ""}
+        pool_size: 连接池大小, 同时执行的SQL数量上限.
+        batch_size: insert 单条 executemany 的最大行数.
+        flush_interval: insert_buffered 缓冲的最长时间(秒).
+        debug: 是否打印SQL.
+
+    所有方法返回 (result, error), 与其他异步接口一致.
+    e.g.
+        db = AsyncDataBase(_db_config["ftx_ticker_count"], pool_size=4)
+        rows, error = await db.query("SELECT * FROM ticker WHERE symbol = %s", ("BTC-PERP", ))
+        count, error = await db.insert([{"symbol": "BTC-PERP", "spread": 0.1}, ...], "ticker")
+        db.insert_buffered({"symbol": "BTC-PERP", "spread": 0.1}, "ticker")  # 按数量或时间批量写入
+    """
+
+    def __init__(self, conf, pool_size=4, batch_size=500, flush_interval=1, debug=False):
+        if not isinstance(conf, dict):
+            raise TypeError("conf require dict type ")
+        self._conf = conf
+        self._pool_size = pool_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._debug = debug
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="mysql")
+        self._pool = None  # 空闲连接队列, 未连接的位置是None
+        self._buffers = {}  # insert_buffered 缓冲. e.g. {(table, fields, ignore, replace): [row, ...], ... }
+        self._buffered = 0
+        self._timer = None
+        self._metrics = {}  # {op: [count, errors, total_time, max_time]}
+        self._wait_time = 0  # 等待空闲连接的总时间
+
+    @property
+    def metrics(self):
+        """ 各操作的执行次数、失败次数和耗时(毫秒, 不包括等待空闲连接) """
+        result = {
+            op: {
+                "count": count,
+                "errors": errors,
+                "avg_ms": round(total / count * 1000, 3) if count else 0,
+                "max_ms": round(max_time * 1000, 3)
+            } for op, (count, errors, total, max_time) in self._metrics.items()
+        }
+        result["pool_wait_ms"] = round(self._wait_time * 1000, 3)
+        result["buffered"] = self._buffered
+        return result
+
+    async def execute(self, statement, args=None):
+        """ 执行单条SQL, 返回影响行数 """
+        return await self._run("execute", lambda cursor: cursor.execute(statement, args), statement)
+
+    async def executemany(self, statement, rows):
+        """ 批量执行同一条SQL, INSERT语句会被合并为一条多行INSERT, 返回影响行数 """
+        if not rows:
+            return 0, None
+        return await self._run("executemany", lambda cursor: cursor.executemany(statement, rows), statement)
+
+    async def query(self, statement, args=None):
+        """ 查询, 返回字典列表 """
+
+        def func(cursor):
+            cursor.execute(statement, args)
+            fields = [col[0] for col in cursor.description or ()]
+            return [dict(zip(fields, row)) for row in cursor.fetchall()]
+
+        return await self._run("query", func, statement)
+
+    async def insert(self, entry, table, ignore=False, replace=False):
+        """ 插入数据, 按batch_size分批executemany
+
+        Args:
+            :param entry 插入数据, dict或者字段相同的dict列表
+            :param table 表名
+            :param ignore INSERT IGNORE
+            :param replace REPLACE INTO
+        Return:
+            :return count 插入行数
+        """
+        entry_list = [entry] if isinstance(entry, dict) else entry
+        if not isinstance(entry_list, list) or not entry_list:
+            return None, TypeError("type error")
+        fields = tuple(entry_list[0])
+        rows = [tuple(e[k] for k in fields) for e in entry_list]
+        return await self._insert_rows(table, fields, rows, ignore, replace)
+
+    async def update(self, entry, table, cond):
+        """ 更新数据
+
+        Args:
+            :param entry 需要更新的字段
+            :param table 表名
+            :param cond where条件, 多个条件之间是and
+        Return:
+            :return count 更新行数
+        """
+        if not isinstance(entry, dict) or not isinstance(cond, dict) or not entry or not cond:
+            return None, TypeError("type error")
+        try:
+            values = ", ".join(f"{_quote(k)} = %s" for k in entry)
+            conds = " AND ".join(f"{_quote(k)} = %s" for k in cond)
+            statement = f"UPDATE {_quote(table)} SET {values} WHERE {conds}"
+        except ValueError as e:
+            return None, e
+        return await self.execute(statement, tuple(entry.values()) + tuple(cond.values()))
+
+    def insert_buffered(self, entry, table, ignore=False, replace=False):
+        """ 缓冲插入, 不等待写入, 缓冲达到batch_size或者flush_interval之后批量写入, 写入失败记录日志.
+        """
+        key = (table, tuple(entry), ignore, replace)
+        rows = self._buffers.setdefault(key, [])
+        rows.append(tuple(entry.values()))
+        self._buffered += 1
+        if len(rows) >= self._batch_size:
+            self._buffers.pop(key)
+            self._buffered -= len(rows)
+            asyncio.get_event_loop().create_task(self._flush_rows(key, rows))
+        elif self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(self._flush_interval, self._on_timer)
+
+    async def flush(self):
+        """ 立即写入全部缓冲数据 """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        buffers, self._buffers, self._buffered = self._buffers, {}, 0
+        for key, rows in buffers.items():
+            await self._flush_rows(key, rows)
+
+    async def close(self):
+        """ 写入缓冲数据并关闭全部连接 """
+        await self.flush()
+        if self._pool:
+            loop = asyncio.get_event_loop()
+            for _ in range(self._pool_size):
+                conn = await self._pool.get()
+                if conn:
+                    await loop.run_in_executor(self._executor, conn.close)
+        self._executor.shutdown(wait=False)
+
+    def _on_timer(self):
+        self._timer = None
+        asyncio.get_event_loop().create_task(self.flush())
+
+    async def _flush_rows(self, key, rows):
+        table, fields, ignore, replace = key
+        _, error = await self._insert_rows(table, fields, rows, ignore, replace)
+        if error:
+            logger.error("buffered insert error! table:", table, "rows:", len(rows), "error:", error, caller=self)
+
+    async def _insert_rows(self, table, fields, rows, ignore, replace):
+        try:
+            columns = ", ".join(_quote(k) for k in fields)
+            statement = f"{'REPLACE' if replace else 'INSERT'} {'IGNORE ' if ignore else ''}INTO {_quote(table)} " \
+                        f"({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+        except ValueError as e:
+            return None, e
+        total = 0
+        for i in range(0, len(rows), self._batch_size):
+            count, error = await self.executemany(statement, rows[i:i + self._batch_size])
+            if error:
+                return total, error
+            total += count
+        return total, None
+
+    def _connect(self):
+        return pymysql.connect(host=self._conf["host"], port=self._conf["port"], user=self._conf["username"],
+                               passwd=self._conf["password"], db=self._conf["schema"], charset="utf8mb4",
+                               autocommit=True)
+
+    def _call(self, conn, func):
+        """ 在线程池中执行, 返回 (conn, result, error), 连接断开时关闭连接并返回None """
+        try:
+            if conn is None:
+                conn = self._connect()
+            with conn.cursor() as cursor:
+                return conn, func(cursor), None
+        except _CONNECTION_ERRORS as e:
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            return None, None, e
+        except Exception as e:
+            return conn, None, e
+
+    async def _run(self, op, func, statement):
+        if self._pool is None:
+            self._pool = asyncio.Queue()
+            for _ in range(self._pool_size):
+                self._pool.put_nowait(None)
+        if self._debug:
+            logger.info(statement, caller=self)
+        loop = asyncio.get_event_loop()
+        start = time.time()
+        conn = await self._pool.get()
+        acquired = time.time()
+        self._wait_time += acquired - start
+        try:
+            conn, result, error = await loop.run_in_executor(self._executor, self._call, conn, func)
+        finally:
+            self._pool.put_nowait(conn)
+        cost = time.time() - acquired
+        metric = self._metrics.setdefault(op, [0, 0, 0, 0])
+        metric[0] += 1
+        metric[2] += cost
+        metric[3] = max(metric[3], cost)
+        if error:
+            metric[1] += 1
+            logger.error("mysql error:", error, "statement:", statement, caller=self)
+            return None, error
+        return result, None
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/21 18:00
+  @ Description: 按目标报价梯度改单, 目标挂单与当前挂单做差异比较
+  @ History:
+    1. 价格和数量都没有变化的挂单保持不动, 其余挂单优先改单, 多出的档位下单, 多余的挂单撤单;
+    2. 改单/下单/撤单发出之后到交易所推送确认之前, 使用请求中的目标值作为挂单状态, 避免每个行情tick重复发送;
+    3. 上一次报价请求未完成时新的报价只保留最新一次, 上一次完成后再执行.
+"""
+import time
+from xuanwu.utils import logger
+from xuanwu.model.order import ORDER_ACTION_BUY, ORDER_ACTION_SELL
+
+__all__ = ("diff_ladder", "LadderQuoter", )
+
+
+def diff_ladder(desired, live):
+    """ 比较同一方向的目标报价和当前挂单
+
+    Attributes:
+        :param desired: 目标报价 [(price, size), ...], size是剩余数量(绝对值).
+        :param live: 当前挂单 {order_no: (price, size), ...}.
+    :returns:
+        :return amends: 需要改单的挂单 [(order_no, price, size), ...].
+        :return creates: 需要新下单的档位 [(price, size), ...].
+        :return cancels: 需要撤单的挂单 [order_no, ...].
+    """
+    unmatched = dict(live)
+    wanted = []
+    for price, size in desired:
+        for order_no, level in unmatched.items():
+            if level == (price, size):
+                del unmatched[order_no]
+                break
+        else:
+            wanted.append((price, size))
+    # 剩余的目标档位和挂单按价格顺序配对改单, 一次改单代替一次撤单加一次下单
+    wanted.sort()
+    remaining = sorted(unmatched.items(), key=lambda item: item[1][0])
+    amends = [(order_no, price, size) for (order_no, _), (price, size) in zip(remaining, wanted)]
+    creates = wanted[len(remaining):]
+    cancels = [order_no for order_no, _ in remaining[len(wanted):]]
+    return amends, creates, cancels
+
+
+class LadderQuoter:
+    """ 报价梯度管理.
+
+    Attributes:
+        live_orders: 查询交易所已确认的挂单, 函数`live_orders(action)`, 返回 {order_no: (price, size, filled), ...}.
+        send: 批量发送函数, 异步函数`send(amends, creates, cancels)`,
+              amends: [(order_no, price, size, filled), ...], creates: [(action, price, size), ...], cancels: [order_no, ...],
+              返回与三个列表一一对应的结果列表 (amend_results, create_results, cancel_results), 每项为 (order_no, error).
+        pending_ttl: 请求发出后等待交易所推送确认的时间(秒), 超时之后以live_orders为准.
+    """
+
+    def __init__(self, live_orders, send, pending_ttl=3):
+        self._live_orders = live_orders
+        self._send = send
+        self._pending_ttl = pending_ttl
+        self._pending = {}  # 未确认的下单/改单. e.g. {order_no: (action, price, size, filled, expire), ... }
+        self._canceling = {}  # 未确认的撤单. e.g. {order_no: expire, ... }
+        self._running = False
+        self._latest = None  # 报价请求执行期间收到的最新目标报价 (bids, asks)
+
+    @property
+    def in_flight(self):
+        return self._running
+
+    async def requote(self, bids, asks):
+        """ 按目标报价调整挂单
+
+        Attributes:
+            :param bids: 买单目标报价 [(price, size), ...].
+            :param asks: 卖单目标报价 [(price, size), ...].
+        :returns:
+            :return stats: 发送的请求数量(包括执行期间合并的报价) {"amend": n, "create": n, "cancel": n},
+                           被合并到进行中的报价时是None.
+            :return error: Error information, otherwise it's None.
+        """
+        if self._running:
+            self._latest = (bids, asks)
+            return None, None
+        self._running = True
+        total, errors = {"amend": 0, "create": 0, "cancel": 0}, []
+        try:
+            while True:
+                stats, error = await self._requote(bids, asks)
+                for key in total:
+                    total[key] += stats[key]
+                if error:
+                    errors.extend(error if isinstance(error, list) else [error])
+                if self._latest is None:
+                    return total, errors if errors else None
+                bids, asks = self._latest
+                self._latest = None
+        finally:
+            self._running = False
+
+    def live(self, action):
+        """ 当前挂单视图, 未确认的请求以请求中的目标值为准 {order_no: (price, size, filled)} """
+        now = time.time()
+        for order_no, expire in list(self._canceling.items()):
+            if expire < now:
+                del self._canceling[order_no]
+        orders = dict(self._live_orders(action))
+        for order_no, (side, price, size, filled, expire) in list(self._pending.items()):
+            confirmed = orders.get(order_no)
+            if expire < now or (confirmed and confirmed[:2] == (price, size)):
+                del self._pending[order_no]
+            elif side == action:
+                orders[order_no] = (price, size, filled)
+        for order_no in self._canceling:
+            orders.pop(order_no, None)
+        return orders
+
+    async def _requote(self, bids, asks):
+        amends, creates, cancels = [], [], []
+        sides = {}  # 改单挂单的方向 {order_no: action}
+        for action, desired in ((ORDER_ACTION_BUY, bids), (ORDER_ACTION_SELL, asks)):
+            live = self.live(action)
+            a, c, x = diff_ladder([(price, abs(size)) for price, size in desired],
+                                  {order_no: (price, size) for order_no, (price, size, _) in live.items()})
+            amends.extend((order_no, price, size, live[order_no][2]) for order_no, price, size in a)
+            sides.update((order_no, action) for order_no, _, _ in a)
+            # 新下单保留调用方传入的数量符号, 由交易对象决定开平方向
+            signs = {(price, abs(size)): size for price, size in desired}
+            creates.extend((action, price, signs[(price, size)]) for price, size in c)
+            cancels.extend(x)
+        stats = {"amend": len(amends), "create": len(creates), "cancel": len(cancels)}
+        if not amends and not creates and not cancels:
+            return stats, None
+
+        expire = time.time() + self._pending_ttl
+        for order_no in cancels:
+            self._canceling[order_no] = expire
+        try:
+            amend_results, create_results, cancel_results = await self._send(amends, creates, cancels)
+        except Exception as e:
+            logger.exception("requote error:", e, caller=self)
+            for order_no in cancels:
+                self._canceling.pop(order_no, None)
+            return stats, e
+
+        expire = time.time() + self._pending_ttl
+        errors = []
+        for (order_no, price, size, filled), (_, error) in zip(amends, amend_results):
+            if error:
+                errors.append(error)
+                self._pending.pop(order_no, None)
+            else:
+                self._pending[order_no] = (sides[order_no], price, size, filled, expire)
+        for (action, price, size), (order_no, error) in zip(creates, create_results):
+            if error:
+                errors.append(error)
+            else:
+                self._pending[order_no] = (action, price, abs(size), 0, expire)
+        for order_no, (_, error) in zip(cancels, cancel_results):
+            if error:
+                errors.append(error)
+                self._canceling.pop(order_no, None)
+        if errors:
+            logger.warn("requote errors:", errors, caller=self)
+            return stats, errors
+        return stats, None
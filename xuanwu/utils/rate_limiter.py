@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/20 10:00
+  @ Description: REST请求令牌桶限频
+  @ History:
+    1. 每个交易所声明一组限频规则, 规则按接口路径匹配, 作用域为账户(access key)或者IP(进程内全局);
+    2. 同一账户/IP的令牌桶在进程内共享, 多个REST客户端使用同一账户时共同计数;
+    3. 令牌不足时请求排队等待, 下单/撤单/改单优先于查询请求获得令牌;
+    4. 收到HTTP 429之后, 对应的令牌桶暂停一段时间, 避免进入交易所的惩罚窗口.
+"""
+import re
+import time
+import heapq
+import asyncio
+import itertools
+from urllib.parse import urlparse
+from xuanwu import const
+from xuanwu.utils import logger
+
+__all__ = ("RateLimiter", "TokenBucket", "PRIORITY_ORDER", "PRIORITY_QUERY", )
+
+PRIORITY_ORDER = 0  # 下单、撤单、改单
+PRIORITY_QUERY = 1  # 查询
+
+SCOPE_ACCOUNT = "account"  # 按账户计数
+SCOPE_IP = "ip"  # 按IP计数, 即进程内全局
+
+
+def _batch_weight(method, path, params, body):
+    """ 批量接口按订单数量计数 """
+    return len(body) if isinstance(body, list) and body else 1
+
+
+def _binance_depth_weight(method, path, params, body):
+    limit = int((params or {}).get("limit", 100))
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def _binance_symbol_weight(weight_all, weight_symbol=1):
+    """ 不带symbol参数时权重更高的接口 """
+    def weight(method, path, params, body):
+        return weight_symbol if (params or {}).get("symbol") else weight_all
+    return weight
+
+
+"""
+限频规则, 参考各交易所文档:
+    name: 规则名称, 同名规则共享令牌桶.
+    paths: 匹配的接口路径列表, None表示匹配所有接口.
+    prefix: paths按前缀匹配.
+    regex: paths按正则表达式完整匹配.
+    methods: 匹配的HTTP方法列表, None表示匹配所有方法.
+    limit: interval时间内允许的请求数(或权重).
+    interval: 时间窗口(秒).
+    scope: `account` 或 `ip`.
+    priority: 请求优先级, 默认`PRIORITY_QUERY`.
+    weight: 每个请求消耗的令牌数, 整数或者函数`weight(method, path, params, body)`, 默认1.
+    default: 没有任何带paths的规则匹配时使用的规则.
+"""
+OKEX_V5_RULES = [
+    {"name": "order", "paths": ["/api/v5/trade/order"], "methods": ["POST"], "limit": 60, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "batch-orders", "paths": ["/api/v5/trade/batch-orders"], "limit": 300, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER, "weight": _batch_weight},
+    {"name": "cancel-order", "paths": ["/api/v5/trade/cancel-order"], "limit": 60, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "cancel-batch-orders", "paths": ["/api/v5/trade/cancel-batch-orders"], "limit": 300, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER, "weight": _batch_weight},
+    {"name": "amend-order", "paths": ["/api/v5/trade/amend-order"], "limit": 60, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "amend-batch-orders", "paths": ["/api/v5/trade/amend-batch-orders"], "limit": 300, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER, "weight": _batch_weight},
+    {"name": "close-position", "paths": ["/api/v5/trade/close-position"], "limit": 20, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "order-algo", "paths": ["/api/v5/trade/order-algo", "/api/v5/trade/cancel-algos"], "limit": 20,
+     "interval": 2, "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "get-order", "paths": ["/api/v5/trade/order"], "methods": ["GET"], "limit": 60, "interval": 2,
+     "scope": SCOPE_ACCOUNT},
+    {"name": "orders-pending", "paths": ["/api/v5/trade/orders-pending"], "limit": 60, "interval": 2,
+     "scope": SCOPE_ACCOUNT},
+    {"name": "balance", "paths": ["/api/v5/account/balance"], "limit": 10, "interval": 2, "scope": SCOPE_ACCOUNT},
+    {"name": "positions", "paths": ["/api/v5/account/positions"], "limit": 10, "interval": 2,
+     "scope": SCOPE_ACCOUNT},
+    {"name": "position-risk", "paths": ["/api/v5/account/account-position-risk"], "limit": 10, "interval": 2,
+     "scope": SCOPE_ACCOUNT},
+    {"name": "set-position-mode", "paths": ["/api/v5/account/set-position-mode"], "limit": 5, "interval": 2,
+     "scope": SCOPE_ACCOUNT},
+    {"name": "instruments", "paths": ["/api/v5/public/instruments"], "limit": 20, "interval": 2, "scope": SCOPE_IP},
+    {"name": "mark-price", "paths": ["/api/v5/public/mark-price", "/api/v5/public/time"], "limit": 10,
+     "interval": 2, "scope": SCOPE_IP},
+    {"name": "candles", "paths": ["/api/v5/market/candles"], "limit": 40, "interval": 2, "scope": SCOPE_IP},
+    {"name": "market", "paths": ["/api/v5/market/tickers", "/api/v5/market/ticker", "/api/v5/market/index-tickers",
+                                 "/api/v5/market/books"], "limit": 20, "interval": 2, "scope": SCOPE_IP},
+    {"name": "default", "default": True, "limit": 10, "interval": 2, "scope": SCOPE_ACCOUNT},
+]
+
+BINANCE_U_SWAP_RULES = [
+    {"name": "ip-weight", "limit": 2400, "interval": 60, "scope": SCOPE_IP, "weight": 1},
+    {"name": "orders-10s", "paths": ["/fapi/v1/order"], "methods": ["POST"], "limit": 300, "interval": 10,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "orders-1m", "paths": ["/fapi/v1/order"], "methods": ["POST"], "limit": 1200, "interval": 60,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "cancel", "paths": ["/fapi/v1/order", "/fapi/v1/allOpenOrders"], "methods": ["DELETE"], "limit": 1200,
+     "interval": 60, "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+]
+
+# 带权重的币安接口, 权重计入`ip-weight`
+BINANCE_U_SWAP_WEIGHTS = {
+    "/fapi/v1/depth": _binance_depth_weight,
+    "/fapi/v1/ticker/24hr": _binance_symbol_weight(40),
+    "/fapi/v1/ticker/price": _binance_symbol_weight(2),
+    "/fapi/v1/openOrders": _binance_symbol_weight(40),
+    "/fapi/v1/allOrders": 5,
+    "/fapi/v1/userTrades": 5,
+    "/fapi/v2/account": 5,
+    "/fapi/v2/positionRisk": 5,
+    "/fapi/v2/balance": 5,
+    "/fapi/v1/klines": 5,
+    "/fapi/v1/exchangeInfo": 1,
+}
+BINANCE_U_SWAP_RULES[0]["weight"] = lambda method, path, params, body: (
+    BINANCE_U_SWAP_WEIGHTS[path](method, path, params, body) if callable(BINANCE_U_SWAP_WEIGHTS.get(path))
+    else BINANCE_U_SWAP_WEIGHTS.get(path, 1))
+
+# 火币合约: 每个UID交易类接口与查询类接口分别限频, 公共接口按IP限频
+HUOBI_SWAP_ORDER_PATHS = [
+    "/api/v1/contract_order", "/api/v1/contract_batchorder", "/api/v1/contract_cancel", "/api/v1/contract_cancelall",
+    "/swap-api/v1/swap_order", "/swap-api/v1/swap_batchorder", "/swap-api/v1/swap_cancel",
+    "/swap-api/v1/swap_cancelall",
+    "/linear-swap-api/v1/swap_order", "/linear-swap-api/v1/swap_batchorder", "/linear-swap-api/v1/swap_cancel",
+    "/linear-swap-api/v1/swap_cancelall", "/linear-swap-api/v1/swap_cross_order",
+    "/linear-swap-api/v1/swap_cross_batchorder", "/linear-swap-api/v1/swap_cross_cancel",
+    "/linear-swap-api/v1/swap_cross_cancelall",
+]
+HUOBI_SWAP_RULES = [
+    {"name": "trade", "paths": HUOBI_SWAP_ORDER_PATHS, "limit": 72, "interval": 3, "scope": SCOPE_ACCOUNT,
+     "priority": PRIORITY_ORDER},
+    {"name": "public", "paths": ["/market/"], "prefix": True, "limit": 800, "interval": 1, "scope": SCOPE_IP},
+    {"name": "query", "default": True, "limit": 72, "interval": 3, "scope": SCOPE_ACCOUNT},
+]
+
+HUOBI_SPOT_RULES = [
+    {"name": "order", "paths": ["/v1/order/orders/place", "/v1/order/batch-orders"], "limit": 100, "interval": 2,
+     "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "cancel", "paths": [r"/v1/order/orders/[^/]+/submitcancel", r"/v1/order/orders/batchcancel",
+                                 r"/v1/order/orders/batchCancelOpenOrders"], "regex": True, "methods": ["POST"],
+     "limit": 100, "interval": 2, "scope": SCOPE_ACCOUNT, "priority": PRIORITY_ORDER},
+    {"name": "public", "paths": ["/market/"], "prefix": True, "limit": 800, "interval": 1, "scope": SCOPE_IP},
+    {"name": "query", "default": True, "limit": 100, "interval": 2, "scope": SCOPE_ACCOUNT},
+]
+
+RULES = {
+    const.OKEX_V5: OKEX_V5_RULES,
+    const.GATEIO: OKEX_V5_RULES,  # GateIORest 目前沿用 OKX V5 的接口定义
+    const.BINANCE_U_SWAP: BINANCE_U_SWAP_RULES,
+    const.HUOBI: HUOBI_SPOT_RULES,
+    const.HUOBI_FUTURE: HUOBI_SWAP_RULES,
+    const.HUOBI_SWAP: HUOBI_SWAP_RULES,
+    const.HUOBI_USDT_SWAP: HUOBI_SWAP_RULES,
+    const.HUOBI_USDT_SWAP_CROSS: HUOBI_SWAP_RULES,
+}
+
+
+class TokenBucket:
+    """ 令牌桶.
+
+    Attributes:
+        limit: 桶容量, 即interval时间内允许的请求数.
+        interval: 时间窗口(秒), 令牌以 limit / interval 的速度补充.
+    """
+
+    def __init__(self, limit, interval):
+        self._capacity = float(limit)
+        self._rate = float(limit) / interval
+        self._tokens = float(limit)
+        self._ts = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._ts) * self._rate)
+        self._ts = now
+
+    @property
+    def tokens(self):
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, tokens=1):
+        """ 获取tokens个令牌需要等待的时间(秒), 0表示可以立即获取 """
+        self._refill()
+        tokens = min(tokens, self._capacity)
+        if self._tokens >= tokens:
+            return 0
+        return (tokens - self._tokens) / self._rate
+
+    def consume(self, tokens=1):
+        self._refill()
+        self._tokens -= min(tokens, self._capacity)
+
+    def pause(self, seconds):
+        """ 清空令牌并暂停seconds秒 """
+        self._refill()
+        self._tokens = -seconds * self._rate
+
+
+class RateLimiter:
+    """ REST请求限频.
+
+    Attributes:
+        platform: 交易所名称, 用于选择默认限频规则.
+        rules: 自定义限频规则, 默认使用`RULES[platform]`.
+        penalty: 收到HTTP 429之后暂停的时间(秒), 默认10秒.
+
+    NOTE:
+        同一交易所的RateLimiter实例共享令牌桶, 通过`RateLimiter.get(platform)`获取进程内共享实例.
+    """
+
+    _LIMITERS = {}  # {platform: RateLimiter}
+
+    def __init__(self, platform, rules=None, penalty=10):
+        self._platform = platform
+        self._rules = rules if rules is not None else RULES.get(platform, [])
+        self._penalty = penalty
+        self._buckets = {}  # {(rule name, scope key): TokenBucket}
+        self._waiters = []  # [(priority, seq, [(bucket, tokens), ...], future), ...]
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._dispatcher = None
+
+    @classmethod
+    def get(cls, platform):
+        """ 获取交易所的共享限频实例 """
+        if platform not in cls._LIMITERS:
+            cls._LIMITERS[platform] = RateLimiter(platform)
+        return cls._LIMITERS[platform]
+
+    def _match(self, method, path):
+        matched = []
+        default = None
+        endpoint_matched = False
+        for rule in self._rules:
+            if rule.get("default"):
+                default = rule
+                continue
+            if rule.get("methods") and method not in rule["methods"]:
+                continue
+            paths = rule.get("paths")
+            if paths is not None:
+                if rule.get("prefix"):
+                    if not [p for p in paths if path.startswith(p)]:
+                        continue
+                elif rule.get("regex"):
+                    if not [p for p in paths if re.fullmatch(p, path)]:
+                        continue
+                elif path not in paths:
+                    continue
+                endpoint_matched = True
+            matched.append(rule)
+        if not endpoint_matched and default:
+            matched.append(default)
+        return matched
+
+    def _bucket(self, rule, account):
+        key = (rule["name"], account if rule.get("scope") == SCOPE_ACCOUNT else SCOPE_IP)
+        bucket = self._buckets.get(key)
+        if not bucket:
+            bucket = TokenBucket(rule["limit"], rule["interval"])
+            self._buckets[key] = bucket
+        return bucket
+
+    def _resolve(self, method, uri, account, params, body):
+        path = urlparse(uri).path
+        demands = []
+        priority = PRIORITY_QUERY
+        for rule in self._match(method, path):
+            weight = rule.get("weight", 1)
+            if callable(weight):
+                weight = weight(method, path, params, body)
+            demands.append((self._bucket(rule, account), weight))
+            priority = min(priority, rule.get("priority", PRIORITY_QUERY))
+        return demands, priority
+
+    async def acquire(self, method, uri, account=None, params=None, body=None):
+        """ 获取请求令牌, 令牌不足时排队等待
+
+        Attributes:
+            :param method: HTTP request method.
+            :param uri: HTTP request uri or url, query string is ignored.
+            :param account: Account key of `account` scope buckets, normally access key.
+            :param params: HTTP query params, used for weight.
+            :param body: HTTP request body, used for weight.
+        """
+        demands, priority = self._resolve(method, uri, account, params, body)
+        if not demands:
+            return
+        if not self._waiters and not [b for b, t in demands if b.wait_time(t) > 0]:
+            for bucket, tokens in demands:
+                bucket.consume(tokens)
+            return
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), demands, future))
+        self._wake()
+        await future
+
+    def penalize(self, method, uri, account=None, seconds=None):
+        """ 收到HTTP 429之后暂停匹配的令牌桶 """
+        seconds = seconds or self._penalty
+        demands, _ = self._resolve(method, uri, account, None, None)
+        for bucket, _ in demands:
+            bucket.pause(seconds)
+        logger.warn("rate limited by exchange, pause", seconds, "seconds, uri:", uri, caller=self)
+
+    def _wake(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_event_loop().create_task(self._dispatch())
+        self._wakeup.set()
+
+    async def _dispatch(self):
+        """ 按优先级分发令牌, 高优先级请求等待的令牌桶不会被低优先级请求占用 """
+        while self._waiters:
+            self._wakeup.clear()
+            blocked = set()
+            delay = None
+            pending = []
+            while self._waiters:
+                waiter = heapq.heappop(self._waiters)
+                _, _, demands, future = waiter
+                if future.done():
+                    continue
+                waits = [b.wait_time(t) for b, t in demands]
+                if max(waits) == 0 and not [b for b, _ in demands if id(b) in blocked]:
+                    for bucket, tokens in demands:
+                        bucket.consume(tokens)
+                    future.set_result(True)
+                    continue
+                for (bucket, _), w in zip(demands, waits):
+                    if w > 0:
+                        # 令牌补充之前, 低优先级请求不能占用该令牌桶
+                        blocked.add(id(bucket))
+                        delay = w if delay is None else min(delay, w)
+                pending.append(waiter)
+            for waiter in pending:
+                heapq.heappush(self._waiters, waiter)
+            if not self._waiters:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay if delay is not None else 0.01)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/22 10:00
+  @ Description: REST请求重试策略和按域名的熔断器
+  @ History:
+    1. 网络错误和5xx响应按指数退避加随机抖动重试, 退避使用asyncio.sleep, 不阻塞事件循环;
+    2. 只重试幂等请求: 查询(GET)和撤单(DELETE)总是可以, 下单等写请求只有带客户端订单id时才重试(交易所拒绝重复的客户端订单id);
+    3. 同一域名连续失败达到阈值之后熔断, 熔断期间请求直接返回错误, 冷却之后放行一个探测请求, 成功则恢复;
+    4. 撤单请求默认不受熔断限制, 故障期间也要尽量撤掉挂单;
+    5. 默认关闭, 由配置文件 `HTTP.retry` 开启; 重试在各交易所的 request 中进行, 每次重试重新签名并重新获取限频令牌.
+    使用:
+        "HTTP": {"retry": {"max_retries": 2, "failure_threshold": 5}}
+        AsyncHttpRequests.set_retry_policy(RetryPolicy(max_retries=2))
+        AsyncHttpRequests.set_retry_policy(None)  # 关闭重试和熔断
+"""
+import json
+import time
+import random
+import asyncio
+from urllib.parse import urlparse, parse_qs
+from xuanwu.error import Error
+from xuanwu.utils import logger
+
+__all__ = ("RetryPolicy", "CircuitBreaker", "is_idempotent", "is_cancel", )
+
+# 各交易所下单请求中的客户端订单id字段
+CLIENT_ORDER_ID_KEYS = ("clOrdId", "newClientOrderId", "client_order_id", "client-order-id", "client_oid",
+                        "clientOrderId")
+
+
+def _has_client_order_id(data):
+    if isinstance(data, dict):
+        return any(data.get(k) for k in CLIENT_ORDER_ID_KEYS)
+    if isinstance(data, list):
+        return bool(data) and all(_has_client_order_id(d) for d in data)
+    return False
+
+
+def is_idempotent(method, url, params=None, body=None, data=None):
+    """ 请求是否可以安全地重复发送
+
+    Attributes:
+        :param method: HTTP request method.
+        :param url: 请求地址, 查询参数也会被检查.
+        :param params: HTTP query params.
+        :param body: HTTP request body, string or bytes format.
+        :param data: HTTP request body, dict format.
+    """
+    if method in ("GET", "DELETE"):
+        return True
+    if isinstance(body, (bytes, str)) and body:
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = None
+    query = {k: v[0] for k, v in parse_qs(urlparse(url).query).items()}
+    return any(_has_client_order_id(d) for d in (params, body, data, query))
+
+
+def is_cancel(method, url):
+    """ 是否撤单请求, e.g. DELETE /fapi/v1/order, POST /api/v5/trade/cancel-order, POST .../swap_cancel """
+    return method == "DELETE" or "cancel" in urlparse(url).path.lower()
+
+
+class CircuitBreaker:
+    """ 按域名的熔断器.
+
+    Attributes:
+        failure_threshold: 连续失败多少次之后熔断.
+        recovery_timeout: 熔断持续时间(秒), 之后放行一个探测请求.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=10):
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at = 0
+        self._state = self.CLOSED
+
+    @property
+    def state(self):
+        if self._state == self.OPEN and time.time() - self._opened_at >= self._recovery_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self):
+        """ 是否放行请求, 冷却之后只放行一个探测请求 """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            # 探测请求返回之前继续熔断
+            self._state = self.OPEN
+            self._opened_at = time.time()
+            return True
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == self.OPEN or self._failures >= self._failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.time()
+
+
+class RetryPolicy:
+    """ REST请求重试策略.
+
+    Attributes:
+        max_retries: 最多重试次数, 0表示不重试(只使用熔断).
+        base_delay: 第一次重试的退避上限(秒), 之后每次翻倍.
+        max_delay: 退避上限(秒).
+        retry_codes: 需要重试的HTTP状态码, 429由限频器处理, 不在默认列表中.
+        failure_threshold: 同一域名连续失败多少次之后熔断, 0表示不熔断.
+        recovery_timeout: 熔断持续时间(秒).
+        exempt_cancels: 撤单请求是否不受熔断限制, 结果仍然计入熔断统计.
+    """
+
+    def __init__(self, max_retries=2, base_delay=0.05, max_delay=1, retry_codes=(500, 502, 503, 504),
+                 failure_threshold=5, recovery_timeout=10, exempt_cancels=True):
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._retry_codes = set(retry_codes)
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._exempt_cancels = exempt_cancels
+        self._breakers = {}  # {host: CircuitBreaker}
+
+    def breaker(self, host):
+        if not self._failure_threshold:
+            return None
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self._failure_threshold, self._recovery_timeout)
+        return self._breakers[host]
+
+    @property
+    def breakers(self):
+        """ 各域名熔断状态, e.g. {"www.okex.com": "closed", ... } """
+        return {host: b.state for host, b in self._breakers.items()}
+
+    def backoff(self, attempt):
+        """ 第attempt次重试前的等待时间, 全抖动: [0, min(max_delay, base_delay * 2 ** attempt)] """
+        return random.uniform(0, min(self._max_delay, self._base_delay * (2 ** attempt)))
+
+    def is_failure(self, code, error):
+        """ 网络错误(没有状态码)和服务端错误视为失败, 计入熔断并且可以重试 """
+        if not error:
+            return False
+        return code is None or code in self._retry_codes
+
+    async def run(self, send, host, idempotent, cancel=False):
+        """ 按策略发送请求
+
+        Attributes:
+            :param send: 无参数的异步函数, 每次调用发送一次请求, 返回 (code, success, error).
+            :param host: 请求域名, 熔断按域名统计.
+            :param idempotent: 请求是否可以重复发送.
+            :param cancel: 是否撤单请求, `exempt_cancels` 时熔断期间也放行.
+        :returns:
+            code, success, error: 最后一次请求的结果, 熔断时 code 和 success 是None.
+        """
+        breaker = self.breaker(host)
+        exempt = cancel and self._exempt_cancels
+        attempt = 0
+        while True:
+            if breaker and not exempt and not breaker.allow():
+                return None, None, Error(f"circuit open for host: {host}")
+            code, success, error = await send()
+            failed = self.is_failure(code, error)
+            if breaker:
+                if failed:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not failed or not idempotent or attempt >= self._max_retries:
+                return code, success, error
+            delay = self.backoff(attempt)
+            attempt += 1
+            logger.warn("retry request, host:", host, "attempt:", attempt, "delay:", round(delay, 3), "code:", code,
+                        "error:", error, caller=self)
+            await asyncio.sleep(delay)
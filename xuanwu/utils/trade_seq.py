@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+  @ Author:   Turkey
+  @ Email:    suiminyan@gmail.com
+  @ Date:     2026/10/23 14:00
+  @ Description: 按成交id去重和检测缺失
+  @ History:
+    1. 每个币对保留最近window个成交id, 重复推送的成交直接丢弃;
+    2. 成交id是整数并且连续递增时(e.g. OKX), 新成交id与上一个最大成交id之间的差值记为缺失, 晚到的成交补回缺失数;
+    3. 没有成交id的成交按(价格, 方向, 数量, 时间)与上一笔比较, 与原来的去重方式一致;
+    4. 合并推送的成交(Trade.count > 1)覆盖 trade_id - count + 1 到 trade_id 的全部id, 不计为缺失.
+    使用:
+        sequencer = TradeSequencer(window=1000)
+        if not sequencer.check(trade):
+            return  # 重复成交
+        sequencer.stats  # {"BTC-USDT-SWAP": {"received": 10, "duplicates": 1, "gaps": 1, "missing": 3, ...}}
+    NOTE:
+        OKX `trades` 频道会合并同一吃单的多笔成交, 推送中的tradeId是合并后的最后一个id, count是合并的笔数,
+        交易所适配器需要设置Trade.count, 否则合并的成交会被计为缺失.
+"""
+from collections import deque
+
+__all__ = ("TradeSequencer", )
+
+
+class _SymbolState:
+    """ 单个币对的去重窗口和计数 """
+
+    __slots__ = ("ids", "order", "last_id", "last_key", "received", "duplicates", "gaps", "missing", "late", "no_id")
+
+    def __init__(self, window):
+        self.ids = set()
+        self.order = deque(maxlen=window)
+        self.last_id = None  # 已经收到的最大整数成交id
+        self.last_key = None  # 没有成交id时上一笔成交的 (price, side, quantity, timestamp)
+        self.received = 0
+        self.duplicates = 0
+        self.gaps = 0
+        self.missing = 0
+        self.late = 0
+        self.no_id = 0
+
+    @property
+    def data(self):
+        return {
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "gaps": self.gaps,
+            "missing": self.missing,
+            "late": self.late,
+            "no_id": self.no_id,
+            "last_id": self.last_id
+        }
+
+
+class TradeSequencer:
+    """ 成交去重和缺失检测.
+
+    Attributes:
+        window: 每个币对保留的最近成交id数量.
+        check_gap: 是否按整数成交id检测缺失, 成交id不连续的交易所(e.g. 多个合约共用一个id序列)请设置为False.
+        gap_callback: 检测到缺失时的回调函数, `gap_callback(symbol, last_id, trade_id)`, 参数是缺失区间两端的成交id,
+                      合并推送的成交trade_id是其中第一笔的id.
+    """
+
+    def __init__(self, window=1000, check_gap=True, gap_callback=None):
+        self._window = window
+        self._check_gap = check_gap
+        self._gap_callback = gap_callback
+        self._states = {}  # {symbol: _SymbolState}
+
+    @property
+    def stats(self):
+        """ 各币对计数, e.g. {"BTC-USDT-SWAP": {"received": 10, "duplicates": 1, ...}, ... } """
+        return {symbol: state.data for symbol, state in self._states.items()}
+
+    def reset(self, symbol=None):
+        """ 清除币对的去重窗口和计数, e.g. 行情重连之后不把断线期间的成交计为缺失 """
+        if symbol is None:
+            self._states = {}
+        else:
+            self._states.pop(symbol, None)
+
+    def check(self, trade):
+        """ 检查成交是否是新成交
+
+        Attributes:
+            :param trade: Trade对象.
+        :returns:
+            :return: True 新成交, False 重复成交.
+        """
+        state = self._states.get(trade.symbol)
+        if state is None:
+            state = self._states[trade.symbol] = _SymbolState(self._window)
+        state.received += 1
+
+        trade_id = trade.trade_id
+        if trade_id is None or trade_id == "":
+            state.no_id += 1
+            key = (trade.price, trade.side, trade.quantity, trade.timestamp)
+            if key == state.last_key:
+                state.duplicates += 1
+                return False
+            state.last_key = key
+            return True
+
+        if trade_id in state.ids:
+            state.duplicates += 1
+            return False
+        if len(state.order) == state.order.maxlen:
+            state.ids.discard(state.order[0])
+        state.order.append(trade_id)
+        state.ids.add(trade_id)
+
+        if self._check_gap:
+            self._check_sequence(trade.symbol, state, trade_id, getattr(trade, "count", None))
+        return True
+
+    def _check_sequence(self, symbol, state, trade_id, count):
+        try:
+            n = int(trade_id)
+            count = max(int(count or 1), 1)
+        except (TypeError, ValueError):
+            return
+        first = n - count + 1  # 合并推送时第一笔成交的id
+        last_id = state.last_id
+        if last_id is None:
+            state.last_id = n
+            return
+        if first > last_id + 1:
+            state.gaps += 1
+            state.missing += first - last_id - 1
+            if self._gap_callback:
+                self._gap_callback(symbol, last_id, first)
+        elif n < last_id:
+            # 晚到的成交, 在窗口范围内的认为补上了之前计为缺失的成交
+            state.late += 1
+            if state.missing and last_id - n < self._window:
+                state.missing = max(state.missing - count, 0)
+            return
+        state.last_id = n